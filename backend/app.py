@@ -4,6 +4,7 @@ Backend Orchestrator - FastAPI application.
 
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Add project root to path for common_ai and other shared modules
@@ -14,14 +15,21 @@ sys.path.insert(0, str(_current_dir))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import aiohttp
 import uvicorn
 import logging
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # Windows dev setups fall back to the stdlib asyncio loop
+    uvloop = None
+
 # Load environment variables from project root
 env_path = _project_root / ".env"
 load_dotenv(dotenv_path=env_path)
 
+from common_ai.common_utils.utils import load_config
 from routers import routers
 
 # Configure logging
@@ -32,11 +40,37 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the shared A2A aiohttp session and pre-build the orchestrator."""
+    logger.info("Backend Orchestrator starting up...")
+    config = load_config(str(routers.CONFIG_PATH))
+    app.state.http_session = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(
+            total=config.get("orchestration", {}).get("timeout", 120),
+            connect=5.0
+        ),
+        connector=aiohttp.TCPConnector(
+            limit=200,
+            limit_per_host=64,
+            keepalive_timeout=60
+        )
+    )
+    try:
+        await routers.build_orchestrator(app)
+        yield
+    finally:
+        logger.info("Backend Orchestrator shutting down...")
+        await app.state.http_session.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Uniswap V3 Risk Analysis Orchestrator",
     description="Multi-agent orchestrator for comprehensive pool and token risk analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -52,22 +86,15 @@ app.add_middleware(
 app.include_router(routers.router)
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event handler."""
-    logger.info("Backend Orchestrator starting up...")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Shutdown event handler."""
-    logger.info("Backend Orchestrator shutting down...")
-
-
 if __name__ == "__main__":
+    # Each worker runs its own lifespan, so the orchestrator, HTTP session and
+    # agent discovery cache are built (and warmed) once per worker process.
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=5000,
-        reload=False
+        reload=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        loop="uvloop" if uvloop is not None else "asyncio",
+        http="httptools",
     )
@@ -2,14 +2,17 @@
 Backend Orchestrator API routers.
 """
 
+import asyncio
 import sys
 from pathlib import Path
 
 # Setup path
 sys.path.insert(0, str(Path(__file__).parent.parent / "common_ai"))
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from common_ai.mappings.schemas import OrchestratorRequest, OrchestratorResponse
+from common_ai.streaming import StreamingChunk, StreamingMessage, StreamingStatus, format_sse
 from common_ai.gpt_family import init_models, MicroserviceModels
 from common_ai.common_utils.utils import load_prompts, load_config
 from workflows.rag.orchestrator import OrchestratorGraph
@@ -19,50 +22,60 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize orchestrator (singleton)
-orchestrator_graph = None
+CONFIG_PATH = Path(__file__).parent.parent / "config.json"
+PROMPTS_PATH = Path(__file__).parent.parent / "workflows" / "rag" / "config" / "tasks.yml"
 
 
-def get_orchestrator():
-    """Get or create orchestrator graph instance."""
-    global orchestrator_graph
-    if orchestrator_graph is None:
-        # Load config and prompts
-        config_path = Path(__file__).parent.parent / "config.json"
-        config = load_config(str(config_path))
-        prompts_path = Path(__file__).parent.parent / "workflows" / "rag" / "config" / "tasks.yml"
-        prompts = load_prompts(str(prompts_path))
-        system_prompt = prompts.get("orchestrator_agent", {}).get("system", "")
-        
-        # Initialize LLM
-        models = init_models(MicroserviceModels.BACKEND)
-        llm = models[MicroserviceModels.BACKEND.value[0]]  # Get first model from service
-        
-        # Build graph
-        orchestrator_graph = OrchestratorGraph(
-            llm=llm,
-            config=config,
-            system_prompt=system_prompt
-        ).graph
+async def build_orchestrator(app: FastAPI) -> OrchestratorGraph:
+    """
+    Build the orchestrator once at startup and warm the agent discovery cache.
+    
+    Args:
+        app: FastAPI app whose state holds the shared http session
         
-        logger.info("Orchestrator initialized")
+    Returns:
+        OrchestratorGraph stored on app.state.orchestrator
+    """
+    # Load config and prompts
+    config = load_config(str(CONFIG_PATH))
+    prompts = load_prompts(str(PROMPTS_PATH))
+    system_prompt = prompts.get("orchestrator_agent", {}).get("system", "")
     
-    return orchestrator_graph
+    # Initialize LLM
+    models = init_models(MicroserviceModels.BACKEND)
+    llm = models[MicroserviceModels.BACKEND.value[0]]  # Get first model from service
+    
+    # Build graph
+    orchestrator = OrchestratorGraph(
+        llm=llm,
+        config=config,
+        system_prompt=system_prompt,
+        a2a_session=app.state.http_session
+    )
+    
+    # Resolve agent cards before the first request lands
+    await orchestrator.nodes.discover_agents({})
+    
+    app.state.orchestrator = orchestrator
+    logger.info("Orchestrator initialized")
+    
+    return orchestrator
 
 
 @router.post("/v1/orchestrator/invoke", response_model=OrchestratorResponse)
-async def invoke_orchestrator(request: OrchestratorRequest):
+async def invoke_orchestrator(request: OrchestratorRequest, http_request: Request):
     """
     Invoke orchestrator to coordinate sub-agents.
     
     Args:
         request: OrchestratorRequest with query and pool_address
+        http_request: Incoming HTTP request (gives access to app state)
         
     Returns:
         OrchestratorResponse with synthesized analysis
     """
     try:
-        graph = get_orchestrator()
+        graph = http_request.app.state.orchestrator.graph
         
         input_state = {
             "query": request.query,
@@ -74,8 +87,9 @@ async def invoke_orchestrator(request: OrchestratorRequest):
         
         result = await graph.ainvoke(input_state, config=config)
         
-        logger.info(f"Graph result keys: {result.keys()}")
-        logger.info(f"Graph result: {result}")
+        logger.debug("Graph result keys: %s", result.keys())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Graph result: %r", result)
         
         return OrchestratorResponse(
             answer=result.get("answer", "No answer generated"),
@@ -87,6 +101,63 @@ async def invoke_orchestrator(request: OrchestratorRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/v1/orchestrator/stream")
+async def stream_orchestrator(request: OrchestratorRequest, http_request: Request):
+    """
+    Invoke orchestrator and stream the synthesized answer as Server-Sent Events.
+    
+    Each synthesis token is sent as a ``responding`` message; the run ends with an
+    ``event: done`` frame carrying metadata and risk_score (or ``event: error``).
+    
+    Args:
+        request: OrchestratorRequest with query and pool_address
+        http_request: Incoming HTTP request (gives access to app state)
+        
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    graph = http_request.app.state.orchestrator.graph
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    input_state = {
+        "query": request.query,
+        "pool_address": request.pool_address
+    }
+    
+    async def run_graph():
+        try:
+            return await graph.ainvoke(input_state, config={"configurable": {"stream_queue": queue}})
+        finally:
+            await queue.put(None)  # Sentinel: no more chunks
+    
+    async def event_stream():
+        task = asyncio.create_task(run_graph())
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield format_sse(StreamingChunk(status=StreamingStatus.RESPONDING, message=chunk))
+            
+            result = await task
+            yield format_sse(
+                StreamingMessage(
+                    status=StreamingStatus.COMPLETE,
+                    message=result.get("answer", "No answer generated"),
+                    metadata={
+                        "metadata": result.get("metadata", {}),
+                        "risk_score": result.get("risk_score", 0.0)
+                    }
+                ),
+                event="done"
+            )
+        except Exception as e:
+            logger.error(f"Orchestrator streaming failed: {e}")
+            yield format_sse(StreamingMessage(status=StreamingStatus.ERROR, message=str(e)), event="error")
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -3,23 +3,49 @@ Node implementations for Orchestrator RAG workflow.
 Uses A2A protocol for agent-to-agent communication.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
-import httpx
+from langchain_core.runnables import RunnableConfig
+import aiohttp
 import asyncio
 import logging
-import json
+import re
+import time
 from uuid import uuid4
 
-from a2a.client import A2ACardResolver
+import orjson
+
 from a2a.types import MessageSendParams, SendMessageRequest
 
-from .remote_agent import RemoteAgentConnections
+from .remote_agent import AgentCardResolver, RemoteAgentConnections
 from .utils import format_agents_info
 
 logger = logging.getLogger(__name__)
 
+# Matches the outermost JSON object in an LLM reply (tolerates ```json fences and prose)
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+_SYNTHESIS_INSTRUCTIONS = """
+
+Provide a comprehensive answer that:
+1. Directly addresses the user's question
+2. Highlights critical risks
+3. Provides clear recommendations
+"""
+
+# Human-readable names for log and error messages
+_AGENT_LABELS = {
+    "pool_risk": "Pool Risk",
+    "token_intelligence": "Token Intelligence",
+}
+
+# Keyword rules that route unambiguous queries without an LLM call
+_ROUTE_RULES = [
+    (re.compile(r"\b(liquidity|tvl|depth|slippage|tick|volume)\b", re.I), "pool_risk"),
+    (re.compile(r"\b(scam|honeypot|rug|owner|mint|blacklist|holder)\b", re.I), "token_intel"),
+]
+
 
 class OrchestratorNodes:
     """Node implementations for orchestrator graph using A2A protocol."""
@@ -29,7 +55,7 @@ class OrchestratorNodes:
         llm: ChatOpenAI,
         config: Dict[str, Any],
         system_prompt: str,
-        a2a_http_client: httpx.AsyncClient,
+        a2a_session: aiohttp.ClientSession,
         remote_agent_addresses: Dict[str, str]
     ):
         """
@@ -39,38 +65,79 @@ class OrchestratorNodes:
             llm: Language model for routing and synthesis
             config: Configuration dictionary
             system_prompt: System prompt for the agent
-            a2a_http_client: Shared httpx async client for A2A
+            a2a_session: Shared aiohttp client session for A2A
             remote_agent_addresses: Dict mapping agent name to A2A base URL
         """
         self.llm = llm
         self.config = config
         self.system_prompt = system_prompt
-        self.a2a_http_client = a2a_http_client
+        
+        # Static prompt parts, built once so every request shares a byte-identical
+        # prefix (cheaper to build and friendly to provider-side prompt caching)
+        self._routing_prefix = f"""{system_prompt}
+
+Analyze this query and determine which agents to invoke:
+Query: """
+        self._routing_suffix = """
+
+Respond with JSON containing:
+- "route": "pool_risk" | "token_intel" | "both"
+- "reasoning": brief explanation
+
+Examples:
+- "What's the liquidity depth?" → {"route": "pool_risk", "reasoning": "Query about liquidity metrics"}
+- "Is this token a scam?" → {"route": "token_intel", "reasoning": "Query about token security"}
+- "Analyze this pool" → {"route": "both", "reasoning": "Comprehensive analysis requested"}
+"""
+        self._synthesis_prefix = f"""{system_prompt}
+
+Synthesize the following agent results into a coherent, actionable answer:
+
+"""
+        self.a2a_session = a2a_session
         self.remote_agent_addresses = remote_agent_addresses
-        self.timeout = config.get("orchestration", {}).get("timeout", 120)
+        orchestration = config.get("orchestration", {})
+        self.timeout = orchestration.get("timeout", 120)
+        self.discovery_ttl = orchestration.get("discovery_ttl_seconds", 300)
+        self.rule_based_routing = orchestration.get("rule_based_routing", True)
         
-        # A2A connections - populated by discover_agents
+        # A2A connections - populated by discover_agents and reused across requests
         self.remote_agent_connections: Dict[str, RemoteAgentConnections] = {}
         self.cards: Dict[str, Any] = {}
+        self._cached_agents_info: Optional[str] = None
+        self._discovered_at: float = float("-inf")
     
     async def discover_agents(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Discover available agents by fetching their agent cards.
         Creates RemoteAgentConnections for each available agent.
+        Results are cached per process until the discovery TTL expires; agents
+        that failed to resolve (e.g. not up yet at boot) are retried on every call.
         """
-        logger.info(f"Discovering agents from: {list(self.remote_agent_addresses.keys())}")
+        missing = {
+            agent: address
+            for agent, address in self.remote_agent_addresses.items()
+            if agent.lower() not in self.remote_agent_connections
+        }
+        fresh = time.monotonic() - self._discovered_at < self.discovery_ttl
+        if fresh and not missing:
+            return {"agents_info": self._cached_agents_info}
+        
+        # Within the TTL only the unresolved agents are retried; after it every card is refreshed
+        targets = missing if fresh else self.remote_agent_addresses
+        logger.info("Discovering agents from: %s", list(targets.keys()))
         
-        async def resolve_agent_card(agent_name: str, agent_url: str, client: httpx.AsyncClient):
+        async def resolve_agent_card(agent_name: str, agent_url: str, session: aiohttp.ClientSession):
             """Resolve a single agent's card."""
             try:
                 # Use the full A2A URL as base (e.g., http://localhost:8001/a2a)
                 # The agent card is at {base_url}/.well-known/agent.json
-                resolver = A2ACardResolver(httpx_client=client, base_url=agent_url)
+                resolver = AgentCardResolver(http_session=session, base_url=agent_url)
                 card = await resolver.get_agent_card(relative_card_path=".well-known/agent.json")
                 connection = RemoteAgentConnections(
                     agent_card=card,
                     agent_url=agent_url,
-                    http_client=client
+                    http_session=session
                 )
                 logger.info(f"Successfully resolved agent: {agent_name} ({card.name})")
                 return agent_name.lower(), card, connection
@@ -79,16 +146,16 @@ class OrchestratorNodes:
                 logger.error(f"[A2A discover agents] - Failed to resolve agent '{agent_name}' at '{agent_url}': {e}")
                 return None
 
-        # Resolve all agents in parallel
+        # Resolve the target agents in parallel
         tasks = [
-            resolve_agent_card(agent, address, self.a2a_http_client)
-            for agent, address in self.remote_agent_addresses.items()
+            resolve_agent_card(agent, address, self.a2a_session)
+            for agent, address in targets.items()
         ]
-        results = await asyncio.gather(*tasks, return_exceptions=False)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Store successful connections
         for result in results:
-            if not result:
+            if not result or isinstance(result, BaseException):
                 continue
             agent_name, card, connection = result
             self.remote_agent_connections[agent_name] = connection
@@ -97,31 +164,32 @@ class OrchestratorNodes:
         formatted_agents_info = format_agents_info(self.cards)
         logger.info(f"Discovered {len(self.remote_agent_connections)} agents")
         
+        # The TTL restarts only on a full refresh, so partial results never pin the agent set
+        self._cached_agents_info = formatted_agents_info
+        if targets is self.remote_agent_addresses and self.remote_agent_connections:
+            self._discovered_at = time.monotonic()
+        
         return {"agents_info": formatted_agents_info}
     
-    def analyze_query(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_query(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze user query to determine routing."""
         user_question = state["query"]
         
-        routing_prompt = f"""{self.system_prompt}
-
-Analyze this query and determine which agents to invoke:
-Query: {user_question}
-
-Respond with JSON containing:
-- "route": "pool_risk" | "token_intel" | "both"
-- "reasoning": brief explanation
-
-Examples:
-- "What's the liquidity depth?" → {{"route": "pool_risk", "reasoning": "Query about liquidity metrics"}}
-- "Is this token a scam?" → {{"route": "token_intel", "reasoning": "Query about token security"}}
-- "Analyze this pool" → {{"route": "both", "reasoning": "Comprehensive analysis requested"}}
-"""
+        if self.rule_based_routing:
+            matches = {route for pattern, route in _ROUTE_RULES if pattern.search(user_question)}
+            if len(matches) == 1:
+                route = matches.pop()
+                return {
+                    "routing_decision": route,
+                    "routing_reasoning": f"Matched {route} keyword rule"
+                }
+        
+        routing_prompt = self._routing_prefix + user_question + self._routing_suffix
         
         try:
-            response = self.llm.invoke([HumanMessage(content=routing_prompt)])
-            import json
-            routing = json.loads(response.content.strip("```json").strip("```").strip())
+            response = await self.llm.ainvoke([HumanMessage(content=routing_prompt)])
+            match = _JSON_RE.search(response.content)
+            routing = orjson.loads(match.group(0)) if match else {}
             
             return {
                 "routing_decision": routing.get("route", "both"),
@@ -137,97 +205,53 @@ Examples:
     
     async def invoke_pool_risk(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Invoke Pool Risk Agent via A2A protocol."""
-        user_question = state["query"]
-        pool_address = state.get("pool_address")
-        
-        # Check if agent was discovered
-        if "pool_risk" not in self.remote_agent_connections:
-            logger.error("Pool Risk agent not discovered")
-            return {
-                "pool_risk_result": {
-                    "answer": "Pool Risk agent unavailable",
-                    "metadata": {"error": "Agent not discovered"},
-                    "risk_score": 0.0
-                }
-            }
-        
-        try:
-            connection = self.remote_agent_connections["pool_risk"]
-            
-            # Build A2A message request with DataPart for structured data
-            request = SendMessageRequest(
-                id=str(uuid4()),
-                params=MessageSendParams(
-                    message={
-                        "role": "user",
-                        "parts": [{
-                            "kind": "data",
-                            "data": {
-                                "user_question": user_question,
-                                "pool_address": pool_address,
-                                "trace_id": state.get("trace_id")
-                            }
-                        }],
-                        "messageId": uuid4().hex,
-                    }
-                )
-            )
-            
-            # Send via A2A
-            response = await connection.send_message(request)
-            result = self._extract_result_from_response(response)
-            
-            return {
-                "pool_risk_result": {
-                    "answer": result.get("answer", ""),
-                    "metadata": result.get("metadata", {}),
-                    "risk_score": result.get("risk_score", 0.0)
-                }
-            }
-        except Exception as e:
-            logger.error(f"Pool Risk Agent A2A invocation failed: {e}")
-            return {
-                "pool_risk_result": {
-                    "answer": f"Pool risk analysis failed: {str(e)}",
-                    "metadata": {"error": str(e)},
-                    "risk_score": 0.0
-                }
-            }
+        return {"pool_risk_result": await self._invoke_agent("pool_risk", state)}
     
     async def invoke_token_intel(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Invoke Token Intelligence Agent via A2A protocol."""
-        user_question = state["query"]
-        pool_address = state.get("pool_address")
+        return {"token_intel_result": await self._invoke_agent("token_intelligence", state)}
+    
+    async def _invoke_agent(self, agent_key: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send the user's question to a discovered sub-agent via A2A.
+        
+        Args:
+            agent_key: Key in remote_agent_addresses ("pool_risk" or "token_intelligence")
+            state: Current graph state
+            
+        Returns:
+            Dict with answer, metadata, risk_score (None when the agent failed or gave no score)
+        """
+        connection = self.remote_agent_connections.get(agent_key)
+        label = _AGENT_LABELS.get(agent_key, agent_key)
         
         # Check if agent was discovered
-        if "token_intelligence" not in self.remote_agent_connections:
-            logger.error("Token Intelligence agent not discovered")
+        if connection is None:
+            logger.error(f"{label} agent not discovered")
             return {
-                "token_intel_result": {
-                    "answer": "Token Intelligence agent unavailable",
-                    "metadata": {"error": "Agent not discovered"},
-                    "risk_score": 0.0
-                }
+                "answer": f"{label} agent unavailable",
+                "metadata": {"error": "Agent not discovered"},
+                "risk_score": None
             }
         
         try:
-            connection = self.remote_agent_connections["token_intelligence"]
+            request_id = uuid4().hex
             
             # Build A2A message request with DataPart for structured data
             request = SendMessageRequest(
-                id=str(uuid4()),
+                id=request_id,
                 params=MessageSendParams(
                     message={
                         "role": "user",
                         "parts": [{
                             "kind": "data",
                             "data": {
-                                "user_question": user_question,
-                                "pool_address": pool_address,
+                                "user_question": state["query"],
+                                "pool_address": state.get("pool_address"),
                                 "trace_id": state.get("trace_id")
                             }
                         }],
-                        "messageId": uuid4().hex,
+                        "messageId": request_id,
                     }
                 )
             )
@@ -237,22 +261,26 @@ Examples:
             result = self._extract_result_from_response(response)
             
             return {
-                "token_intel_result": {
-                    "answer": result.get("answer", ""),
-                    "metadata": result.get("metadata", {}),
-                    "risk_score": result.get("risk_score", 0.0)
-                }
+                "answer": result.get("answer", ""),
+                "metadata": result.get("metadata", {}),
+                "risk_score": result.get("risk_score")
             }
         except Exception as e:
-            logger.error(f"Token Intelligence Agent A2A invocation failed: {e}")
+            logger.error(f"{label} Agent A2A invocation failed: {e}")
             return {
-                "token_intel_result": {
-                    "answer": f"Token intelligence analysis failed: {str(e)}",
-                    "metadata": {"error": str(e)},
-                    "risk_score": 0.0
-                }
+                "answer": f"{label} analysis failed: {str(e)}",
+                "metadata": {"error": str(e)},
+                "risk_score": None
             }
     
+    async def invoke_both(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Invoke Pool Risk and Token Intelligence agents concurrently via A2A."""
+        pool_risk, token_intel = await asyncio.gather(
+            self.invoke_pool_risk(state),
+            self.invoke_token_intel(state)
+        )
+        return {**pool_risk, **token_intel}
+    
     def _extract_result_from_response(self, response) -> Dict[str, Any]:
         """
         Extract answer/metadata from A2A SendMessageResponse.
@@ -261,75 +289,88 @@ Examples:
             response: A2A SendMessageResponse containing Task or Message
             
         Returns:
-            Dict with answer, metadata, risk_score
+            Dict with answer, metadata, risk_score (None when the response carries no score)
         """
         try:
             # Response contains result which is a Task or Message
-            result = response.root.result if hasattr(response, 'root') else response.result
+            result = getattr(getattr(response, "root", response), "result", None)
             
             # If result is a Task, get the message from status
-            if hasattr(result, 'status') and hasattr(result.status, 'message'):
-                message = result.status.message
-            elif hasattr(result, 'parts'):
+            status = getattr(result, "status", None)
+            if status is not None:
+                message = getattr(status, "message", None)
+            elif getattr(result, "parts", None) is not None:
                 message = result
             else:
                 logger.warning(f"Unexpected A2A response structure: {type(result)}")
-                return {"answer": str(result), "metadata": {}, "risk_score": 0.0}
+                return {"answer": str(result), "metadata": {}, "risk_score": None}
             
-            # Extract text from message parts
-            if message and hasattr(message, 'parts'):
-                for part in message.parts:
-                    if hasattr(part, 'kind') and part.kind == 'text':
-                        text = part.text
-                        # Try to parse as JSON (agent may return structured response)
-                        try:
-                            parsed = json.loads(text)
-                            return {
-                                "answer": parsed.get("answer", text),
-                                "metadata": parsed.get("metadata", {}),
-                                "risk_score": parsed.get("risk_score", 0.0)
-                            }
-                        except json.JSONDecodeError:
-                            return {"answer": text, "metadata": {}, "risk_score": 0.0}
+            # Extract text from message parts (Part is a RootModel wrapping TextPart/DataPart/...)
+            for part in getattr(message, "parts", None) or ():
+                part = getattr(part, "root", part)
+                if getattr(part, "kind", None) != "text":
+                    continue
+                text = part.text
+                # Plain-text answers skip the JSON attempt entirely
+                if not text or text[0] not in "{[":
+                    return {"answer": text, "metadata": {}, "risk_score": None}
+                # Agent may return a structured JSON response
+                try:
+                    parsed = orjson.loads(text)
+                except orjson.JSONDecodeError:
+                    return {"answer": text, "metadata": {}, "risk_score": None}
+                if not isinstance(parsed, dict):
+                    return {"answer": text, "metadata": {}, "risk_score": None}
+                return {
+                    "answer": parsed.get("answer", text),
+                    "metadata": parsed.get("metadata", {}),
+                    "risk_score": parsed.get("risk_score")
+                }
             
-            return {"answer": "", "metadata": {}, "risk_score": 0.0}
+            return {"answer": "", "metadata": {}, "risk_score": None}
             
         except Exception as e:
             logger.error(f"Failed to extract result from A2A response: {e}")
-            return {"answer": f"Error parsing response: {e}", "metadata": {}, "risk_score": 0.0}
+            return {"answer": f"Error parsing response: {e}", "metadata": {}, "risk_score": None}
     
-    def synthesize_results(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Synthesize results from sub-agents."""
+    async def synthesize_results(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        """
+        Synthesize results from sub-agents.
+        
+        If the run was started with a ``stream_queue`` in ``config["configurable"]``
+        tokens are streamed from the LLM and forwarded to it; otherwise the full
+        answer is awaited in one call.
+        """
         user_question = state["query"]
         pool_risk = state.get("pool_risk_result", {})
         token_intel = state.get("token_intel_result", {})
         
-        context = f"""
-User Question: {user_question}
-
-"""
+        parts = [f"\nUser Question: {user_question}\n\n"]
         
         if pool_risk:
-            context += f"Pool Risk Analysis:\n{pool_risk.get('answer', 'N/A')}\n\n"
+            parts.append(f"Pool Risk Analysis:\n{pool_risk.get('answer', 'N/A')}\n\n")
         
         if token_intel:
-            context += f"Token Intelligence Analysis:\n{token_intel.get('answer', 'N/A')}\n\n"
+            parts.append(f"Token Intelligence Analysis:\n{token_intel.get('answer', 'N/A')}\n\n")
         
-        synthesis_prompt = f"""{self.system_prompt}
-
-Synthesize the following agent results into a coherent, actionable answer:
-
-{context}
-
-Provide a comprehensive answer that:
-1. Directly addresses the user's question
-2. Highlights critical risks
-3. Provides clear recommendations
-"""
+        context = "".join(parts)
+        
+        synthesis_prompt = self._synthesis_prefix + context + _SYNTHESIS_INSTRUCTIONS
+        
+        stream_queue: Optional[asyncio.Queue] = config.get("configurable", {}).get("stream_queue")
         
         try:
-            response = self.llm.invoke([HumanMessage(content=synthesis_prompt)])
-            answer = response.content
+            if stream_queue is None:
+                response = await self.llm.ainvoke([HumanMessage(content=synthesis_prompt)])
+                answer = response.content
+            else:
+                chunks = []
+                async for chunk in self.llm.astream([HumanMessage(content=synthesis_prompt)]):
+                    if not chunk.content:
+                        continue
+                    chunks.append(chunk.content)
+                    await stream_queue.put(chunk.content)
+                answer = "".join(chunks)
         except Exception as e:
             logger.error(f"Synthesis failed: {e}")
             answer = f"Failed to synthesize results: {e}"
@@ -343,20 +384,22 @@ Provide a comprehensive answer that:
         pool_risk = state.get("pool_risk_result", {})
         token_intel = state.get("token_intel_result", {})
         
-        # Calculate composite risk score
-        risk_scores = []
-        if pool_risk.get("risk_score"):
-            risk_scores.append(pool_risk["risk_score"])
-        if token_intel.get("risk_score"):
-            risk_scores.append(token_intel["risk_score"])
-        
-        composite_risk = sum(risk_scores) / len(risk_scores) if risk_scores else 0.0
-        
-        metadata = {
-            "pool_risk": pool_risk.get("metadata", {}),
-            "token_intel": token_intel.get("metadata", {}),
-            "composite_risk_score": composite_risk
-        }
+        if not pool_risk and not token_intel:
+            composite_risk = 0.0
+            metadata = {"pool_risk": {}, "token_intel": {}, "composite_risk_score": composite_risk}
+        else:
+            # Calculate composite risk score; None means missing, 0.0 is a real score
+            scores = [
+                s for s in (pool_risk.get("risk_score"), token_intel.get("risk_score"))
+                if s is not None
+            ]
+            composite_risk = sum(scores) / len(scores) if scores else 0.0
+            
+            metadata = {
+                "pool_risk": pool_risk.get("metadata", {}),
+                "token_intel": token_intel.get("metadata", {}),
+                "composite_risk_score": composite_risk
+            }
         
         # Get the synthesized answer from state
         final_answer = state.get("final_answer", state.get("answer", "No answer generated"))
@@ -3,11 +3,17 @@ Orchestrator StateGraph - coordinates Pool Risk and Token Intelligence agents.
 Uses A2A protocol for agent-to-agent communication.
 """
 
-import httpx
+import aiohttp
 from langgraph.graph import StateGraph, START, END
 from .state import InputState, OutputState, OverallState
 from .nodes import OrchestratorNodes
 
+# Routing decision -> invoke node ("both" and unknown decisions fan out to both agents)
+_ROUTE_TO_NODE = {
+    "pool_risk": "invoke_pool_risk",
+    "token_intel": "invoke_token_intel",
+}
+
 
 class OrchestratorGraph:
     """StateGraph for orchestrating sub-agents via A2A protocol."""
@@ -16,7 +22,8 @@ class OrchestratorGraph:
         self,
         llm,
         config,
-        system_prompt
+        system_prompt,
+        a2a_session: aiohttp.ClientSession
     ):
         """
         Initialize the orchestrator graph.
@@ -25,9 +32,9 @@ class OrchestratorGraph:
             llm: Language model
             config: Configuration dict
             system_prompt: System prompt string
+            a2a_session: Shared aiohttp session owned by the app lifespan
         """
-        # Create shared httpx client for A2A
-        self.a2a_http_client = httpx.AsyncClient(timeout=config.get("orchestration", {}).get("timeout", 120))
+        self.a2a_session = a2a_session
         
         # Extract remote agent addresses from config
         remote_agent_addresses = config.get("remote_agent_addresses", {})
@@ -36,7 +43,7 @@ class OrchestratorGraph:
             llm=llm,
             config=config,
             system_prompt=system_prompt,
-            a2a_http_client=self.a2a_http_client,
+            a2a_session=self.a2a_session,
             remote_agent_addresses=remote_agent_addresses
         )
         self.graph = self._build_graph()
@@ -54,6 +61,7 @@ class OrchestratorGraph:
         builder.add_node("analyze_query", self.nodes.analyze_query)
         builder.add_node("invoke_pool_risk", self.nodes.invoke_pool_risk)
         builder.add_node("invoke_token_intel", self.nodes.invoke_token_intel)
+        builder.add_node("invoke_both", self.nodes.invoke_both)
         builder.add_node("synthesize_results", self.nodes.synthesize_results)
         builder.add_node("finalize_output", self.nodes.finalize_output)
         
@@ -61,48 +69,21 @@ class OrchestratorGraph:
         builder.add_edge(START, "discover_agents")
         builder.add_edge("discover_agents", "analyze_query")
         
-        # Conditional routing based on decision
+        # Route directly to the invoke node for the decision:
+        # discover_agents → analyze_query → {invoke_pool_risk | invoke_token_intel | invoke_both}
         def route_to_agents(state: OverallState) -> str:
-            decision = state.get("routing_decision", "both")
-            if decision == "pool_risk":
-                return "invoke_pool_risk_only"
-            elif decision == "token_intel":
-                return "invoke_token_intel_only"
-            else:
-                return "invoke_both"
+            return _ROUTE_TO_NODE.get(state.get("routing_decision", "both"), "invoke_both")
         
         builder.add_conditional_edges(
             "analyze_query",
             route_to_agents,
-            {
-                "invoke_pool_risk_only": "invoke_pool_risk",
-                "invoke_token_intel_only": "invoke_token_intel",
-                "invoke_both": "invoke_pool_risk"  # Start with pool risk, then token intel
-            }
-        )
-        
-        # Pool risk only path
-        builder.add_edge("invoke_pool_risk", "check_token_intel_needed")
-        
-        # Check if token intel is also needed
-        def check_token_intel_needed(state: OverallState) -> str:
-            decision = state.get("routing_decision", "both")
-            if decision == "both":
-                return "invoke_token_intel"
-            return "synthesize_results"
-        
-        builder.add_node("check_token_intel_needed", lambda s: s)
-        builder.add_conditional_edges(
-            "check_token_intel_needed",
-            check_token_intel_needed,
-            {
-                "invoke_token_intel": "invoke_token_intel",
-                "synthesize_results": "synthesize_results"
-            }
+            ["invoke_pool_risk", "invoke_token_intel", "invoke_both"]
         )
         
         # All paths converge to synthesis
+        builder.add_edge("invoke_pool_risk", "synthesize_results")
         builder.add_edge("invoke_token_intel", "synthesize_results")
+        builder.add_edge("invoke_both", "synthesize_results")
         builder.add_edge("synthesize_results", "finalize_output")
         builder.add_edge("finalize_output", END)
         
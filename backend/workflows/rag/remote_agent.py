@@ -1,12 +1,11 @@
 """
 Remote Agent Connections for A2A Protocol.
-Wraps A2AClient for communicating with sub-agents via A2A protocol.
+Speaks A2A JSON-RPC over a shared aiohttp session to communicate with sub-agents.
 """
 
 from typing import Callable
-import httpx
+import aiohttp
 
-from a2a.client import A2AClient
 from a2a.types import (
     AgentCard,
     SendMessageRequest,
@@ -22,6 +21,38 @@ logger = logging.getLogger(__name__)
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+AGENT_CARD_PATH = ".well-known/agent.json"
+
+
+class AgentCardResolver:
+    """Resolves an agent card over a shared aiohttp session (mirrors A2ACardResolver)."""
+
+    def __init__(self, http_session: aiohttp.ClientSession, base_url: str):
+        """
+        Initialize the resolver.
+        
+        Args:
+            http_session: Shared aiohttp client session
+            base_url: Agent A2A base URL (e.g., http://localhost:8001/a2a/)
+        """
+        self._session = http_session
+        self.base_url = base_url.rstrip("/")
+
+    async def get_agent_card(self, relative_card_path: str = AGENT_CARD_PATH) -> AgentCard:
+        """
+        Fetch and parse the agent card.
+        
+        Args:
+            relative_card_path: Card path relative to the base URL
+            
+        Returns:
+            Parsed AgentCard
+        """
+        url = f"{self.base_url}/{relative_card_path.lstrip('/')}"
+        async with self._session.get(url) as response:
+            response.raise_for_status()
+            return AgentCard.model_validate(await response.json())
+
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
@@ -30,7 +61,7 @@ class RemoteAgentConnections:
         self,
         agent_card: AgentCard,
         agent_url: str,
-        http_client: httpx.AsyncClient
+        http_session: aiohttp.ClientSession
     ):
         """
         Initialize remote agent connection.
@@ -38,10 +69,10 @@ class RemoteAgentConnections:
         Args:
             agent_card: The agent's card with capabilities
             agent_url: The A2A RPC endpoint URL
-            http_client: Shared httpx async client
+            http_session: Shared aiohttp client session
         """
-        self._httpx_client = http_client
-        self.agent_client = A2AClient(self._httpx_client, agent_card, url=agent_url)
+        self._session = http_session
+        self.agent_url = agent_url
         self.card = agent_card
         self.pending_tasks: set = set()
         logger.info(f"RemoteAgentConnections initialized for {agent_card.name} at {agent_url}")
@@ -63,5 +94,8 @@ class RemoteAgentConnections:
         Returns:
             A2A response containing Task
         """
-        logger.info(f"Sending A2A message to {self.card.name}")
-        return await self.agent_client.send_message(message_request)
+        logger.debug("Sending A2A message to %s", self.card.name)
+        payload = message_request.model_dump(mode="json", exclude_none=True)
+        async with self._session.post(self.agent_url, json=payload) as response:
+            response.raise_for_status()
+            return SendMessageResponse.model_validate(await response.json())
@@ -4,13 +4,20 @@ Utility functions for loading configuration and prompts.
 
 import json
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 
 def load_prompts(yaml_path: str) -> Dict[str, Any]:
     """
     Load prompts and task configurations from YAML file.
+    Parsed results are cached per resolved path; treat them as read-only.
     
     Args:
         yaml_path: Path to YAML file (relative or absolute)
@@ -22,13 +29,17 @@ def load_prompts(yaml_path: str) -> Dict[str, Any]:
         FileNotFoundError: If YAML file doesn't exist
         yaml.YAMLError: If YAML is malformed
     """
-    yaml_file = Path(yaml_path)
-    
+    return _load_prompts_cached(Path(yaml_path).resolve())
+
+
+@lru_cache(maxsize=None)
+def _load_prompts_cached(yaml_file: Path) -> Dict[str, Any]:
+    """Parse a YAML prompts file once per absolute path."""
     if not yaml_file.exists():
-        raise FileNotFoundError(f"Prompts file not found: {yaml_path}")
+        raise FileNotFoundError(f"Prompts file not found: {yaml_file}")
     
     with open(yaml_file, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YamlLoader)
     
     return data
 
@@ -36,6 +47,7 @@ def load_prompts(yaml_path: str) -> Dict[str, Any]:
 def load_config(json_path: str) -> Dict[str, Any]:
     """
     Load configuration from JSON file.
+    Parsed results are cached per resolved path; treat them as read-only.
     
     Args:
         json_path: Path to JSON configuration file
@@ -47,10 +59,14 @@ def load_config(json_path: str) -> Dict[str, Any]:
         FileNotFoundError: If config file doesn't exist
         json.JSONDecodeError: If JSON is malformed
     """
-    config_file = Path(json_path)
-    
+    return _load_config_cached(Path(json_path).resolve())
+
+
+@lru_cache(maxsize=None)
+def _load_config_cached(config_file: Path) -> Dict[str, Any]:
+    """Parse a JSON config file once per absolute path."""
     if not config_file.exists():
-        raise FileNotFoundError(f"Config file not found: {json_path}")
+        raise FileNotFoundError(f"Config file not found: {config_file}")
     
     with open(config_file, 'r', encoding='utf-8') as f:
         config = json.load(f)
@@ -5,7 +5,10 @@ Uses OpenAI ChatGPT models with standardized configurations.
 
 import os
 from enum import Enum
-from typing import Dict
+from functools import lru_cache, partial
+from typing import Dict, Optional
+
+import httpx
 from langchain_openai import ChatOpenAI
 
 
@@ -16,13 +19,16 @@ class MicroserviceModels(Enum):
     TOKEN_INTEL_SERVICE = ["gpt-4o-mini"]
 
 
+@lru_cache(maxsize=None)
 def _make_gpt(model_name: str, **kwargs) -> ChatOpenAI:
     """
     Create a ChatOpenAI instance with standardized configuration.
+    Instances are memoized per (model_name, kwargs), so each process builds
+    one client (and one connection pool) per model configuration.
     
     Args:
         model_name: Model identifier
-        **kwargs: Additional parameters for ChatOpenAI
+        **kwargs: Additional (hashable) parameters for ChatOpenAI
         
     Returns:
         Configured ChatOpenAI instance
@@ -40,17 +46,25 @@ def _make_gpt(model_name: str, **kwargs) -> ChatOpenAI:
 
 # Model builders with pre-configured settings
 MODEL_BUILDERS = {
-    "gpt-4o-mini": lambda: _make_gpt("gpt-4o-mini", temperature=0.0),
-    "gpt-4o": lambda: _make_gpt("gpt-4o", temperature=0.0),
+    "gpt-4o-mini": partial(_make_gpt, "gpt-4o-mini", temperature=0.0),
+    "gpt-4o": partial(_make_gpt, "gpt-4o", temperature=0.0),
 }
 
 
-def init_models(service_name: MicroserviceModels) -> Dict[str, ChatOpenAI]:
+@lru_cache(maxsize=None)
+def init_models(
+    service_name: MicroserviceModels,
+    http_async_client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, ChatOpenAI]:
     """
     Initialize all models for a specific microservice.
+    Results are cached per service, so repeated calls return the same
+    instances; treat the returned dict as read-only.
     
     Args:
         service_name: MicroserviceModels enum member
+        http_async_client: Optional shared httpx client so all models reuse
+            one keep-alive connection pool
         
     Returns:
         Dictionary mapping model names to ChatOpenAI instances
@@ -60,4 +74,6 @@ def init_models(service_name: MicroserviceModels) -> Dict[str, ChatOpenAI]:
         >>> llm = models["gpt-4o-mini"]
     """
     model_keys = service_name.value
-    return {key: MODEL_BUILDERS[key]() for key in model_keys}
+    if http_async_client is None:
+        return {key: MODEL_BUILDERS[key]() for key in model_keys}
+    return {key: MODEL_BUILDERS[key](http_async_client=http_async_client) for key in model_keys}
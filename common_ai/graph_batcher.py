@@ -0,0 +1,262 @@
+"""
+DataLoader-style coalescing of GraphQL queries.
+Queries issued concurrently (from different threads) within a short window are
+merged into one aliased GraphQL document and sent as a single HTTP request.
+"""
+
+import copy
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# query [Name] [($var: Type, ...)] { body }
+_OPERATION_RE = re.compile(r"^\s*query\b\s*\w*\s*(?:\((?P<defs>[^)]*)\))?\s*\{(?P<body>.*)\}\s*$", re.DOTALL)
+_ROOT_FIELD_RE = re.compile(r"^\s*(?P<name>\w+)\s*(?P<rest>[^:\w])", re.DOTALL)
+_VARIABLE_RE = re.compile(r"\$(\w+)")
+# Skip offsets only line up with an id_gt cursor when pages are ordered by id, ascending
+_ORDER_BY_ID_RE = re.compile(r"\borderBy\s*:\s*id\b")
+_ORDER_DESC_RE = re.compile(r"\borderDirection\s*:\s*desc\b")
+
+PostFn = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+
+class GraphQLError(Exception):
+    """The endpoint answered, but rejected the query (response carried ``errors``)."""
+
+
+@lru_cache(maxsize=256)
+def _split_operation(query: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a single-root-field query into (variable definitions, root field name, body).
+    
+    Queries are module-level constants, so each document is scanned once and
+    the result reused for every later batch.
+    
+    Args:
+        query: GraphQL query document
+    
+    Returns:
+        Parts of the operation, or None if the query cannot be merged safely
+        (aliases, fragments, multiple root fields, mutations, ...)
+    """
+    match = _OPERATION_RE.match(query)
+    if not match or "..." in query:
+        return None
+    body = match.group("body")
+    root = _ROOT_FIELD_RE.match(body)
+    if not root:
+        return None
+    
+    # Exactly one root field: the body must end right after its selection set
+    # (braces inside arguments, e.g. where: {...}, are skipped)
+    depth = parens = 0
+    for i, char in enumerate(body):
+        if char == "(":
+            parens += 1
+        elif char == ")":
+            parens -= 1
+        elif parens:
+            continue
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                if body[i + 1:].strip():
+                    return None
+                break
+    else:
+        return None
+    
+    return match.group("defs") or "", root.group("name"), body
+
+
+def build_paged_query(query: str, pages: int) -> Optional[str]:
+    """
+    Turn a cursor-paginated query into one document fetching ``pages`` consecutive pages.
+    
+    Page ``i`` is aliased ``p{i}`` and offset by the ``$skip_{i}`` variable, so a
+    single request returns the pages following the current cursor in order.
+    Only queries ordered by ``id`` ascending qualify: with any other order the
+    skip offsets and the ``id_gt`` cursor disagree and rows are repeated or lost.
+    
+    Args:
+        query: GraphQL query with a single, argument-taking root field
+        pages: Number of pages to request per round trip
+    
+    Returns:
+        Aliased query document, or None if the query cannot be rewritten safely
+    """
+    if not _ORDER_BY_ID_RE.search(query) or _ORDER_DESC_RE.search(query):
+        return None
+    split = _split_operation(query)
+    if split is None:
+        return None
+    defs, root_name, body = split
+    root = _ROOT_FIELD_RE.match(body)
+    if root.group("rest") != "(":
+        return None
+    
+    # Insert the alias and skip argument right after the root field name
+    head_end = root.end("rest")
+    fields = [
+        f"p{i}: {root_name}(skip: $skip_{i}, {body[head_end:].lstrip()}"
+        for i in range(pages)
+    ]
+    skip_defs = ", ".join(f"$skip_{i}: Int!" for i in range(pages))
+    all_defs = f"{defs}, {skip_defs}" if defs.strip() else skip_defs
+    return f"query ({all_defs}) {{\n{''.join(fields)}\n}}"
+
+
+class GraphBatcher:
+    """
+    Coalesces concurrent GraphQL queries into aliased batch requests.
+    
+    The first caller in a window becomes the leader. If other callers are
+    mid-request (and so likely to send their next query shortly) it waits up to
+    ``window_ms`` (or until ``max_batch`` queries are pending); a lone caller is
+    sent at once. The leader merges every pending query into one document and
+    resolves all callers' results. Identical (query, variables) pairs inside a
+    window share one alias.
+    """
+    
+    def __init__(self, post: PostFn, window_ms: float = 10.0, max_batch: int = 8):
+        """
+        Args:
+            post: Callable executing one GraphQL request and returning the response dict
+                (raising GraphQLError on GraphQL errors, any other exception on transport errors)
+            window_ms: How long the leader waits for more queries to join
+            max_batch: Pending query count that triggers an early flush
+        """
+        self.post = post
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, Dict[str, Any], Future]] = []
+        self._leader_active = False
+        # Callers currently inside execute (pending or waiting on a sent batch)
+        self._in_flight = 0
+    
+    def execute(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a query, possibly merged with concurrent ones.
+        
+        Args:
+            query: GraphQL query string
+            variables: Query variables
+        
+        Returns:
+            Response dict shaped as if the query had been sent alone
+        """
+        future: Future = Future()
+        with self._cond:
+            self._in_flight += 1
+            self._pending.append((query, variables, future))
+            is_leader = not self._leader_active
+            if is_leader:
+                self._leader_active = True
+            elif len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+        
+        try:
+            if is_leader:
+                with self._cond:
+                    # Only hold the batch open while someone else may still join it
+                    if self._in_flight > len(self._pending):
+                        self._cond.wait_for(lambda: len(self._pending) >= self.max_batch, timeout=self.window)
+                    batch, self._pending = self._pending, []
+                    self._leader_active = False
+                self._run_batch(batch)
+            
+            return future.result()
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+    
+    def _run_batch(self, batch: List[Tuple[str, Dict[str, Any], Future]]) -> None:
+        """Send a batch (merged when possible) and resolve its futures."""
+        if len(batch) == 1:
+            self._run_single(*batch[0])
+            return
+        
+        # Deduplicate identical requests and split out the ones that cannot be merged
+        groups: Dict[Tuple[str, str], List[Future]] = {}
+        parts: Dict[Tuple[str, str], Tuple[str, str, str, Dict[str, Any]]] = {}
+        for query, variables, future in batch:
+            key = (query, repr(sorted(variables.items())))
+            if key in groups:
+                groups[key].append(future)
+                continue
+            split = _split_operation(query)
+            if split is None:
+                self._run_single(query, variables, future)
+                continue
+            groups[key] = [future]
+            parts[key] = (*split, variables)
+        
+        if not groups:
+            return
+        if len(groups) == 1:
+            (key, futures), = groups.items()
+            self._resolve(futures, lambda: self.post(key[0], parts[key][3]))
+            return
+        
+        merged_defs, merged_fields, merged_vars, aliases = [], [], {}, []
+        for i, (key, (defs, root_name, body, variables)) in enumerate(parts.items()):
+            prefix = f"q{i}_"
+            if defs:
+                merged_defs.append(_VARIABLE_RE.sub(lambda m: f"${prefix}{m.group(1)}", defs))
+            aliased = body.replace(root_name, f"q{i}: {root_name}", 1)
+            merged_fields.append(_VARIABLE_RE.sub(lambda m: f"${prefix}{m.group(1)}", aliased))
+            merged_vars.update({f"{prefix}{name}": value for name, value in variables.items()})
+            aliases.append((f"q{i}", root_name, key))
+        
+        defs_clause = f"({', '.join(merged_defs)})" if merged_defs else ""
+        merged_query = f"query {defs_clause} {{\n{''.join(merged_fields)}\n}}"
+        
+        try:
+            data = self.post(merged_query, merged_vars).get("data") or {}
+        except GraphQLError:
+            # One bad query fails the whole document - retry individually (in
+            # parallel) so each caller gets its own result or error
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                for key, futures in groups.items():
+                    executor.submit(self._resolve, futures, lambda key=key: self.post(key[0], parts[key][3]))
+            return
+        except Exception as e:
+            # Transport failure (already retried by post): re-sending each member
+            # would only multiply requests against a struggling or rate-limiting endpoint
+            for futures in groups.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        
+        for alias, root_name, key in aliases:
+            self._set_results(groups[key], {"data": {root_name: data.get(alias)}})
+    
+    def _run_single(self, query: str, variables: Dict[str, Any], future: Future) -> None:
+        self._resolve([future], lambda: self.post(query, variables))
+    
+    @staticmethod
+    def _resolve(futures: List[Future], call: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            result = call()
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            GraphBatcher._set_results(futures, result)
+    
+    @staticmethod
+    def _set_results(futures: List[Future], result: Dict[str, Any]) -> None:
+        """
+        Resolve deduplicated callers, each with its own copy of the response.
+        
+        Callers mutate their rows in place (e.g. interning addresses), so
+        sharing one response would leak those changes between them.
+        """
+        futures[0].set_result(result)
+        for future in futures[1:]:
+            future.set_result(copy.deepcopy(result))
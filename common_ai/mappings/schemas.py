@@ -3,7 +3,7 @@ Shared Pydantic models for request/response schemas across all services.
 Ensures consistent data structures for inter-service communication.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 
 
@@ -14,8 +14,8 @@ class AgentRequest(BaseModel):
     trace_id: Optional[str] = Field(None, description="Unique trace ID for observability")
     language: str = Field(default="en", description="Response language")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "user_question": "What is the concentration risk?",
                 "pool_address": "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640",
@@ -23,6 +23,7 @@ class AgentRequest(BaseModel):
                 "language": "en"
             }
         }
+    )
 
 
 class AgentResponse(BaseModel):
@@ -32,8 +33,8 @@ class AgentResponse(BaseModel):
     references: Optional[List[Dict[str, Any]]] = Field(default_factory=list, description="Supporting references")
     risk_score: Optional[int] = Field(None, description="Composite risk score (0-100)")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "answer": "The pool has high concentration risk with a Gini coefficient of 0.99.",
                 "metadata": {"agent": "pool_risk", "execution_time": 2.5},
@@ -41,6 +42,7 @@ class AgentResponse(BaseModel):
                 "risk_score": 76
             }
         }
+    )
 
 
 class OrchestratorRequest(BaseModel):
@@ -49,14 +51,15 @@ class OrchestratorRequest(BaseModel):
     pool_address: Optional[str] = Field(None, description="Pool address")
     language: str = Field(default="en", description="Response language")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "query": "Analyze this pool for risks",
                 "pool_address": "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640",
                 "language": "en"
             }
         }
+    )
 
 
 class OrchestratorResponse(BaseModel):
@@ -0,0 +1,34 @@
+"""
+ASGI middleware shared across services.
+"""
+
+from typing import Any, Iterable
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class PathScopedCORSMiddleware:
+    """
+    CORSMiddleware that skips a fixed set of internal paths (e.g. health probes).
+    
+    Exempt requests go straight to the wrapped app, so they pay for neither
+    the origin check nor the CORS header handling.
+    """
+    
+    def __init__(self, app: ASGIApp, exempt_paths: Iterable[str] = (), **cors_options: Any):
+        """
+        Args:
+            app: Wrapped ASGI application
+            exempt_paths: Exact request paths served without CORS handling
+            **cors_options: Keyword arguments forwarded to CORSMiddleware
+        """
+        self.app = app
+        self.cors = CORSMiddleware(app, **cors_options)
+        self.exempt_paths = frozenset(exempt_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] not in self.exempt_paths:
+            await self.cors(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
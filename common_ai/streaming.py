@@ -3,8 +3,10 @@ Streaming response utilities for real-time agent updates.
 """
 
 from enum import Enum
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Dict, Any, Union
+
+import msgspec
 
 
 class StreamingStatus(str, Enum):
@@ -19,13 +21,58 @@ class StreamingMessage(BaseModel):
     """Schema for streaming status updates."""
     status: StreamingStatus = Field(..., description="Current execution status")
     message: str = Field(..., description="Status message or partial response")
-    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional context")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Additional context")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "thinking",
                 "message": "Analyzing pool concentration risk...",
                 "metadata": {"step": 1, "total_steps": 4}
             }
         }
+    )
+
+
+class StreamingChunk(msgspec.Struct):
+    """
+    msgspec twin of StreamingMessage for the per-token hot path.
+    Serializes to the same JSON shape; StreamingMessage remains the
+    documented (OpenAPI) schema.
+    """
+    status: StreamingStatus
+    message: str
+    metadata: Optional[Dict[str, Any]] = None
+
+
+_ENCODER = msgspec.json.Encoder()
+
+
+def dump_streaming_message(message: Union[StreamingMessage, StreamingChunk]) -> str:
+    """
+    Serialize a streaming message to a JSON string.
+    
+    Args:
+        message: StreamingMessage or StreamingChunk
+        
+    Returns:
+        JSON-encoded message
+    """
+    if isinstance(message, StreamingChunk):
+        return _ENCODER.encode(message).decode()
+    return message.model_dump_json()
+
+
+def format_sse(message: Union[StreamingMessage, StreamingChunk], event: Optional[str] = None) -> str:
+    """
+    Frame a streaming message as a Server-Sent Events record.
+    
+    Args:
+        message: Message to send as the event data
+        event: Optional SSE event name (defaults to the unnamed "message" event)
+        
+    Returns:
+        SSE-formatted string terminated by a blank line
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {dump_streaming_message(message)}\n\n"
@@ -8,38 +8,130 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from a2a.server.apps import A2AStarletteApplication
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
-from a2a.types import AgentCard, AgentCapabilities, AgentSkill, DataPart
+from a2a.utils import new_agent_text_message, new_task
+from a2a.types import AgentCard, AgentCapabilities, AgentSkill, DataPart, TaskState
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH, PREV_AGENT_CARD_WELL_KNOWN_PATH
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from collections import deque
+import asyncio
 import logging
-import json
+
+import orjson
+from pydantic import TypeAdapter
 
 from agent.pool_risk_agent import PoolRiskAgent
+from routers.routers import get_agent
+from common_ai.mappings.schemas import AgentRequest
+from common_ai.streaming import StreamingChunk, StreamingStatus, dump_streaming_message
 
 logger = logging.getLogger(__name__)
 
+# Built once: constructing a TypeAdapter compiles the model's validator
+_AGENT_REQUEST_ADAPTER = TypeAdapter(AgentRequest)
+
+# Analysis metadata may carry numpy scalars/arrays and datetimes
+_ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+# Static skeleton of the error payload; only the JSON-encoded strings are substituted
+_ERROR_TEMPLATE = '{{"answer":{answer},"metadata":{{"error":{error}}},"risk_score":0}}'
+
+
+class _BatchingEventQueue:
+    """
+    Coalesces streamed answer tokens into fewer ``working`` status updates.
+    
+    A per-request flusher task publishes the buffered tokens once
+    ``max_tokens`` have accumulated or ``max_delay`` seconds have passed
+    since the first buffered token.
+    """
+    
+    def __init__(self, updater: TaskUpdater, max_tokens: int = 8, max_delay: float = 0.02):
+        self.updater = updater
+        self.max_tokens = max_tokens
+        self.max_delay = max_delay
+        self._buffer: deque = deque()
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closed = False
+        self._flusher = asyncio.create_task(self._run())
+    
+    def put_token(self, token: str) -> None:
+        """Buffer an answer token for the next flush."""
+        self._buffer.append(token)
+        self._pending.set()
+        if len(self._buffer) >= self.max_tokens:
+            self._full.set()
+    
+    async def send(self, update: StreamingChunk) -> None:
+        """Publish a non-token update, flushing buffered tokens first to keep ordering."""
+        await self._flush()
+        await self._publish(update)
+    
+    async def aclose(self) -> None:
+        """Flush remaining tokens and stop the flusher."""
+        self._closed = True
+        self._pending.set()
+        self._full.set()
+        await self._flusher
+    
+    async def _run(self) -> None:
+        while True:
+            await self._pending.wait()
+            if not self._closed and len(self._buffer) < self.max_tokens:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._pending.clear()
+            self._full.clear()
+            await self._flush()
+            if self._closed:
+                return
+    
+    async def _flush(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        await self._publish(StreamingChunk(status=StreamingStatus.RESPONDING, message=text))
+    
+    async def _publish(self, update: StreamingChunk) -> None:
+        await self.updater.update_status(
+            TaskState.working,
+            new_agent_text_message(dump_streaming_message(update), self.updater.context_id, self.updater.task_id)
+        )
+
 
 class PoolRiskAgentExecutor(AgentExecutor):
     """Handles incoming A2A message events and invokes the Pool Risk LangGraph agent."""
 
     def __init__(self):
         """Initialize the agent executor."""
-        self.agent = PoolRiskAgent()
+        # Share the REST singleton so the startup prewarm covers A2A requests too
+        self.agent: PoolRiskAgent = get_agent()
         logger.info("Pool Risk Agent Executor initialized")
     
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         """
         Execute agent request via A2A protocol.
         
+        Progress is published as ``working`` status updates carrying
+        StreamingMessage JSON; the final status message carries the full
+        answer/metadata/risk_score payload.
+        
         Args:
             context: RequestContext with message and metadata
             event_queue: EventQueue for sending responses
         """
+        updater = None
         try:
-            logger.info(f"A2A execute called with context: {context.context_id}")
+            logger.info("A2A execute called with context: %s", context.context_id)
             
             # Extract request from message parts
             part = context.message.parts[0].root  # type: ignore
@@ -56,36 +148,60 @@ class PoolRiskAgentExecutor(AgentExecutor):
                 pool_address = context.message.metadata.get("pool_address") if context.message.metadata else None
                 trace_id = context.message.metadata.get("trace_id") if context.message.metadata else None
             
-            logger.info(f"Processing request: question='{user_question[:50]}...', pool={pool_address}")
+            logger.info("Processing request: question='%.50s...', pool=%s", user_question, pool_address)
             
-            # Create AgentRequest for the agent
-            from common_ai.mappings.schemas import AgentRequest
-            agent_request = AgentRequest(
-                user_question=user_question,
-                pool_address=pool_address,
-                trace_id=trace_id
-            )
+            # Validate the payload at the protocol boundary with the cached adapter
+            agent_request = _AGENT_REQUEST_ADAPTER.validate_python({
+                "user_question": user_question,
+                "pool_address": pool_address,
+                "trace_id": trace_id
+            })
+            
+            task = context.current_task
+            if task is None:
+                task = new_task(context.message)
+                await event_queue.enqueue_event(task)
+            updater = TaskUpdater(event_queue, task.id, task.context_id)
             
-            # Invoke the agent
-            result = await self.agent.invoke(agent_request)
+            # Stream the agent, forwarding progress as (batched) working updates
+            result = None
+            events = _BatchingEventQueue(updater)
+            try:
+                async for item in self.agent.stream(agent_request):
+                    if item["type"] == "result":
+                        result = item["response"]
+                    elif item["type"] == "token":
+                        events.put_token(item["content"])
+                    else:
+                        await events.send(StreamingChunk(
+                            status=StreamingStatus.THINKING,
+                            message=f"Completed step: {item['node']}",
+                            metadata={"node": item["node"]}
+                        ))
+            finally:
+                await events.aclose()
             
             # AgentResponse is a Pydantic model, use model_dump() to serialize
-            response_text = json.dumps({
+            response_text = orjson.dumps({
                 "answer": result.answer,
                 "metadata": result.metadata or {},
                 "risk_score": result.risk_score or 0
-            })
+            }, option=_ORJSON_OPTS).decode()
             
-            await event_queue.enqueue_event(new_agent_text_message(response_text))
+            await updater.complete(new_agent_text_message(response_text, task.context_id, task.id))
             
         except Exception as e:
-            logger.error(f"Pool Risk agent execution failed: {e}")
-            error_response = json.dumps({
-                "answer": f"Error: {str(e)}",
-                "metadata": {"error": str(e)},
-                "risk_score": 0
-            })
-            await event_queue.enqueue_event(new_agent_text_message(error_response))
+            logger.error("Pool Risk agent execution failed: %s", e)
+            error_response = _ERROR_TEMPLATE.format(
+                answer=orjson.dumps(f"Error: {str(e)}").decode(),
+                error=orjson.dumps(str(e)).decode()
+            )
+            if updater is None:
+                await event_queue.enqueue_event(new_agent_text_message(error_response))
+            else:
+                await updater.failed(
+                    new_agent_text_message(error_response, updater.context_id, updater.task_id)
+                )
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         """Cancel is not supported."""
@@ -108,7 +224,7 @@ def build_a2a_app():
         url="http://localhost:8001/a2a",
         version="1.0.0",
         capabilities=AgentCapabilities(
-            streaming=False,
+            streaming=True,
             push_notifications=False,
             state_transition_history=False
         ),
@@ -156,6 +272,18 @@ def build_a2a_app():
     
     # rpc_url is relative to mount point - since we mount at /a2a, use /
     app = server.build(rpc_url='/')
+    
+    # The card is static, so serialize it once and serve the bytes ahead of the
+    # SDK's handler (which re-dumps the model on every discovery hit)
+    agent_card_json = orjson.dumps(
+        agent_card.model_dump(mode="json", exclude_none=True, by_alias=True)
+    )
+    
+    async def get_agent_card(request: Request) -> Response:
+        return Response(content=agent_card_json, media_type="application/json")
+    
+    for path in (AGENT_CARD_WELL_KNOWN_PATH, PREV_AGENT_CARD_WELL_KNOWN_PATH):
+        app.router.routes.insert(0, Route(path, get_agent_card, methods=["GET"]))
     logger.info("A2A application built successfully")
     
     return app
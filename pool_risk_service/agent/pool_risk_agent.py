@@ -10,14 +10,22 @@ Features:
 """
 
 import os
+import socket
 import sys
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import urlparse
 from dotenv import load_dotenv
+from cachetools import TTLCache
+import httpx
 import logging
 
 # Path setup
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+_HERE = Path(__file__).resolve().parent
+CONFIG_PATH = _HERE.parent / "config.json"
+PROMPTS_PATH = _HERE.parent / "workflows" / "rag" / "config" / "tasks.yml"
+sys.path.insert(0, str(_HERE.parent.parent))
 
 from langchain_core.tools import BaseTool
 from common_ai.gpt_family import init_models, MicroserviceModels
@@ -30,6 +38,44 @@ from workflows.rag.plan_execute import PlanExecuteGraph
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# MCP client and tool list shared by every PoolRiskAgent in the process
+_MCP_CLIENT = None
+_MCP_TOOLS: List[BaseTool] = []
+_MCP_LOCK = asyncio.Lock()
+
+# Connection pool settings for MCP HTTP sessions
+_MCP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0)
+
+
+def _mcp_httpx_client(
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None
+) -> httpx.AsyncClient:
+    """
+    httpx client factory for MCP sessions: pooled keep-alive connections,
+    HTTP/2 and a short connect timeout (the long read timeout is kept for tool calls).
+    """
+    timeout = timeout or httpx.Timeout(30.0, read=300.0)
+    return httpx.AsyncClient(
+        headers=headers,
+        auth=auth,
+        timeout=httpx.Timeout(connect=2.0, read=timeout.read, write=timeout.write, pool=timeout.pool),
+        limits=_MCP_LIMITS,
+        http2=True,
+        follow_redirects=True
+    )
+
+
+# Static part of every run's initial graph state
+_INITIAL_STATE_TEMPLATE = {"exit_flag": False}
+
+# (pool_address, user_question, language) - identifies a cacheable analysis
+_RequestKey = Tuple[str, str, str]
+
+# Nodes whose LLM tokens make up the user-facing answer (planning/extraction tokens are not streamed)
+_ANSWER_NODES = frozenset({"synthesize", "synthesize_answer"})
+
 
 class PoolRiskAgent:
     """
@@ -44,21 +90,12 @@ class PoolRiskAgent:
         """Initialize the pool risk agent with MCP tool caching."""
         logger.info("Initializing Pool Risk Agent...")
         
-        # Load configuration
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-        self.config = load_config(config_path)
+        # Load configuration (memoized per path)
+        self.config = load_config(str(CONFIG_PATH))
         logger.info("Configuration loaded")
         
-        # Load prompts
-        prompts_path = os.path.join(
-            os.path.dirname(__file__), 
-            '..', 
-            'workflows', 
-            'rag', 
-            'config', 
-            'tasks.yml'
-        )
-        self.prompts = load_prompts(prompts_path)
+        # Load prompts (memoized per path)
+        self.prompts = load_prompts(str(PROMPTS_PATH))
         logger.info("Prompts loaded")
         
         # Initialize models
@@ -82,6 +119,7 @@ class PoolRiskAgent:
         
         # MCP tool state
         self.mcp_tools: List[BaseTool] = []
+        self._cached_tool_names: Tuple[str, ...] = ()
         self.mcp_available: bool = False
         self.mcp_client = None
         
@@ -89,99 +127,97 @@ class PoolRiskAgent:
         self._init_mcp_tools_sync()
         
         # Get prompts
-        system_prompt = self.prompts["prompts"]["pool_risk_agent"]["system"]
-        planning_prompt = self.prompts["prompts"].get("planning_agent", {}).get(
+        self.system_prompt = self.prompts["prompts"]["pool_risk_agent"]["system"]
+        self.planning_prompt = self.prompts["prompts"].get("planning_agent", {}).get(
             "system", 
             "You are an expert DeFi analyst. Analyze the user's question and decide which risk analysis tools are needed."
         )
         
-        # Build appropriate graph based on MCP availability
-        if self.mcp_available and self.mcp_tools:
-            logger.info("Building Plan-Execute graph with MCP tools")
-            self.graph_instance = PlanExecuteGraph(
-                llm=self.llm,
-                mcp_tools=self.mcp_tools,
-                config=self.config,
-                system_prompt=system_prompt,
-                planning_prompt=planning_prompt
-            )
-        else:
-            logger.info("Building fallback static graph (MCP unavailable)")
-            self.graph_instance = PoolRiskGraph(
-                llm=self.llm,
-                paginator=self.paginator,
-                cache=self.cache,
-                config=self.config,
-                system_prompt=system_prompt
-            )
+        # Serve requests with the static graph right away; the MCP graph is built
+        # by prewarm_mcp() (scheduled at startup) and swapped in once ready
+        logger.info("Building fallback static graph")
+        self._fallback_graph = PoolRiskGraph(
+            llm=self.llm,
+            paginator=self.paginator,
+            cache=self.cache,
+            config=self.config,
+            system_prompt=self.system_prompt
+        )
+        self._mcp_graph: Optional[PlanExecuteGraph] = None
+        self._mcp_graph_lock = asyncio.Lock()
+        self.graph_instance = self._fallback_graph
+        
+        # Recent responses: pool metrics only move every few blocks, so identical
+        # requests within the TTL are answered from memory (REST and A2A alike)
+        self._response_cache: TTLCache = TTLCache(
+            maxsize=1024,
+            ttl=int(os.getenv("INVOKE_TTL_SECONDS", "30"))
+        )
+        # In-flight runs, so concurrent identical requests share one graph execution
+        # (only touched from the event loop, so no lock is needed)
+        self._in_flight: Dict[_RequestKey, "asyncio.Task[AgentResponse]"] = {}
         
         logger.info("LangGraph workflow built successfully")
     
     def _init_mcp_tools_sync(self) -> None:
         """
-        Initialize MCP tools synchronously.
-        Uses httpx to check if MCP server is available.
+        Check MCP server reachability with a plain TCP connect.
+        Tools themselves are loaded by prewarm_mcp() in the background.
         """
-        import httpx
-        
         mcp_url = os.getenv("POOL_RISK_MCP_URL", "http://localhost:8002/mcp")
+        parsed = urlparse(mcp_url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
         
         try:
-            # Try to reach the MCP endpoint directly
-            # FastMCP with streamable-http transport accepts POST at /mcp
-            # Just check if port is reachable
-            response = httpx.post(
-                mcp_url, 
-                json={"jsonrpc": "2.0", "method": "initialize", "id": 1, "params": {}},
-                timeout=5.0,
-                headers={"Content-Type": "application/json"}
-            )
-            # Any response (even error) means server is up
+            with socket.create_connection((parsed.hostname, port), timeout=0.25):
+                pass
             self.mcp_available = True
             self._mcp_url = mcp_url
-            logger.info(f"MCP server available at {mcp_url}, tools will be loaded on first request")
+            logger.info(f"MCP server available at {mcp_url}, tools will be loaded in the background")
             
-        except httpx.ConnectError:
-            logger.warning(f"MCP server not reachable at {mcp_url}")
+        except OSError as e:
+            logger.warning(f"MCP server not reachable at {mcp_url}: {e}")
             self.mcp_available = False
             self.mcp_tools = []
-        except Exception as e:
-            # If we get any other exception but connection worked, MCP is available
-            if "Connection" not in str(type(e).__name__):
-                self.mcp_available = True
-                self._mcp_url = mcp_url
-                logger.info(f"MCP server available at {mcp_url} (probe returned: {type(e).__name__})")
-            else:
-                logger.warning(f"Failed to check MCP server: {e}")
-                self.mcp_available = False
-                self.mcp_tools = []
+            self._cached_tool_names = ()
     
-    async def _init_mcp_tools(self) -> None:
+    async def _init_mcp_tools(self, refresh: bool = False) -> None:
         """
-        Initialize MCP client and cache tools.
-        Fails gracefully if MCP server is unavailable.
+        Initialize the shared MCP client and cache its tools.
+        The client and tool list are created once per process; concurrent
+        callers wait on the same load. Fails gracefully if MCP server is unavailable.
+        
+        Args:
+            refresh: Re-fetch the tool list even if it is already cached
         """
+        global _MCP_CLIENT, _MCP_TOOLS
         mcp_url = os.getenv("POOL_RISK_MCP_URL", "http://localhost:8002/mcp")
         
         try:
-            from langchain_mcp_adapters.client import MultiServerMCPClient
-            
-            logger.info(f"Connecting to MCP server at {mcp_url}...")
-            
-            self.mcp_client = MultiServerMCPClient({
-                "pool_risk": {
-                    "url": mcp_url,
-                    "transport": "http",
-                }
-            })
+            async with _MCP_LOCK:
+                if _MCP_CLIENT is None:
+                    from langchain_mcp_adapters.client import MultiServerMCPClient
+                    
+                    logger.info(f"Connecting to MCP server at {mcp_url}...")
+                    _MCP_CLIENT = MultiServerMCPClient({
+                        "pool_risk": {
+                            "url": mcp_url,
+                            "transport": "http",
+                            "httpx_client_factory": _mcp_httpx_client,
+                        }
+                    })
+                
+                # Load and cache tools
+                if refresh or not _MCP_TOOLS:
+                    _MCP_TOOLS = await _MCP_CLIENT.get_tools()
             
-            # Load and cache tools
-            self.mcp_tools = await self.mcp_client.get_tools()
+            self.mcp_client = _MCP_CLIENT
+            self.mcp_tools = _MCP_TOOLS
+            self._cached_tool_names = tuple(t.name for t in self.mcp_tools)
             
             if self.mcp_tools:
                 self.mcp_available = True
-                tool_names = [t.name for t in self.mcp_tools]
-                logger.info(f"MCP tools cached successfully: {tool_names}")
+                logger.info("MCP tools cached successfully: %s", self._cached_tool_names)
             else:
                 logger.warning("MCP server returned no tools")
                 self.mcp_available = False
@@ -203,7 +239,7 @@ class PoolRiskAgent:
         Returns:
             True if tools were refreshed successfully
         """
-        await self._init_mcp_tools()
+        await self._ensure_mcp_graph(refresh=True)
         return self.mcp_available
     
     @property
@@ -213,81 +249,247 @@ class PoolRiskAgent:
     
     def get_available_tools(self) -> List[str]:
         """Get list of available tool names."""
-        return [t.name for t in self.mcp_tools] if self.mcp_tools else []
+        return list(self._cached_tool_names)
+    
+    async def warmup_llm(self) -> None:
+        """
+        Open the OpenAI connection pool and load the tokenizer ahead of the first request.
+        
+        Meant to be scheduled as a background task at startup; failures are
+        logged and ignored since the first real request will simply retry.
+        """
+        model_name = getattr(self.llm, "model_name", "gpt-4o-mini")
+        try:
+            import tiktoken
+            
+            # First use may download the BPE file, so keep it off the event loop
+            await asyncio.to_thread(tiktoken.encoding_for_model, model_name)
+        except Exception as e:
+            logger.warning("Tokenizer preload failed: %s", e)
+        
+        try:
+            await self.llm.ainvoke([{"role": "user", "content": "ping"}], max_tokens=1)
+            logger.info("LLM connection warmed up")
+        except Exception as e:
+            logger.warning("LLM warmup failed: %s", e)
+    
+    async def prewarm_mcp(self) -> None:
+        """
+        Load MCP tools and compile the Plan-Execute graph off the request path.
+        
+        Meant to be scheduled as a background task at startup; requests keep
+        using the fallback graph until the MCP graph is swapped in.
+        """
+        try:
+            await self._ensure_mcp_graph()
+        except Exception as e:
+            logger.warning(f"MCP prewarm failed, staying on fallback graph: {e}")
+    
+    async def _ensure_mcp_graph(self, refresh: bool = False) -> None:
+        """
+        Load MCP tools if still missing and swap in the MCP graph once they are available.
+        
+        Only called from prewarm_mcp() and refresh_mcp_tools(), never on the request
+        path; the lock keeps a refresh and the startup prewarm from building twice.
+        
+        Args:
+            refresh: Re-fetch the tool list even if it is already cached
+        """
+        async with self._mcp_graph_lock:
+            if refresh:
+                await self._init_mcp_tools(refresh=True)
+            elif self.mcp_available and not self.mcp_tools:
+                logger.info("Loading MCP tools...")
+                await self._init_mcp_tools()
+            
+            # Build the Plan-Execute graph once per tool set, then swap it in atomically
+            if self.mcp_tools and (self._mcp_graph is None or self._mcp_graph.mcp_tools is not self.mcp_tools):
+                self._mcp_graph = PlanExecuteGraph(
+                    llm=self.llm,
+                    mcp_tools=self.mcp_tools,
+                    config=self.config,
+                    system_prompt=self.system_prompt,
+                    planning_prompt=self.planning_prompt
+                )
+                self.graph_instance = self._mcp_graph
+                logger.info("Built graph with MCP tools")
+    
+    def _prepare_run(self, request: AgentRequest) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the initial graph state and run config for a request."""
+        pool_address = request.pool_address
+        trace_id = request.trace_id
+        initial_state = {
+            **_INITIAL_STATE_TEMPLATE,
+            "user_question": request.user_question,
+            "pool_address": pool_address,
+            "trace_id": trace_id,
+            "messages": []  # For MCP tool calling; add_messages needs a fresh list
+        }
+        run_config = {
+            "run_name": "pool-risk-agent",
+            "metadata": {
+                "pool_address": pool_address,
+                "trace_id": trace_id,
+                "mcp_enabled": self.mcp_available
+            }
+        }
+        return initial_state, run_config
+    
+    def _build_response(self, result: Dict[str, Any]) -> AgentResponse:
+        """Convert the graph output into an AgentResponse."""
+        metadata = result.get("metadata") or {}
+        metadata["mcp_available"] = self.mcp_available
+        risk_score = metadata.get("risk_score")
+        
+        # Graph output is produced by us, so skip field validation
+        return AgentResponse.model_construct(
+            answer=result["answer"],
+            metadata=metadata,
+            risk_score=risk_score
+        )
+    
+    @staticmethod
+    def _request_key(request: AgentRequest) -> _RequestKey:
+        """Cache key for a request (pool addresses are case-insensitive)."""
+        return ((request.pool_address or "").lower(), request.user_question, request.language)
+    
+    def _cached_response(self, key: _RequestKey) -> Optional[AgentResponse]:
+        """Return a private copy of a cached response, or None on a miss."""
+        cached = self._response_cache.get(key)
+        return cached.model_copy(deep=True) if cached is not None else None
+    
+    def _finish_run(self, key: _RequestKey, task: "asyncio.Task[AgentResponse]") -> None:
+        """
+        Done-callback of a shared run: forget it, and cache its response on success.
+        
+        Retrieving the exception here keeps a failed run whose callers all went
+        away from being reported as "exception was never retrieved".
+        """
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled():
+            return
+        if task.exception() is None:
+            self._response_cache[key] = task.result()
+    
+    def invalidate(self, pool_address: str) -> int:
+        """
+        Drop cached responses for a pool.
+        
+        Args:
+            pool_address: Pool whose cached analyses should be discarded
+            
+        Returns:
+            Number of evicted cache entries
+        """
+        pool = pool_address.lower()
+        stale = [key for key in list(self._response_cache.keys()) if key[0] == pool]
+        for key in stale:
+            self._response_cache.pop(key, None)
+        return len(stale)
     
     async def invoke(self, request: AgentRequest) -> AgentResponse:
         """
         Invoke the agent with a request.
         
+        Identical requests within the cache TTL are answered from memory, and
+        concurrent identical requests share a single graph run.
+        
         Args:
             request: Agent request with user question and pool address
             
         Returns:
             Agent response with analysis results
         """
-        logger.info(f"Invoking agent for pool: {request.pool_address}")
-        logger.info(f"Question: {request.user_question}")
+        logger.info("Invoking agent for pool: %s", request.pool_address)
+        logger.debug("Question: %s", request.user_question)
         
-        # Lazy load MCP tools on first request if server was available at startup
-        if self.mcp_available and not self.mcp_tools:
-            logger.info("Lazy loading MCP tools on first request...")
-            await self._init_mcp_tools()
-            
-            # If tools loaded successfully, rebuild the graph with MCP
-            if self.mcp_tools:
-                system_prompt = self.prompts["prompts"]["pool_risk_agent"]["system"]
-                planning_prompt = self.prompts["prompts"].get("planning_agent", {}).get(
-                    "system", 
-                    "You are an expert DeFi analyst. Analyze the user's question and decide which risk analysis tools are needed."
-                )
-                self.graph_instance = PlanExecuteGraph(
-                    llm=self.llm,
-                    mcp_tools=self.mcp_tools,
-                    config=self.config,
-                    system_prompt=system_prompt,
-                    planning_prompt=planning_prompt
-                )
-                logger.info("Rebuilt graph with MCP tools")
+        key = self._request_key(request)
+        cached = self._cached_response(key)
+        if cached is not None:
+            logger.info("Serving cached analysis for pool: %s", request.pool_address)
+            return cached
         
-        logger.info(f"MCP available: {self.mcp_available}, Tools loaded: {len(self.mcp_tools)}")
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(request))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish_run(key, t))
+        else:
+            logger.info("Joining in-flight analysis for pool: %s", request.pool_address)
         
+        # Shield so one caller being cancelled does not cancel the shared run
+        response = await asyncio.shield(task)
+        return response.model_copy(deep=True)
+    
+    async def _run(self, request: AgentRequest) -> AgentResponse:
+        """Execute the graph once for a request."""
         try:
-            # Prepare initial state
-            initial_state = {
-                "user_question": request.user_question,
-                "pool_address": request.pool_address,
-                "trace_id": request.trace_id,
-                "exit_flag": False,
-                "messages": []  # For MCP tool calling
-            }
+            initial_state, run_config = self._prepare_run(request)
             
             # Execute LangGraph workflow
-            result = await self.graph_instance.graph.ainvoke(
-                initial_state,
-                config={
-                    "run_name": "pool-risk-agent",
-                    "metadata": {
-                        "pool_address": request.pool_address,
-                        "trace_id": request.trace_id,
-                        "mcp_enabled": self.mcp_available
-                    }
-                }
-            )
+            result = await self.graph_instance.graph.ainvoke(initial_state, config=run_config)
             
             logger.info("LangGraph execution completed")
             
-            # Build response
-            metadata = result.get("metadata", {})
-            metadata["mcp_available"] = self.mcp_available
+            return self._build_response(result)
             
-            response = AgentResponse(
-                answer=result["answer"],
-                metadata=metadata,
-                risk_score=metadata.get("risk_score")
-            )
-            
-            return response
+        except Exception as e:
+            logger.error("Agent invocation failed: %s", e, exc_info=True)
+            raise
+    
+    async def stream(self, request: AgentRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the agent's progress for a request.
+        
+        Yields dicts of the form:
+            {"type": "token", "content": str} - answer tokens as the LLM produces them
+            {"type": "node", "node": str} - a graph step finished
+            {"type": "result", "response": AgentResponse} - final response (always last)
+        
+        Args:
+            request: Agent request with user question and pool address
+        """
+        logger.info("Streaming agent for pool: %s", request.pool_address)
+        
+        # Cached or already running analyses are answered without streaming
+        key = self._request_key(request)
+        if key in self._response_cache or key in self._in_flight:
+            yield {"type": "result", "response": await self.invoke(request)}
+            return
+        
+        initial_state, run_config = self._prepare_run(request)
+        result: Optional[Dict[str, Any]] = None
+        
+        try:
+            async for event in self.graph_instance.graph.astream_events(
+                initial_state,
+                config=run_config,
+                version="v2"
+            ):
+                kind = event["event"]
+                node = event.get("metadata", {}).get("langgraph_node")
+                
+                if kind == "on_chat_model_stream":
+                    if node in _ANSWER_NODES:
+                        content = event["data"]["chunk"].content
+                        if content:
+                            yield {"type": "token", "content": content}
+                elif kind == "on_chain_end":
+                    if not event.get("parent_ids"):
+                        # Root run finished - its output is the graph result
+                        result = event["data"].get("output")
+                    elif event["name"] == node:
+                        yield {"type": "node", "node": node}
             
         except Exception as e:
-            logger.error(f"Agent invocation failed: {str(e)}", exc_info=True)
+            logger.error("Agent streaming failed: %s", e, exc_info=True)
             raise
+        
+        if not isinstance(result, dict):
+            raise RuntimeError("Graph finished without producing an output")
+        
+        logger.info("LangGraph streaming completed")
+        response = self._build_response(result)
+        self._response_cache[key] = response
+        yield {"type": "result", "response": response.model_copy(deep=True)}
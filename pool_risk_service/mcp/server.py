@@ -5,6 +5,7 @@ Exposes risk analyzers via HTTP on port 8002 for dynamic tool discovery.
 
 import os
 import sys
+from typing import Optional
 
 # Add pool_risk_service and project root to path
 _current_dir = os.path.dirname(__file__)
@@ -69,7 +70,7 @@ def analyze_concentration_risk(pool_address: str) -> dict:
 
 
 @mcp.tool()
-def analyze_liquidity_depth(pool_address: str, current_price: float = 1.0) -> dict:
+def analyze_liquidity_depth(pool_address: str, current_price: Optional[float] = None) -> dict:
     """
     Analyze liquidity depth and slippage risk for a pool.
     
@@ -78,7 +79,8 @@ def analyze_liquidity_depth(pool_address: str, current_price: float = 1.0) -> di
     
     Args:
         pool_address: Ethereum address of the Uniswap V3 pool
-        current_price: Current price of token1 in terms of token0
+        current_price: Decimal-adjusted price of token0 in token1 (token1Price); only used
+            when the pool's current tick is unavailable
         
     Returns:
         Dictionary with risk_score, slippage metrics, and liquidity efficiency
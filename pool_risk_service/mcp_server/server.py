@@ -3,16 +3,23 @@ Fast MCP Server for Pool Risk Tools.
 Exposes risk analyzers via HTTP on port 8002 for dynamic tool discovery.
 """
 
+import asyncio
+import copy
 import os
 import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional
 
 # Add pool_risk_service and project root to path
-_current_dir = os.path.dirname(__file__)
-_service_dir = os.path.abspath(os.path.join(_current_dir, '..'))
-_project_root = os.path.abspath(os.path.join(_current_dir, '../..'))
-sys.path.insert(0, _service_dir)
-sys.path.insert(0, _project_root)
-
+_HERE = Path(__file__).resolve().parent
+_service_dir = _HERE.parent
+_project_root = _service_dir.parent
+CONFIG_PATH = _service_dir / "config.json"
+sys.path.insert(0, str(_service_dir))
+sys.path.insert(0, str(_project_root))
+
+from cachetools import TTLCache
 from fastmcp import FastMCP
 from dotenv import load_dotenv
 import logging
@@ -33,8 +40,7 @@ logger = logging.getLogger(__name__)
 mcp = FastMCP("Pool Risk Tools")
 
 # Initialize dependencies
-config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-config = load_config(config_path)
+config = load_config(str(CONFIG_PATH))
 
 api_key = os.getenv("THE_GRAPH_API_KEY")
 if not api_key:
@@ -46,11 +52,53 @@ else:
 paginator = GraphPaginator(endpoint, config)
 cache = CacheManager(config)
 
+# Analyzers are stateless beyond their shared dependencies, so build them once.
+# The analyze_* tools run them in worker threads so concurrent tool calls overlap
+# and their Graph queries get merged by the paginator's GraphBatcher.
+_CONC = ConcentrationRiskAnalyzer(paginator, cache, config)
+_LIQ = LiquidityDepthAnalyzer(paginator, cache, config)
+_MARKET = MarketRiskAnalyzer(paginator, cache, config)
+_BEH = BehavioralRiskAnalyzer(paginator, cache, config)
+_SCORER = RiskScorer(config)
+
+# Short-lived result cache so repeated tool calls for a pool skip The Graph roundtrips
+_CACHE: TTLCache = TTLCache(
+    maxsize=config["cache"].get("tool_result_max_entries", 1024),
+    ttl=config["cache"].get("tool_result_ttl_seconds", 60)
+)
+_CACHE_LOCK = threading.Lock()
+
+
+def _cached_call(key: tuple, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return a cached tool result or compute and store it.
+    
+    The cache keeps its own copy and hands out copies, so a caller mutating its
+    result cannot change what later calls receive.
+    
+    Args:
+        key: Cache key (tool name plus its arguments, pool address lower-cased)
+        compute: Zero-argument callable producing the result
+        
+    Returns:
+        Tool result dict
+    """
+    with _CACHE_LOCK:
+        result = _CACHE.get(key)
+    if result is not None:
+        return copy.deepcopy(result)
+    
+    result = compute()
+    with _CACHE_LOCK:
+        _CACHE[key] = copy.deepcopy(result)
+    return result
+
+
 logger.info("MCP Server initialized with dependencies")
 
 
 @mcp.tool()
-def analyze_concentration_risk(pool_address: str) -> dict:
+async def analyze_concentration_risk(pool_address: str) -> dict:
     """
     Analyze concentration/whale risk for a Uniswap V3 pool.
     
@@ -64,12 +112,18 @@ def analyze_concentration_risk(pool_address: str) -> dict:
         Dictionary with risk_score (0-100), risk_flags, and detailed metrics
     """
     logger.info(f"Analyzing concentration risk for pool: {pool_address}")
-    analyzer = ConcentrationRiskAnalyzer(paginator, cache, config)
-    return analyzer.analyze(pool_address)
+    return await asyncio.to_thread(
+        _cached_call,
+        ("analyze_concentration_risk", pool_address.lower()),
+        lambda: _CONC.analyze(pool_address)
+    )
 
 
 @mcp.tool()
-def analyze_liquidity_depth(pool_address: str, current_price: float = 1.0) -> dict:
+async def analyze_liquidity_depth(
+    pool_address: str,
+    current_price: Optional[float] = None
+) -> dict:
     """
     Analyze liquidity depth and slippage risk for a pool.
     
@@ -78,18 +132,22 @@ def analyze_liquidity_depth(pool_address: str, current_price: float = 1.0) -> di
     
     Args:
         pool_address: Ethereum address of the Uniswap V3 pool
-        current_price: Current price of token1 in terms of token0
+        current_price: Decimal-adjusted price of token0 in token1 (token1Price); only used
+            when the pool's current tick is unavailable
         
     Returns:
         Dictionary with risk_score, slippage metrics, and liquidity efficiency
     """
     logger.info(f"Analyzing liquidity depth for pool: {pool_address}")
-    analyzer = LiquidityDepthAnalyzer(paginator, cache, config)
-    return analyzer.analyze(pool_address, current_price)
+    return await asyncio.to_thread(
+        _cached_call,
+        ("analyze_liquidity_depth", pool_address.lower(), current_price),
+        lambda: _LIQ.analyze(pool_address, current_price)
+    )
 
 
 @mcp.tool()
-def analyze_market_risk(pool_address: str) -> dict:
+async def analyze_market_risk(pool_address: str) -> dict:
     """
     Analyze market risk and impermanent loss exposure.
     
@@ -103,12 +161,15 @@ def analyze_market_risk(pool_address: str) -> dict:
         Dictionary with risk_score, utilization rate, IL risk level
     """
     logger.info(f"Analyzing market risk for pool: {pool_address}")
-    analyzer = MarketRiskAnalyzer(paginator, cache, config)
-    return analyzer.analyze(pool_address)
+    return await asyncio.to_thread(
+        _cached_call,
+        ("analyze_market_risk", pool_address.lower()),
+        lambda: _MARKET.analyze(pool_address)
+    )
 
 
 @mcp.tool()
-def analyze_behavioral_risk(pool_address: str) -> dict:
+async def analyze_behavioral_risk(pool_address: str) -> dict:
     """
     Analyze wash trading and MEV exposure.
     
@@ -122,8 +183,11 @@ def analyze_behavioral_risk(pool_address: str) -> dict:
         Dictionary with risk_score, wash trading index, MEV exposure percentage
     """
     logger.info(f"Analyzing behavioral risk for pool: {pool_address}")
-    analyzer = BehavioralRiskAnalyzer(paginator, cache, config)
-    return analyzer.analyze(pool_address)
+    return await asyncio.to_thread(
+        _cached_call,
+        ("analyze_behavioral_risk", pool_address.lower()),
+        lambda: _BEH.analyze(pool_address)
+    )
 
 
 @mcp.tool()
@@ -149,8 +213,7 @@ def calculate_composite_risk_score(
         Dictionary with composite_score (0-100) and risk_level classification
     """
     logger.info("Calculating composite risk score")
-    scorer = RiskScorer(config)
-    return scorer.score(
+    return _SCORER.score(
         concentration_result,
         liquidity_result,
         market_result,
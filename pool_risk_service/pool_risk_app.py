@@ -3,15 +3,20 @@ Pool Risk Service - FastAPI + A2A Entry Point
 Main application for pool risk analysis microservice.
 """
 
+from contextlib import asynccontextmanager, nullcontext
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 import uvicorn
+import asyncio
 import logging
 import os
 
 # Import routers
-from routers.routers import router, initialize_agent
+from routers.routers import router, initialize_agent, get_agent
+
+from utils import create_graph_client
+from common_ai.middleware import PathScopedCORSMiddleware
 
 # Import A2A app
 from a2a_server.agent_executor import a2a_app
@@ -19,26 +24,67 @@ from a2a_server.agent_executor import a2a_app
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging (LOG_LEVEL=WARNING in production drops per-request INFO records)
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the mounted A2A app's lifespan and initialize the agent, MCP tools and LLM."""
+    logger.info("Pool Risk Service starting up...")
+    logger.info("CORS origins: %s", cors_origins)
+    logger.info("A2A endpoint mounted at /a2a")
+    
+    # Mounted sub-apps' lifespans are not run by Starlette, so nest it here
+    a2a_lifespan = getattr(a2a_app.router, "lifespan_context", None)
+    async with (a2a_lifespan(a2a_app) if a2a_lifespan else nullcontext()):
+        # Pre-initialize agent to cache MCP tools at startup
+        logger.info("Pre-initializing agent and caching MCP tools...")
+        initialize_agent()
+        logger.info("Agent initialization complete")
+        
+        # Long-lived HTTP/2 pool for The Graph, shared by the agent's paginator
+        agent = get_agent()
+        app.state.http_client = create_graph_client(agent.config)
+        agent.paginator.client = app.state.http_client
+        
+        # Load MCP tools and compile the MCP graph in the background so the first
+        # request does not pay for it (requests use the fallback graph until then)
+        app.state.mcp_prewarm = asyncio.create_task(agent.prewarm_mcp())
+        
+        # Pay the TLS handshake / client setup cost before the first user request
+        app.state.llm_warmup = asyncio.create_task(agent.warmup_llm())
+        
+        try:
+            yield
+        finally:
+            logger.info("Pool Risk Service shutting down...")
+            app.state.mcp_prewarm.cancel()
+            app.state.llm_warmup.cancel()
+            await app.state.http_client.aclose()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="Pool Risk Service",
     description="Uniswap V3 liquidity pool risk analysis microservice with MCP tool calling",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
 cors_origins = os.getenv("CORS_ORIGINS", "*")
 if cors_origins:
     origins = cors_origins.split(",") if cors_origins != "*" else ["*"]
+    # Health probes come from load balancers and the backend, not browsers
     app.add_middleware(
-        CORSMiddleware,
+        PathScopedCORSMiddleware,
+        exempt_paths=("/health",),
         allow_origins=origins,
         allow_credentials=True,
         allow_methods=["*"],
@@ -52,25 +98,6 @@ app.include_router(router)
 app.mount("/a2a", a2a_app)
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize resources on startup, including MCP tools."""
-    logger.info("Pool Risk Service starting up...")
-    logger.info(f"CORS origins: {cors_origins}")
-    logger.info("A2A endpoint mounted at /a2a")
-    
-    # Pre-initialize agent to cache MCP tools at startup
-    logger.info("Pre-initializing agent and caching MCP tools...")
-    initialize_agent()
-    logger.info("Agent initialization complete")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup resources on shutdown."""
-    logger.info("Pool Risk Service shutting down...")
-
-
 if __name__ == "__main__":
     port = int(os.getenv("POOL_RISK_PORT", "8001"))
     logger.info(f"Starting Pool Risk Service on port {port}")
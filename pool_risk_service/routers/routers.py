@@ -4,8 +4,10 @@ Defines REST API endpoints for pool risk analysis.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any, List
 from contextlib import asynccontextmanager
+from functools import lru_cache
 import logging
 
 import sys
@@ -19,18 +21,14 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize agent (singleton pattern - cached at startup)
-_agent: PoolRiskAgent = None
-
 
+@lru_cache(maxsize=1)
 def get_agent() -> PoolRiskAgent:
-    """Get or create the pool risk agent instance (with MCP tools cached)."""
-    global _agent
-    if _agent is None:
-        logger.info("Initializing Pool Risk Agent singleton...")
-        _agent = PoolRiskAgent()
-        logger.info(f"Agent initialized. MCP available: {_agent.is_mcp_available}")
-    return _agent
+    """Get or create the pool risk agent instance (singleton, thread-safe via lru_cache)."""
+    logger.info("Initializing Pool Risk Agent singleton...")
+    agent = PoolRiskAgent()
+    logger.info("Agent initialized. MCP available: %s", agent.is_mcp_available)
+    return agent
 
 
 def initialize_agent() -> None:
@@ -38,8 +36,8 @@ def initialize_agent() -> None:
     get_agent()
 
 
-@router.post("/v1/invoke", response_model=AgentResponse)
-async def invoke_agent(request: AgentRequest) -> AgentResponse:
+@router.post("/v1/invoke", response_model=AgentResponse, response_class=ORJSONResponse)
+async def invoke_agent(request: AgentRequest) -> ORJSONResponse:
     """
     Invoke pool risk agent with a query.
     
@@ -53,17 +51,18 @@ async def invoke_agent(request: AgentRequest) -> AgentResponse:
         HTTPException: If analysis fails
     """
     try:
-        logger.info(f"Received request for pool: {request.pool_address}")
-        logger.info(f"Question: {request.user_question}")
+        logger.info("Received request for pool: %s", request.pool_address)
+        logger.debug("Question: %s", request.user_question)
         
-        agent = get_agent()
-        response = await agent.invoke(request)
+        # The agent caches recent responses and coalesces identical concurrent requests
+        response = await get_agent().invoke(request)
         
-        logger.info(f"Analysis completed successfully")
-        return response
+        logger.info("Analysis completed successfully")
+        # Returning the response directly skips FastAPI's response_model re-validation
+        return ORJSONResponse(response.model_dump(mode="json"))
         
     except Exception as e:
-        logger.error(f"Analysis failed: {str(e)}", exc_info=True)
+        logger.error("Analysis failed: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Pool risk analysis failed: {str(e)}"
@@ -71,7 +70,7 @@ async def invoke_agent(request: AgentRequest) -> AgentResponse:
 
 
 @router.get("/health")
-def health_check() -> Dict[str, Any]:
+async def health_check() -> Dict[str, Any]:
     """
     Health check endpoint with MCP status.
     
@@ -92,7 +91,7 @@ def health_check() -> Dict[str, Any]:
 
 
 @router.get("/tools")
-def list_tools() -> Dict[str, Any]:
+async def list_tools() -> Dict[str, Any]:
     """
     List available analysis tools.
     
@@ -126,8 +125,24 @@ async def refresh_tools() -> Dict[str, Any]:
     }
 
 
+@router.post("/invalidate/{pool_address}")
+async def invalidate_pool(pool_address: str) -> Dict[str, Any]:
+    """
+    Drop cached agent responses for a pool.
+    
+    Args:
+        pool_address: Pool whose cached analyses should be discarded
+        
+    Returns:
+        Number of evicted cache entries
+    """
+    invalidated = get_agent().invalidate(pool_address)
+    
+    return {"pool_address": pool_address.lower(), "invalidated": invalidated}
+
+
 @router.get("/")
-def root() -> Dict[str, str]:
+async def root() -> Dict[str, str]:
     """Root endpoint with service information."""
     agent = get_agent()
     
@@ -139,6 +154,7 @@ def root() -> Dict[str, str]:
             "invoke": "POST /v1/invoke",
             "health": "GET /health",
             "tools": "GET /tools",
-            "refresh_tools": "POST /refresh-tools"
+            "refresh_tools": "POST /refresh-tools",
+            "invalidate": "POST /invalidate/{pool_address}"
         }
     }
@@ -0,0 +1,66 @@
+"""
+Fused concentration metrics kernel (Gini, HHI, top-N dominance) over LP liquidity.
+"""
+
+import numpy as np
+
+from tools._jit import NUMBA_AVAILABLE, njit
+
+
+@njit(cache=True)
+def _concentration_loop(liq_sorted_asc: np.ndarray, top_n: int = 10):
+    """
+    Compute concentration metrics in a single pass over ascending-sorted liquidity.
+    
+    HHI ranges from 0 to 10,000:
+    < 1500: Competitive
+    1500-2500: Moderate concentration
+    > 2500: High concentration
+    
+    Args:
+        liq_sorted_asc: Position liquidity values sorted ascending (float64)
+        top_n: Number of top holders for the dominance metric
+        
+    Returns:
+        Tuple of (gini, hhi, top_n_dominance_pct, total_liquidity)
+    """
+    n = liq_sorted_asc.shape[0]
+    total = 0.0
+    sum_sq = 0.0
+    weighted = 0.0
+    top_sum = 0.0
+    top_start = n - top_n
+    
+    for i in range(n):
+        value = liq_sorted_asc[i]
+        total += value
+        sum_sq += value * value
+        weighted += (i + 1) * value
+        if i >= top_start:
+            top_sum += value
+    
+    if n == 0 or total == 0.0:
+        return 0.0, 0.0, 0.0, total
+    
+    gini = (2.0 * weighted) / (n * total) - (n + 1.0) / n
+    hhi = sum_sq / (total * total) * 10000.0
+    top_pct = top_sum / total * 100.0
+    return gini, hhi, top_pct, total
+
+
+def _concentration_numpy(liq_sorted_asc: np.ndarray, top_n: int = 10):
+    """Vectorized equivalent of the fused loop, used when numba is unavailable."""
+    n = liq_sorted_asc.shape[0]
+    total = float(liq_sorted_asc.sum())
+    if n == 0 or total == 0.0:
+        return 0.0, 0.0, 0.0, total
+    
+    weighted = float(np.dot(np.arange(1, n + 1, dtype=np.float64), liq_sorted_asc))
+    gini = (2.0 * weighted) / (n * total) - (n + 1.0) / n
+    hhi = float(np.dot(liq_sorted_asc, liq_sorted_asc)) / (total * total) * 10000.0
+    top_pct = float(liq_sorted_asc[-top_n:].sum()) / total * 100.0
+    return gini, hhi, top_pct, total
+
+
+# A Python-level loop would be slower than NumPy, so only use it when compiled
+concentration_kernel = _concentration_loop if NUMBA_AVAILABLE else _concentration_numpy
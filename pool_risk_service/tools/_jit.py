@@ -0,0 +1,18 @@
+"""
+Optional Numba JIT support for the numeric analyzer kernels.
+When numba is not installed the decorators are no-ops; callers check
+NUMBA_AVAILABLE to pick a vectorized NumPy path instead.
+"""
+
+try:
+    from numba import njit
+    
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the optional "jit" extra
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit supporting both @njit and @njit(...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
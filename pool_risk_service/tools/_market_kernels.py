@@ -0,0 +1,128 @@
+"""
+Fused market metrics kernel (average utilization and price-return correlation) over poolDayData.
+"""
+
+import math
+
+import numpy as np
+from scipy.special import stdtr
+
+from tools._jit import NUMBA_AVAILABLE, njit
+
+
+@njit("UniTuple(f8, 2)(f8[:], f8[:], f8[:], f8[:])", cache=True, fastmath=True)
+def _market_loop(tvl: np.ndarray, volume: np.ndarray, token0_prices: np.ndarray, token1_prices: np.ndarray):
+    """
+    Compute average utilization and Pearson correlation of daily price returns in one pass.
+    
+    Days without TVL are skipped for utilization; days where either price is
+    missing (<= 0) are skipped for returns, which are taken between consecutive
+    days with both prices known.
+    
+    Args:
+        tvl: Daily TVL in USD
+        volume: Daily volume in USD
+        token0_prices: Daily token0 price
+        token1_prices: Daily token1 price
+        
+    Returns:
+        Tuple of (avg_utilization, correlation); correlation is 0.0 when undefined
+    """
+    sum_util = 0.0
+    count_util = 0
+    
+    sum_x = 0.0
+    sum_y = 0.0
+    sum_xy = 0.0
+    sum_xx = 0.0
+    sum_yy = 0.0
+    count = 0
+    prev0 = 0.0
+    prev1 = 0.0
+    
+    for i in range(tvl.shape[0]):
+        if tvl[i] > 0.0:
+            sum_util += volume[i] / tvl[i]
+            count_util += 1
+        
+        p0 = token0_prices[i]
+        p1 = token1_prices[i]
+        if p0 > 0.0 and p1 > 0.0:
+            if prev0 > 0.0:
+                x = (p0 - prev0) / prev0
+                y = (p1 - prev1) / prev1
+                sum_x += x
+                sum_y += y
+                sum_xy += x * y
+                sum_xx += x * x
+                sum_yy += y * y
+                count += 1
+            prev0 = p0
+            prev1 = p1
+    
+    avg_util = sum_util / count_util if count_util else 0.0
+    
+    # At least two returns are needed for a correlation
+    if count < 2:
+        return avg_util, 0.0
+    
+    denominator = (count * sum_xx - sum_x * sum_x) * (count * sum_yy - sum_y * sum_y)
+    if denominator <= 0.0:
+        return avg_util, 0.0
+    return avg_util, (count * sum_xy - sum_x * sum_y) / math.sqrt(denominator)
+
+
+def _market_numpy(tvl: np.ndarray, volume: np.ndarray, token0_prices: np.ndarray, token1_prices: np.ndarray):
+    """Vectorized equivalent of the fused loop, used when numba is unavailable."""
+    # Days without TVL have no meaningful utilization
+    mask = tvl > 0
+    avg_util = float((volume[mask] / tvl[mask]).mean()) if mask.any() else 0.0
+    
+    # Keep only days where both prices are known
+    mask = (token0_prices > 0) & (token1_prices > 0)
+    token0_prices = token0_prices[mask]
+    token1_prices = token1_prices[mask]
+    
+    # At least two returns (three prices) are needed for a correlation
+    if len(token0_prices) < 3:
+        return avg_util, 0.0
+    
+    # Calculate percentage changes, centered for the Pearson formula
+    token0_returns = np.diff(token0_prices) / token0_prices[:-1]
+    token1_returns = np.diff(token1_prices) / token1_prices[:-1]
+    token0_returns -= token0_returns.mean()
+    token1_returns -= token1_returns.mean()
+    
+    # Pearson correlation directly from the two vectors (no 2x2 covariance matrix)
+    denominator = np.sqrt(np.dot(token0_returns, token0_returns) * np.dot(token1_returns, token1_returns))
+    
+    # Zero variance leaves the correlation undefined
+    if not denominator > 0:
+        return avg_util, 0.0
+    return avg_util, float(np.dot(token0_returns, token1_returns) / denominator)
+
+
+# A Python-level loop would be slower than NumPy, so only use it when compiled
+market_metrics = _market_loop if NUMBA_AVAILABLE else _market_numpy
+
+
+def pearson_pvalue(r: float, n: int) -> float:
+    """
+    Two-sided p-value of a Pearson correlation under the null of no correlation.
+    
+    Uses the exact transform t = r * sqrt((n - 2) / (1 - r^2)), which follows
+    Student's t with n - 2 degrees of freedom, instead of a permutation test.
+    
+    Args:
+        r: Pearson correlation coefficient
+        n: Number of paired observations (daily returns)
+        
+    Returns:
+        p-value in [0, 1]; 1.0 when there are too few observations to test
+    """
+    if n < 3:
+        return 1.0
+    if abs(r) >= 1.0:
+        return 0.0
+    t = r * math.sqrt((n - 2) / (1.0 - r * r))
+    return float(2.0 * stdtr(n - 2, -abs(t)))
@@ -0,0 +1,43 @@
+"""
+Fused tick liquidity reduction (total and in-range liquidity) for the liquidity depth analyzer.
+"""
+
+import numpy as np
+
+from tools._jit import NUMBA_AVAILABLE, njit
+
+
+# Serial on purpose: the analyzers call this from worker threads, and numba's
+# default workqueue threading layer aborts on concurrent parallel launches
+@njit(fastmath=True, cache=True)
+def _reduce_ticks_loop(tick_idx: np.ndarray, liquidity_gross: np.ndarray, lower: int, upper: int):
+    """
+    Sum total and in-range liquidity in a single pass over the ticks.
+    
+    Args:
+        tick_idx: Tick indices (int64)
+        liquidity_gross: Non-negative liquidityGross per tick (float64)
+        lower: Lowest tick index counted as active (inclusive)
+        upper: Highest tick index counted as active (inclusive)
+        
+    Returns:
+        Tuple of (total_liquidity, active_liquidity)
+    """
+    total = 0.0
+    active = 0.0
+    for i in range(liquidity_gross.shape[0]):
+        gross = liquidity_gross[i]
+        total += gross
+        if lower <= tick_idx[i] <= upper:
+            active += gross
+    return total, active
+
+
+def _reduce_ticks_numpy(tick_idx: np.ndarray, liquidity_gross: np.ndarray, lower: int, upper: int):
+    """Vectorized equivalent of the fused loop, used when numba is unavailable."""
+    in_range = (tick_idx >= lower) & (tick_idx <= upper)
+    return float(liquidity_gross.sum()), float(liquidity_gross[in_range].sum())
+
+
+# A Python-level loop would be slower than NumPy, so only use it when compiled
+reduce_ticks = _reduce_ticks_loop if NUMBA_AVAILABLE else _reduce_ticks_numpy
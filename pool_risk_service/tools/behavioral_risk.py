@@ -3,10 +3,57 @@ Behavioral Risk Analyzer - Wash Trading & MEV Detection
 Detects inorganic volume and predatory bot activity.
 """
 
-from typing import Dict, Any, List, Set
+import sys
+import numpy as np
+from types import SimpleNamespace
+from typing import Dict, Any, FrozenSet, List, Optional, Set
 from collections import defaultdict
 from utils import GraphPaginator, CacheManager
 
+_SWAPS_QUERY = """
+query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
+  swaps(
+    first: $batch_size
+    where: {
+      pool: $pool_id
+      id_gt: $last_id
+    }
+    orderBy: timestamp
+    orderDirection: desc
+  ) {
+    id
+    sender
+    recipient
+    origin
+    transaction {
+      id
+      blockNumber
+    }
+  }
+}
+"""
+
+
+def _intern_addresses(swaps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Intern the address fields of freshly parsed swaps in place.
+    
+    Recurring addresses (MEV bots, routers) then share one string object,
+    shrinking the swap list and turning hot equality checks into identity checks.
+    
+    Args:
+        swaps: Swap dicts as returned by the subgraph
+        
+    Returns:
+        The same list, for chaining
+    """
+    intern = sys.intern
+    for swap in swaps:
+        swap["sender"] = intern(swap["sender"])
+        swap["recipient"] = intern(swap["recipient"])
+        swap["origin"] = intern(swap["origin"])
+    return swaps
+
 
 class BehavioralRiskAnalyzer:
     """
@@ -24,19 +71,28 @@ class BehavioralRiskAnalyzer:
         self.paginator = paginator
         self.cache = cache
         self.config = config
+        
+        # Risk-flag thresholds resolved once as attributes
+        self._th = SimpleNamespace(**config["risk_thresholds"]["behavioral"])
     
-    def analyze(self, pool_address: str) -> Dict[str, Any]:
+    def analyze(
+        self,
+        pool_address: str,
+        swaps: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Perform behavioral risk analysis on a pool.
         
         Args:
             pool_address: Ethereum address of the Uniswap V3 pool
+            swaps: Prefetched recent swaps (fetched here when omitted)
             
         Returns:
             Dict containing raw metrics and risk flags
         """
         # Fetch last N swaps (fresh, no cache)
-        swaps = self._fetch_recent_swaps(pool_address)
+        if swaps is None:
+            swaps = self._fetch_recent_swaps(pool_address)
         
         if not swaps:
             return {
@@ -47,18 +103,42 @@ class BehavioralRiskAnalyzer:
                 "risk_flags": ["NO_DATA"]
             }
         
+        # Sort all swaps by (block, id) once in C, then group in that order so each
+        # block's list is already ordered by ID (order within block) for both detectors
+        blocks = np.fromiter(
+            (int(s["transaction"]["blockNumber"]) for s in swaps), dtype=np.int64, count=len(swaps)
+        )
+        ids = np.array([s["id"] for s in swaps])
+        order = np.lexsort((ids, blocks))
+        
+        swaps_by_block = defaultdict(list)
+        sorted_swaps = [swaps[i] for i in order]
+        for swap in sorted_swaps:
+            swaps_by_block[swap["transaction"]["blockNumber"]].append(swap)
+        total_swaps = len(swaps)
+        
+        # Column arrays in (block, id) order for the vectorized sandwich scan
+        sorted_blocks = blocks[order]
+        origins = np.array([s["origin"] for s in sorted_swaps])
+        tx_ids = np.array([s["transaction"]["id"] for s in sorted_swaps])
+        
         # Detect wash trading
-        wash_trading_pct, wash_patterns = self._detect_wash_trading(swaps)
+        wash_trading_pct, wash_patterns = self._detect_wash_trading(swaps_by_block, total_swaps)
         
         # Detect sandwich attacks (MEV)
-        mev_exposure_pct, sandwich_victims = self._detect_sandwich_attacks(swaps)
+        mev_exposure_pct, sandwich_victims = self._detect_sandwich_attacks(
+            sorted_blocks, origins, tx_ids, total_swaps
+        )
         
         # Generate risk flags
         risk_flags = self._generate_risk_flags(wash_trading_pct, mev_exposure_pct)
         
+        # Round the reported percentages together
+        wash_rounded, mev_rounded = np.round([wash_trading_pct, mev_exposure_pct], 2).tolist()
+        
         return {
-            "wash_trading_pct": round(wash_trading_pct, 2),
-            "mev_exposure_pct": round(mev_exposure_pct, 2),
+            "wash_trading_pct": wash_rounded,
+            "mev_exposure_pct": mev_rounded,
             "total_swaps_analyzed": len(swaps),
             "wash_trading_patterns": len(wash_patterns),
             "sandwich_victims": len(sandwich_victims),
@@ -72,63 +152,43 @@ class BehavioralRiskAnalyzer:
         Fetch last N swaps (configurable, default 2000).
         Always fresh - no caching.
         """
-        swap_limit = self.config["queries"]["swap_limit"]
-        
-        query = """
-        query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
-          swaps(
-            first: $batch_size
-            where: {
-              pool: $pool_id
-              id_gt: $last_id
-            }
-            orderBy: timestamp
-            orderDirection: desc
-          ) {
-            id
-            timestamp
-            sender
-            recipient
-            origin
-            amount0
-            amount1
-            amountUSD
-            transaction {
-              id
-              blockNumber
-            }
-          }
-        }
-        """
-        
-        variables = {"pool_id": pool_address.lower()}
-        
-        # Fetch up to swap_limit swaps
         all_swaps = self.paginator.fetch_all(
-            query_template=query,
-            variables=variables,
+            query_template=_SWAPS_QUERY,
+            variables={"pool_id": pool_address.lower()},
             entity_name="swaps"
         )
         
         # Limit to configured amount
-        return all_swaps[:swap_limit]
+        return _intern_addresses(all_swaps[:self.config["queries"]["swap_limit"]])
     
-    def _detect_wash_trading(self, swaps: List[Dict[str, Any]]) -> tuple[float, List[Dict[str, Any]]]:
+    async def afetch_recent_swaps(self, pool_address: str) -> List[Dict[str, Any]]:
+        """
+        Fetch last N swaps on the async client (for concurrent prefetching).
+        Always fresh - no caching.
+        """
+        all_swaps = await self.paginator.afetch_all(
+            query_template=_SWAPS_QUERY,
+            variables={"pool_id": pool_address.lower()},
+            entity_name="swaps"
+        )
+        
+        return _intern_addresses(all_swaps[:self.config["queries"]["swap_limit"]])
+    
+    def _detect_wash_trading(
+        self,
+        swaps_by_block: Dict[str, List[Dict[str, Any]]],
+        total: int
+    ) -> tuple[float, List[Dict[str, Any]]]:
         """
         Detect wash trading patterns (circular flows A→B→A).
         
         Args:
-            swaps: List of swap transactions
+            swaps_by_block: Swap transactions grouped by block number
+            total: Total number of swaps analyzed
             
         Returns:
             Tuple of (wash_trading_percentage, list_of_patterns)
         """
-        # Group swaps by block
-        swaps_by_block = defaultdict(list)
-        for swap in swaps:
-            block = swap["transaction"]["blockNumber"]
-            swaps_by_block[block].append(swap)
-        
         suspicious_patterns = []
         suspicious_swap_count = 0
         
@@ -137,96 +197,91 @@ class BehavioralRiskAnalyzer:
             if len(block_swaps) < 2:
                 continue
             
-            # Track sender-recipient flows
-            flows = defaultdict(list)
+            # Track sender-recipient flows (sets give O(1) reverse-edge lookups)
+            flows: Dict[str, Set[str]] = defaultdict(set)
             for swap in block_swaps:
-                sender = swap["sender"]
-                recipient = swap["recipient"]
-                flows[sender].append(recipient)
+                flows[swap["sender"]].add(swap["recipient"])
             
-            # Detect circular patterns
+            # Detect circular patterns, reporting each unordered pair once
+            seen_pairs: Set[FrozenSet[str]] = set()
             for sender, recipients in flows.items():
                 for recipient in recipients:
+                    if sender == recipient:
+                        continue
+                    pair = frozenset((sender, recipient))
+                    if pair in seen_pairs:
+                        continue
                     # Check if recipient also sends back to sender
-                    if sender in flows.get(recipient, []):
+                    if sender in flows.get(recipient, ()):
+                        seen_pairs.add(pair)
                         suspicious_patterns.append({
                             "block": block,
                             "addresses": [sender, recipient],
                             "pattern": "circular"
                         })
-                        suspicious_swap_count += 2  # Both swaps are suspicious
+            suspicious_swap_count += 2 * len(seen_pairs)  # Both swaps of each pair are suspicious
         
-        if not swaps:
+        if not total:
             return 0.0, []
         
-        wash_trading_pct = (suspicious_swap_count / len(swaps)) * 100
+        wash_trading_pct = (suspicious_swap_count / total) * 100
         
         return wash_trading_pct, suspicious_patterns
     
-    def _detect_sandwich_attacks(self, swaps: List[Dict[str, Any]]) -> tuple[float, List[str]]:
+    def _detect_sandwich_attacks(
+        self,
+        blocks: np.ndarray,
+        origins: np.ndarray,
+        tx_ids: np.ndarray,
+        total: int
+    ) -> tuple[float, List[str]]:
         """
         Detect sandwich attack victims.
         Pattern: Same attacker (origin) with swaps before and after victim's swap in same block.
         
         Args:
-            swaps: List of swap transactions
+            blocks: Block number per swap, sorted by (block, id)
+            origins: Transaction origin per swap, in the same order
+            tx_ids: Transaction ID per swap, in the same order
+            total: Total number of swaps analyzed
             
         Returns:
             Tuple of (mev_exposure_percentage, list_of_victim_tx_ids)
         """
-        # Group swaps by block
-        swaps_by_block = defaultdict(list)
-        for swap in swaps:
-            block = swap["transaction"]["blockNumber"]
-            swaps_by_block[block].append(swap)
-        
-        sandwich_victims: Set[str] = set()
-        
-        # Analyze each block
-        for block, block_swaps in swaps_by_block.items():
-            if len(block_swaps) < 3:
-                continue
-            
-            # Sort by transaction ID (represents order within block)
-            sorted_swaps = sorted(block_swaps, key=lambda s: s["id"])
-            
-            # Look for sandwich pattern: same origin appears before and after different txs
-            for i in range(len(sorted_swaps) - 2):
-                swap_before = sorted_swaps[i]
-                middle_swap = sorted_swaps[i + 1]
-                swap_after = sorted_swaps[i + 2]
-                
-                # Check if first and last swap have same origin (attacker)
-                # and middle swap has different origin (victim)
-                if (swap_before["origin"] == swap_after["origin"] and
-                    middle_swap["origin"] != swap_before["origin"]):
-                    sandwich_victims.add(middle_swap["transaction"]["id"])
-        
-        if not swaps:
+        if not total or len(origins) < 3:
             return 0.0, []
         
+        # Sliding window of three consecutive swaps in the same block: first and
+        # last share an origin (attacker), the middle one differs (victim)
+        mask = (
+            (origins[:-2] == origins[2:]) &
+            (origins[1:-1] != origins[:-2]) &
+            (blocks[:-2] == blocks[1:-1]) &
+            (blocks[1:-1] == blocks[2:])
+        )
+        sandwich_victims = np.unique(tx_ids[1:-1][mask]).tolist()
+        
         # Count unique victim transactions
-        mev_exposure_pct = (len(sandwich_victims) / len(swaps)) * 100
+        mev_exposure_pct = (len(sandwich_victims) / total) * 100
         
-        return mev_exposure_pct, list(sandwich_victims)
+        return mev_exposure_pct, sandwich_victims
     
     def _generate_risk_flags(self, wash_trading_pct: float, mev_exposure_pct: float) -> List[str]:
         """
         Generate risk flags based on thresholds.
         """
         flags = []
-        thresholds = self.config["risk_thresholds"]["behavioral"]
         
         # Wash trading checks
-        if wash_trading_pct > thresholds["wash_trading_critical_pct"]:
+        if wash_trading_pct > self._th.wash_trading_critical_pct:
             flags.append("CRITICAL_WASH_TRADING")
-        elif wash_trading_pct > thresholds["wash_trading_high_pct"]:
+        elif wash_trading_pct > self._th.wash_trading_high_pct:
             flags.append("HIGH_WASH_TRADING")
         
         # MEV exposure checks
-        if mev_exposure_pct > thresholds["mev_exposure_critical_pct"]:
+        if mev_exposure_pct > self._th.mev_exposure_critical_pct:
             flags.append("CRITICAL_MEV_EXPOSURE")
-        elif mev_exposure_pct > thresholds["mev_exposure_high_pct"]:
+        elif mev_exposure_pct > self._th.mev_exposure_high_pct:
             flags.append("HIGH_MEV_EXPOSURE")
         
         return flags if flags else ["LOW_RISK"]
@@ -4,8 +4,31 @@ Calculates Gini coefficient, HHI, Top 10 dominance, and LP age distribution.
 """
 
 import numpy as np
-from typing import Dict, Any, List
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple
 from utils import GraphPaginator, CacheManager
+from tools._concentration_kernels import concentration_kernel
+
+_POSITIONS_QUERY = """
+query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
+  positions(
+    first: $batch_size
+    where: {
+      pool: $pool_id
+      liquidity_gt: "0"
+      id_gt: $last_id
+    }
+    orderBy: id
+    orderDirection: asc
+  ) {
+    id
+    liquidity
+    transaction {
+      timestamp
+    }
+  }
+}
+"""
 
 
 class ConcentrationRiskAnalyzer:
@@ -24,21 +47,52 @@ class ConcentrationRiskAnalyzer:
         self.paginator = paginator
         self.cache = cache
         self.config = config
+        
+        # Risk-flag thresholds resolved once as attributes
+        self._th = SimpleNamespace(**config["risk_thresholds"]["concentration"])
     
-    def analyze(self, pool_address: str) -> Dict[str, Any]:
+    def analyze(
+        self,
+        pool_address: str,
+        positions: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Perform concentration risk analysis on a pool.
         
         Args:
             pool_address: Ethereum address of the Uniswap V3 pool
+            positions: Prefetched positions (fetched here when omitted)
             
         Returns:
             Dict containing raw metrics and risk flags
         """
         # Fetch all positions with liquidity > 0
-        positions = self._fetch_positions(pool_address)
+        if positions is None:
+            positions = self._fetch_positions(pool_address)
+        
+        # Structure-of-arrays view of the positions, built in one pass each
+        count = len(positions)
+        liquidity_values = np.fromiter(
+            (float(p["liquidity"]) for p in positions), dtype=np.float64, count=count
+        )
+        timestamps = np.fromiter(
+            (int(p["transaction"]["timestamp"]) for p in positions), dtype=np.int64, count=count
+        )
+        
+        return self.analyze_arrays(liquidity_values, timestamps)
+    
+    def analyze_arrays(self, liquidity_values: np.ndarray, timestamps: np.ndarray) -> Dict[str, Any]:
+        """
+        Perform concentration risk analysis on position columns.
         
-        if not positions:
+        Args:
+            liquidity_values: Liquidity per position (float64)
+            timestamps: Creation timestamp per position, aligned with ``liquidity_values``
+            
+        Returns:
+            Dict containing raw metrics and risk flags
+        """
+        if len(liquidity_values) == 0:
             return {
                 "error": "No positions found for this pool",
                 "gini": None,
@@ -48,25 +102,25 @@ class ConcentrationRiskAnalyzer:
                 "risk_flags": ["NO_DATA"]
             }
         
-        # Extract liquidity values
-        liquidity_values = [float(p["liquidity"]) for p in positions]
-        total_liquidity = sum(liquidity_values)
+        # Sorted copy for the fused kernel (the unsorted array stays aligned with timestamps)
+        sorted_liquidity = np.sort(liquidity_values)
         
-        # Calculate metrics
-        gini = self._calculate_gini(liquidity_values)
-        hhi = self._calculate_hhi(liquidity_values, total_liquidity)
-        top10_dominance = self._calculate_top_n_dominance(liquidity_values, total_liquidity, 10)
-        lp_age_dist = self._calculate_lp_age_distribution(positions)
+        # Calculate metrics (Gini, HHI and top-10 dominance in one pass)
+        gini, hhi, top10_dominance, _ = concentration_kernel(sorted_liquidity, 10)
+        lp_age_dist = self._calculate_lp_age_distribution(liquidity_values, timestamps)
         
         # Generate risk flags
         risk_flags = self._generate_risk_flags(gini, hhi, top10_dominance, lp_age_dist)
         
+        # Round the 2-decimal metrics together (Gini keeps 4 decimals)
+        hhi_rounded, top10_rounded = np.round([hhi, top10_dominance], 2).tolist()
+        
         return {
             "gini_coefficient": round(gini, 4),
-            "herfindahl_hirschman_index": round(hhi, 2),
-            "top10_dominance_pct": round(top10_dominance, 2),
+            "herfindahl_hirschman_index": hhi_rounded,
+            "top10_dominance_pct": top10_rounded,
             "lp_age_distribution": lp_age_dist,
-            "total_positions": len(positions),
+            "total_positions": len(liquidity_values),
             "risk_flags": risk_flags,
             "risk_score": self._calculate_risk_score(gini, hhi, top10_dominance)
         }
@@ -75,114 +129,53 @@ class ConcentrationRiskAnalyzer:
         """
         Fetch all positions for a pool using pagination.
         """
-        query = """
-        query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
-          positions(
-            first: $batch_size
-            where: {
-              pool: $pool_id
-              liquidity_gt: "0"
-              id_gt: $last_id
-            }
-            orderBy: id
-            orderDirection: asc
-          ) {
-            id
-            owner
-            liquidity
-            transaction {
-              timestamp
-            }
-          }
-        }
-        """
-        
-        variables = {"pool_id": pool_address.lower()}
-        
         return self.paginator.fetch_all(
-            query_template=query,
-            variables=variables,
+            query_template=_POSITIONS_QUERY,
+            variables={"pool_id": pool_address.lower()},
             entity_name="positions"
         )
     
-    def _calculate_gini(self, values: List[float]) -> float:
-        """
-        Calculate Gini coefficient (0 = perfect equality, 1 = perfect inequality).
-        
-        Args:
-            values: List of liquidity values
-            
-        Returns:
-            Gini coefficient
+    async def afetch_position_arrays(self, pool_address: str) -> Tuple[np.ndarray, np.ndarray]:
         """
-        if not values:
-            return 0.0
-        
-        # Sort values
-        sorted_values = np.sort(values)
-        n = len(sorted_values)
-        
-        # Calculate cumulative sum
-        cumsum = np.cumsum(sorted_values)
+        Stream positions on the async client straight into NumPy columns.
         
-        # Gini formula
-        gini = (2 * np.sum((np.arange(1, n + 1)) * sorted_values)) / (n * cumsum[-1]) - (n + 1) / n
-        
-        return gini
-    
-    def _calculate_hhi(self, values: List[float], total: float) -> float:
-        """
-        Calculate Herfindahl-Hirschman Index (market concentration).
-        HHI ranges from 0 to 10,000.
-        < 1500: Competitive
-        1500-2500: Moderate concentration
-        > 2500: High concentration
+        Each page is copied into growable buffers as it arrives and then dropped,
+        so peak memory stays near one page of dicts regardless of pool size.
         
         Args:
-            values: List of liquidity values
-            total: Total liquidity
+            pool_address: Ethereum address of the Uniswap V3 pool
             
         Returns:
-            HHI score
+            Tuple of (liquidity, timestamps) arrays, aligned per position
         """
-        if total == 0:
-            return 0.0
-        
-        # Calculate market shares (as percentages)
-        market_shares = [(v / total) * 100 for v in values]
-        
-        # HHI = sum of squared market shares
-        hhi = sum(share ** 2 for share in market_shares)
+        liquidity = np.empty(4096, dtype=np.float64)
+        timestamps = np.empty(4096, dtype=np.int64)
+        size = 0
         
-        return hhi
-    
-    def _calculate_top_n_dominance(self, values: List[float], total: float, n: int) -> float:
-        """
-        Calculate percentage of total held by top N holders.
-        
-        Args:
-            values: List of liquidity values
-            total: Total liquidity
-            n: Number of top holders to consider
+        async for page in self.paginator.afetch_iter(
+            query_template=_POSITIONS_QUERY,
+            variables={"pool_id": pool_address.lower()},
+            entity_name="positions"
+        ):
+            end = size + len(page)
+            if end > len(liquidity):
+                capacity = max(end, 2 * len(liquidity))
+                liquidity = np.resize(liquidity, capacity)
+                timestamps = np.resize(timestamps, capacity)
             
-        Returns:
-            Percentage held by top N (0-100)
-        """
-        if total == 0:
-            return 0.0
-        
-        # Sort descending and take top N
-        sorted_values = sorted(values, reverse=True)
-        top_n_sum = sum(sorted_values[:n])
+            liquidity[size:end] = [float(p["liquidity"]) for p in page]
+            timestamps[size:end] = [int(p["transaction"]["timestamp"]) for p in page]
+            size = end
         
-        return (top_n_sum / total) * 100
+        return liquidity[:size], timestamps[:size]
     
-    def _calculate_lp_age_distribution(self, positions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_lp_age_distribution(self, liquidity: np.ndarray, timestamps: np.ndarray) -> Dict[str, Any]:
         """
         Classify LP positions by age (mercenary vs long-term).
         
         Args:
-            positions: List of position dicts with transaction timestamps
+            liquidity: Position liquidity values
+            timestamps: Position creation timestamps, aligned with ``liquidity``
             
         Returns:
             Dict with age distribution stats
@@ -194,41 +187,41 @@ class ConcentrationRiskAnalyzer:
         mercenary_threshold = self.config["queries"]["lp_age_thresholds_days"]["mercenary"] * 86400
         long_term_threshold = self.config["queries"]["lp_age_thresholds_days"]["long_term"] * 86400
         
-        mercenary_count = 0
-        medium_count = 0
-        long_term_count = 0
-        mercenary_liquidity = 0.0
-        medium_liquidity = 0.0
-        long_term_liquidity = 0.0
-        
-        for pos in positions:
-            age_seconds = current_time - int(pos["transaction"]["timestamp"])
-            liquidity = float(pos["liquidity"])
-            
-            if age_seconds < mercenary_threshold:
-                mercenary_count += 1
-                mercenary_liquidity += liquidity
-            elif age_seconds < long_term_threshold:
-                medium_count += 1
-                medium_liquidity += liquidity
-            else:
-                long_term_count += 1
-                long_term_liquidity += liquidity
-        
-        total_liquidity = mercenary_liquidity + medium_liquidity + long_term_liquidity
+        # Boolean masks per age bucket replace the per-position loop
+        ages = current_time - timestamps
+        mercenary_mask = ages < mercenary_threshold
+        long_term_mask = ages >= long_term_threshold
+        medium_mask = ~(mercenary_mask | long_term_mask)
+        
+        mercenary_count = int(np.count_nonzero(mercenary_mask))
+        medium_count = int(np.count_nonzero(medium_mask))
+        long_term_count = int(np.count_nonzero(long_term_mask))
+        bucket_liquidity = np.array([
+            liquidity[mercenary_mask].sum(),
+            liquidity[medium_mask].sum(),
+            liquidity[long_term_mask].sum()
+        ])
+        
+        # Liquidity share per bucket, rounded in one vectorized call
+        total_liquidity = bucket_liquidity.sum()
+        if total_liquidity > 0:
+            bucket_pct = np.round(bucket_liquidity / total_liquidity * 100, 2).tolist()
+        else:
+            bucket_pct = [0, 0, 0]
+        mercenary_pct, medium_pct, long_term_pct = bucket_pct
         
         return {
             "mercenary": {
                 "count": mercenary_count,
-                "liquidity_pct": round((mercenary_liquidity / total_liquidity * 100) if total_liquidity > 0 else 0, 2)
+                "liquidity_pct": mercenary_pct
             },
             "medium_term": {
                 "count": medium_count,
-                "liquidity_pct": round((medium_liquidity / total_liquidity * 100) if total_liquidity > 0 else 0, 2)
+                "liquidity_pct": medium_pct
             },
             "long_term": {
                 "count": long_term_count,
-                "liquidity_pct": round((long_term_liquidity / total_liquidity * 100) if total_liquidity > 0 else 0, 2)
+                "liquidity_pct": long_term_pct
             }
         }
     
@@ -243,24 +236,23 @@ class ConcentrationRiskAnalyzer:
         Generate risk flags based on thresholds.
         """
         flags = []
-        thresholds = self.config["risk_thresholds"]["concentration"]
         
         # Top 10 dominance checks
-        if top10_dominance > thresholds["top10_dominance_critical_pct"]:
+        if top10_dominance > self._th.top10_dominance_critical_pct:
             flags.append("CRITICAL_TOP10_DOMINANCE")
-        elif top10_dominance > thresholds["top10_dominance_high_risk_pct"]:
+        elif top10_dominance > self._th.top10_dominance_high_risk_pct:
             flags.append("HIGH_TOP10_DOMINANCE")
         
         # Gini coefficient checks
-        if gini > thresholds["gini_critical"]:
+        if gini > self._th.gini_critical:
             flags.append("CRITICAL_GINI")
-        elif gini > thresholds["gini_high_risk"]:
+        elif gini > self._th.gini_high_risk:
             flags.append("HIGH_GINI")
         
         # HHI checks
-        if hhi > thresholds["hhi_critical"]:
+        if hhi > self._th.hhi_critical:
             flags.append("CRITICAL_HHI")
-        elif hhi > thresholds["hhi_high_risk"]:
+        elif hhi > self._th.hhi_high_risk:
             flags.append("HIGH_HHI")
         
         # Mercenary liquidity check
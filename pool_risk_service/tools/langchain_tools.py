@@ -3,11 +3,19 @@ LangChain tool implementations for the Graph Analysis Agent.
 
 """
 
-import json
 from typing import Any, Dict, List, Optional, Type
+import orjson
 from pydantic import BaseModel, Field
 from langchain_core.tools import BaseTool
 
+from utils import PoolMetaFetcher
+from tools.concentration_risk import ConcentrationRiskAnalyzer
+from tools.liquidity_depth_risk import LiquidityDepthAnalyzer
+from tools.market_risk import MarketRiskAnalyzer
+from tools.behavioral_risk import BehavioralRiskAnalyzer
+from tools.report_generator import ReportGenerator
+from tools.pipeline import ScoreCache, run_full_risk
+
 
 # ============================================================================
 # Input Schemas (Pydantic models for tool arguments)
@@ -29,7 +37,7 @@ class PoolAnalysisInput(BaseModel):
     )
     current_price: Optional[float] = Field(
         default=None,
-        description="Current price (token1/token0). If not provided, will be fetched."
+        description="Current decimal-adjusted price (token1/token0). Optional: the pool's current tick is used when available."
     )
 
 
@@ -39,11 +47,51 @@ class ReportInput(BaseModel):
     include_raw_data: bool = Field(default=False, description="Include raw JSON data in output")
 
 
+# ============================================================================
+# Shared Helpers
+# ============================================================================
+
+# Analyzer results may carry NumPy scalars and non-string keys, which json.dumps
+# would choke on or stringify slowly
+_JSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize a tool result to a JSON string with orjson."""
+    return orjson.dumps(obj, option=_JSON_OPTS | orjson.OPT_INDENT_2 if indent else _JSON_OPTS).decode()
+
+
+class PoolMetaMixin:
+    """
+    Pool metadata lookups shared by the tools that need the current tick or pool info.
+    
+    Expects ``paginator`` and ``pool_meta`` fields on the tool. The injected
+    PoolMetaFetcher memoizes each pool (cache.pool_meta_ttl_seconds), so sequential tool calls
+    in a session share one query.
+    """
+    
+    def _pool_meta(self) -> PoolMetaFetcher:
+        """Return the tool's pool metadata fetcher, creating one if none was injected."""
+        if self.pool_meta is None:
+            self.pool_meta = PoolMetaFetcher(self.paginator)
+        return self.pool_meta
+    
+    def _fetch_pool_info(self, pool_address: str) -> Dict[str, Any]:
+        """Fetch pool info, or a dict with an "error" key on failure."""
+        try:
+            pool = self._pool_meta().fetch(pool_address)
+            if not pool:
+                return {"error": "Pool not found"}
+            return pool
+        except Exception as e:
+            return {"error": str(e)}
+
+
 # ============================================================================
 # Tool Implementations
 # ============================================================================
 
-class FetchPoolInfoTool(BaseTool):
+class FetchPoolInfoTool(PoolMetaMixin, BaseTool):
     """Tool to fetch basic pool information from The Graph."""
     
     name: str = "fetch_pool_info"
@@ -58,33 +106,15 @@ class FetchPoolInfoTool(BaseTool):
     
     # Injected dependencies
     paginator: Any = Field(default=None, repr=False)
+    pool_meta: Any = Field(default=None, repr=False)
     
     def _run(self, pool_address: str) -> str:
         """Fetch pool info and return as JSON string."""
-        query = """
-        query ($pool_id: String!) {
-          pool(id: $pool_id) {
-            id
-            token0 { symbol id decimals }
-            token1 { symbol id decimals }
-            feeTier
-            liquidity
-            totalValueLockedUSD
-            volumeUSD
-            token0Price
-            token1Price
-            txCount
-          }
-        }
-        """
-        
         try:
-            variables = {"pool_id": pool_address.lower()}
-            response = self.paginator._execute_with_retry(query, variables)
-            pool = response.get("data", {}).get("pool")
+            pool = self._pool_meta().fetch(pool_address)
             
             if not pool:
-                return json.dumps({
+                return _dumps({
                     "error": "Pool not found in Uniswap V3 subgraph",
                     "pool_address": pool_address,
                     "suggestion": "Verify this is a valid Uniswap V3 pool address on Ethereum mainnet. Check on https://info.uniswap.org/#/pools",
@@ -103,10 +133,10 @@ class FetchPoolInfoTool(BaseTool):
                 "token1_price": float(pool["token1Price"]),
                 "tx_count": int(pool["txCount"]),
             }
-            return json.dumps(result, indent=2)
+            return _dumps(result, indent=True)
             
         except Exception as e:
-            return json.dumps({
+            return _dumps({
                 "error": f"Failed to fetch pool data: {str(e)}",
                 "pool_address": pool_address,
                 "suggestion": "Check your internet connection and The Graph API key"
@@ -132,14 +162,12 @@ class AnalyzeConcentrationTool(BaseTool):
     
     def _run(self, pool_address: str) -> str:
         """Run concentration analysis and return JSON."""
-        from tools.concentration_risk import ConcentrationRiskAnalyzer
-        
         analyzer = ConcentrationRiskAnalyzer(self.paginator, self.cache, self.config)
         result = analyzer.analyze(pool_address)
-        return json.dumps(result, indent=2)
+        return _dumps(result, indent=True)
 
 
-class AnalyzeLiquidityDepthTool(BaseTool):
+class AnalyzeLiquidityDepthTool(PoolMetaMixin, BaseTool):
     """Tool to analyze liquidity depth and slippage risk."""
     
     name: str = "analyze_liquidity_depth"
@@ -154,31 +182,14 @@ class AnalyzeLiquidityDepthTool(BaseTool):
     paginator: Any = Field(default=None, repr=False)
     cache: Any = Field(default=None, repr=False)
     config: Dict[str, Any] = Field(default_factory=dict, repr=False)
+    pool_meta: Any = Field(default=None, repr=False)
     
     def _run(self, pool_address: str, current_price: Optional[float] = None) -> str:
         """Run liquidity analysis and return JSON."""
-        from tools.liquidity_depth_risk import LiquidityDepthAnalyzer
-        
-        # If no price provided, fetch it
-        if current_price is None:
-            current_price = self._fetch_price(pool_address)
-        
-        analyzer = LiquidityDepthAnalyzer(self.paginator, self.cache, self.config)
+        # The analyzer anchors on the pool's current tick (shared metadata cache)
+        analyzer = LiquidityDepthAnalyzer(self.paginator, self.cache, self.config, self._pool_meta())
         result = analyzer.analyze(pool_address, current_price)
-        return json.dumps(result, indent=2)
-    
-    def _fetch_price(self, pool_address: str) -> float:
-        """Fetch current price from pool."""
-        query = """
-        query ($pool_id: String!) {
-          pool(id: $pool_id) { token1Price }
-        }
-        """
-        try:
-            response = self.paginator._execute_with_retry(query, {"pool_id": pool_address.lower()})
-            return float(response.get("data", {}).get("pool", {}).get("token1Price", 1))
-        except:
-            return 1.0
+        return _dumps(result, indent=True)
 
 
 class AnalyzeMarketRiskTool(BaseTool):
@@ -199,11 +210,9 @@ class AnalyzeMarketRiskTool(BaseTool):
     
     def _run(self, pool_address: str) -> str:
         """Run market risk analysis and return JSON."""
-        from tools.market_risk import MarketRiskAnalyzer
-        
         analyzer = MarketRiskAnalyzer(self.paginator, self.cache, self.config)
         result = analyzer.analyze(pool_address)
-        return json.dumps(result, indent=2)
+        return _dumps(result, indent=True)
 
 
 class AnalyzeBehavioralRiskTool(BaseTool):
@@ -224,14 +233,12 @@ class AnalyzeBehavioralRiskTool(BaseTool):
     
     def _run(self, pool_address: str) -> str:
         """Run behavioral analysis and return JSON."""
-        from tools.behavioral_risk import BehavioralRiskAnalyzer
-        
         analyzer = BehavioralRiskAnalyzer(self.paginator, self.cache, self.config)
         result = analyzer.analyze(pool_address)
-        return json.dumps(result, indent=2)
+        return _dumps(result, indent=True)
 
 
-class CalculateRiskScoreTool(BaseTool):
+class CalculateRiskScoreTool(PoolMetaMixin, BaseTool):
     """Tool to calculate composite risk score."""
     
     name: str = "calculate_risk_score"
@@ -250,54 +257,20 @@ class CalculateRiskScoreTool(BaseTool):
     paginator: Any = Field(default=None, repr=False)
     cache: Any = Field(default=None, repr=False)
     config: Dict[str, Any] = Field(default_factory=dict, repr=False)
+    pool_meta: Any = Field(default=None, repr=False)
+    score_cache: Any = Field(default=None, repr=False)
     
     def _run(self, pool_address: str) -> str:
         """Run all analyses and calculate composite score."""
-        from tools.concentration_risk import ConcentrationRiskAnalyzer
-        from tools.liquidity_depth_risk import LiquidityDepthAnalyzer
-        from tools.market_risk import MarketRiskAnalyzer
-        from tools.behavioral_risk import BehavioralRiskAnalyzer
-        from tools.risk_scorer import RiskScorer
-        
-        # Fetch current price first
-        current_price = self._fetch_price(pool_address)
-        
-        # Run all analyses
-        concentration_analyzer = ConcentrationRiskAnalyzer(self.paginator, self.cache, self.config)
-        liquidity_analyzer = LiquidityDepthAnalyzer(self.paginator, self.cache, self.config)
-        market_analyzer = MarketRiskAnalyzer(self.paginator, self.cache, self.config)
-        behavioral_analyzer = BehavioralRiskAnalyzer(self.paginator, self.cache, self.config)
-        
-        concentration_result = concentration_analyzer.analyze(pool_address)
-        liquidity_result = liquidity_analyzer.analyze(pool_address, current_price)
-        market_result = market_analyzer.analyze(pool_address)
-        behavioral_result = behavioral_analyzer.analyze(pool_address)
-        
-        # Calculate score
-        scorer = RiskScorer(self.config)
-        result = scorer.score(
-            concentration_result,
-            liquidity_result,
-            market_result,
-            behavioral_result
+        # Run all analyses (the pool metadata fetch overlaps with the analyzers that don't need it)
+        result = run_full_risk(
+            pool_address, self.paginator, self.cache, self.config, self._pool_meta(),
+            self.score_cache
         )
-        return json.dumps(result, indent=2)
-    
-    def _fetch_price(self, pool_address: str) -> float:
-        """Fetch current price from pool."""
-        query = """
-        query ($pool_id: String!) {
-          pool(id: $pool_id) { token1Price }
-        }
-        """
-        try:
-            response = self.paginator._execute_with_retry(query, {"pool_id": pool_address.lower()})
-            return float(response.get("data", {}).get("pool", {}).get("token1Price", 1))
-        except:
-            return 1.0
+        return _dumps(result, indent=True)
 
 
-class GenerateReportTool(BaseTool):
+class GenerateReportTool(PoolMetaMixin, BaseTool):
     """Tool to generate comprehensive markdown report."""
     
     name: str = "generate_report"
@@ -318,41 +291,20 @@ class GenerateReportTool(BaseTool):
     paginator: Any = Field(default=None, repr=False)
     cache: Any = Field(default=None, repr=False)
     config: Dict[str, Any] = Field(default_factory=dict, repr=False)
+    pool_meta: Any = Field(default=None, repr=False)
+    score_cache: Any = Field(default=None, repr=False)
     
     def _run(self, pool_address: str, include_raw_data: bool = False) -> str:
         """Generate markdown report by running full analysis."""
-        from tools.concentration_risk import ConcentrationRiskAnalyzer
-        from tools.liquidity_depth_risk import LiquidityDepthAnalyzer
-        from tools.market_risk import MarketRiskAnalyzer
-        from tools.behavioral_risk import BehavioralRiskAnalyzer
-        from tools.risk_scorer import RiskScorer
-        from tools.report_generator import ReportGenerator
-        
         # Fetch pool info
         pool_info = self._fetch_pool_info(pool_address)
         if "error" in pool_info:
-            return json.dumps({"error": pool_info["error"]})
+            return _dumps({"error": pool_info["error"]})
         
-        current_price = float(pool_info.get("token1Price", 1))
-        
-        # Run all analyses
-        concentration_analyzer = ConcentrationRiskAnalyzer(self.paginator, self.cache, self.config)
-        liquidity_analyzer = LiquidityDepthAnalyzer(self.paginator, self.cache, self.config)
-        market_analyzer = MarketRiskAnalyzer(self.paginator, self.cache, self.config)
-        behavioral_analyzer = BehavioralRiskAnalyzer(self.paginator, self.cache, self.config)
-        
-        concentration_result = concentration_analyzer.analyze(pool_address)
-        liquidity_result = liquidity_analyzer.analyze(pool_address, current_price)
-        market_result = market_analyzer.analyze(pool_address)
-        behavioral_result = behavioral_analyzer.analyze(pool_address)
-        
-        # Calculate score
-        scorer = RiskScorer(self.config)
-        risk_score = scorer.score(
-            concentration_result,
-            liquidity_result,
-            market_result,
-            behavioral_result
+        # Run all analyses concurrently and score them (reused if just computed)
+        risk_score = run_full_risk(
+            pool_address, self.paginator, self.cache, self.config, self._pool_meta(),
+            self.score_cache
         )
         
         # Generate report
@@ -360,39 +312,12 @@ class GenerateReportTool(BaseTool):
         report = generator.generate(pool_address, pool_info, risk_score)
         
         if include_raw_data:
-            return json.dumps({
+            return _dumps({
                 "report": report,
                 "raw_data": risk_score
-            }, indent=2)
+            }, indent=True)
         
         return report
-    
-    def _fetch_pool_info(self, pool_address: str) -> Dict[str, Any]:
-        """Fetch pool info for report."""
-        query = """
-        query ($pool_id: String!) {
-          pool(id: $pool_id) {
-            id
-            token0 { symbol id decimals }
-            token1 { symbol id decimals }
-            feeTier
-            liquidity
-            totalValueLockedUSD
-            volumeUSD
-            token0Price
-            token1Price
-            txCount
-          }
-        }
-        """
-        try:
-            response = self.paginator._execute_with_retry(query, {"pool_id": pool_address.lower()})
-            pool = response.get("data", {}).get("pool")
-            if not pool:
-                return {"error": "Pool not found"}
-            return pool
-        except Exception as e:
-            return {"error": str(e)}
 
 
 # ============================================================================
@@ -411,14 +336,23 @@ def build_tools(config: Dict[str, Any], paginator: Any, cache: Any) -> List[Base
     Returns:
         List of configured tools
     """
+    # One metadata fetcher so price and pool-info lookups are shared across tools
+    pool_meta = PoolMetaFetcher(paginator, config["cache"].get("pool_meta_ttl_seconds", 30))
+    # One score cache per tool set, so scores are never reused across configs or data sources
+    score_cache = ScoreCache(config["cache"].get("score_ttl_seconds", 60))
+    
     tools = [
-        FetchPoolInfoTool(paginator=paginator),
+        FetchPoolInfoTool(paginator=paginator, pool_meta=pool_meta),
         AnalyzeConcentrationTool(paginator=paginator, cache=cache, config=config),
-        AnalyzeLiquidityDepthTool(paginator=paginator, cache=cache, config=config),
+        AnalyzeLiquidityDepthTool(paginator=paginator, cache=cache, config=config, pool_meta=pool_meta),
         AnalyzeMarketRiskTool(paginator=paginator, cache=cache, config=config),
         AnalyzeBehavioralRiskTool(paginator=paginator, cache=cache, config=config),
-        CalculateRiskScoreTool(paginator=paginator, cache=cache, config=config),
-        GenerateReportTool(paginator=paginator, cache=cache, config=config),
+        CalculateRiskScoreTool(
+            paginator=paginator, cache=cache, config=config, pool_meta=pool_meta, score_cache=score_cache
+        ),
+        GenerateReportTool(
+            paginator=paginator, cache=cache, config=config, pool_meta=pool_meta, score_cache=score_cache
+        ),
     ]
     
     return tools
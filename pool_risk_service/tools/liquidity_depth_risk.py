@@ -3,9 +3,98 @@ Liquidity Depth & Slippage Risk Analyzer
 Simulates large sell orders and analyzes liquidity distribution in Uniswap V3.
 """
 
+import math
 import numpy as np
-from typing import Dict, Any, List, Tuple
-from utils import GraphPaginator, CacheManager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from utils import GraphPaginator, CacheManager, PoolMetaFetcher
+from tools._tick_kernels import reduce_ticks
+
+# Uniswap V3 tick base: tick = log_1.0001(price)
+_INV_LOG_TICK = 1.0 / math.log(1.0001)
+# sqrt(price) at tick t is 1.0001 ** (t / 2)
+_SQRT_TICK_BASE = math.sqrt(1.0001)
+# Pool.sqrtPrice is a Q64.96 fixed-point number
+_Q96 = float(2 ** 96)
+# Ticks spanned by a ±10% price move (~953)
+_TICK_SPACING_10PCT = int(math.log(1.1) * _INV_LOG_TICK)
+
+_TICKS_QUERY = """
+query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
+  ticks(
+    first: $batch_size
+    where: {
+      pool: $pool_id
+      liquidityNet_not: "0"
+      id_gt: $last_id
+    }
+    orderBy: id
+    orderDirection: asc
+  ) {
+    id
+    tickIdx
+    liquidityNet
+    liquidityGross
+  }
+}
+"""
+
+_POOL_DAY_DATA_QUERY = """
+query ($pool_id: String!, $days: Int!) {
+  poolDayDatas(
+    first: $days
+    where: { pool: $pool_id }
+    orderBy: date
+    orderDirection: desc
+  ) {
+    tvlUSD
+  }
+}
+"""
+
+
+@dataclass
+class TickArrays:
+    """
+    Structure-of-arrays view of a pool's ticks (sorted by tick index), parsed once after fetching.
+    
+    ~24 bytes per tick instead of a dict of strings. The disk cache stores it as a dict
+    of arrays, so cached entries are rebuilt with ``TickArrays(**cached)``.
+    """
+    tick_idx: np.ndarray
+    liquidity_net: np.ndarray
+    liquidity_gross: np.ndarray
+    
+    @classmethod
+    def from_ticks(cls, ticks: List[Dict[str, Any]]) -> "TickArrays":
+        """
+        Convert subgraph tick dicts into aligned NumPy columns.
+        
+        Args:
+            ticks: List of tick data as returned by The Graph
+            
+        Returns:
+            TickArrays with one entry per tick
+        """
+        count = len(ticks)
+        tick_idx = np.fromiter((int(t["tickIdx"]) for t in ticks), dtype=np.int64, count=count)
+        liquidity_net = np.fromiter((float(t["liquidityNet"]) for t in ticks), dtype=np.float64, count=count)
+        # liquidityGross is non-negative on-chain; abs() guards against malformed data
+        liquidity_gross = np.abs(
+            np.fromiter((float(t["liquidityGross"]) for t in ticks), dtype=np.float64, count=count)
+        )
+        
+        # Pages arrive ordered by entity id, not tick index; the sell-order walk needs tick order
+        order = np.argsort(tick_idx, kind="stable")
+        return cls(
+            tick_idx=tick_idx[order],
+            liquidity_net=liquidity_net[order],
+            liquidity_gross=liquidity_gross[order]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.tick_idx)
 
 
 class LiquidityDepthAnalyzer:
@@ -14,32 +103,61 @@ class LiquidityDepthAnalyzer:
     Calculates market depth, slippage, and TVL volatility.
     """
     
-    def __init__(self, paginator: GraphPaginator, cache: CacheManager, config: Dict[str, Any]):
+    def __init__(
+        self,
+        paginator: GraphPaginator,
+        cache: CacheManager,
+        config: Dict[str, Any],
+        pool_meta: Optional[PoolMetaFetcher] = None
+    ):
         """
         Args:
             paginator: GraphPaginator instance for fetching data
             cache: CacheManager instance (ticks and poolDayData are cached)
             config: Configuration dict
+            pool_meta: Shared pool metadata fetcher (for the current tick); created if omitted
         """
         self.paginator = paginator
         self.cache = cache
         self.config = config
+        self.pool_meta = pool_meta or PoolMetaFetcher(
+            paginator, config["cache"].get("pool_meta_ttl_seconds", 30)
+        )
+        
+        # Deep pools have tens of thousands of ticks: request more pages per round trip
+        self.tick_batch_pages = config["pagination"].get("tick_batch_pages")
     
-    def analyze(self, pool_address: str, current_price: float) -> Dict[str, Any]:
+    def analyze(
+        self,
+        pool_address: str,
+        current_price: Optional[float] = None,
+        ticks: Optional[TickArrays] = None
+    ) -> Dict[str, Any]:
         """
         Perform liquidity depth analysis on a pool.
         
+        The liquidity curve is walked from the pool's on-chain tick; ``current_price``
+        is only a fallback for pools whose subgraph entity has no tick yet.
+        
         Args:
             pool_address: Ethereum address of the Uniswap V3 pool
-            current_price: Current price (token1/token0)
+            current_price: Current decimal-adjusted price (token1 per token0, as in token1Price)
+            ticks: Prefetched ticks (fetched here, with caching, when omitted)
             
         Returns:
             Dict containing raw metrics and risk flags
         """
-        # Fetch ticks (with caching)
-        ticks = self._fetch_ticks(pool_address)
+        # Fetch ticks (with caching). poolDayData is independent, so it is fetched
+        # in the background while the ticks paginate
+        if ticks is None:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                pool_day_data_future = executor.submit(self._get_pool_day_data, pool_address)
+                ticks = self._fetch_ticks(pool_address)
+                pool_day_data = pool_day_data_future.result()
+        else:
+            pool_day_data = None
         
-        if not ticks:
+        if not len(ticks):
             return {
                 "error": "No tick data found for this pool",
                 "price_impact_100k": None,
@@ -49,15 +167,33 @@ class LiquidityDepthAnalyzer:
                 "risk_flags": ["NO_DATA"]
             }
         
+        # poolDayData feeds both the TVL volatility and the USD calibration of the sell simulation
+        if pool_day_data is None:
+            pool_day_data = self._get_pool_day_data(pool_address)
+        latest_tvl_usd = float(pool_day_data[0]["tvlUSD"]) if pool_day_data else 0.0
+        
+        # Tick indices are in raw (undecimalized) price units, so anchor on the pool's own tick
+        current_tick, sqrt_current = self._current_position(pool_address, current_price)
+        if current_tick is None:
+            return {
+                "error": "Current pool tick unavailable",
+                "price_impact_100k": None,
+                "price_impact_1m": None,
+                "active_liquidity_pct": None,
+                "tvl_volatility_pct": None,
+                "risk_flags": ["NO_DATA"]
+            }
+        
         # Simulate sell orders
-        impact_100k = self._simulate_sell_order(ticks, current_price, 100_000)
-        impact_1m = self._simulate_sell_order(ticks, current_price, 1_000_000)
+        impact_100k, impact_1m = self._simulate_sell_orders(
+            ticks, sqrt_current, latest_tvl_usd, (100_000, 1_000_000)
+        )
         
         # Calculate active vs inactive liquidity
-        active_liquidity_pct = self._calculate_active_liquidity(ticks, current_price)
+        active_liquidity_pct = self._calculate_active_liquidity(ticks, current_tick)
         
         # Get TVL volatility from poolDayData
-        tvl_volatility = self._calculate_tvl_volatility(pool_address)
+        tvl_volatility = self._calculate_tvl_volatility(pool_day_data)
         
         # Generate risk flags
         risk_flags = self._generate_risk_flags(impact_100k, impact_1m, active_liquidity_pct, tvl_volatility)
@@ -72,7 +208,7 @@ class LiquidityDepthAnalyzer:
             "risk_score": self._calculate_risk_score(impact_100k, impact_1m, active_liquidity_pct, tvl_volatility)
         }
     
-    def _fetch_ticks(self, pool_address: str) -> List[Dict[str, Any]]:
+    def _fetch_ticks(self, pool_address: str) -> TickArrays:
         """
         Fetch all active ticks for a pool (with caching).
         """
@@ -80,174 +216,239 @@ class LiquidityDepthAnalyzer:
         cached = self.cache.get(cache_key, "ticks")
         
         if cached is not None:
-            return cached
-        
-        query = """
-        query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
-          ticks(
-            first: $batch_size
-            where: {
-              pool: $pool_id
-              liquidityNet_not: "0"
-              id_gt: $last_id
-            }
-            orderBy: id
-            orderDirection: asc
-          ) {
-            id
-            tickIdx
-            liquidityNet
-            liquidityGross
-          }
-        }
-        """
+            return TickArrays(**cached)
         
         variables = {"pool_id": pool_address.lower()}
         
         ticks = self.paginator.fetch_all(
-            query_template=query,
+            query_template=_TICKS_QUERY,
             variables=variables,
-            entity_name="ticks"
+            entity_name="ticks",
+            batch_pages=self.tick_batch_pages
         )
         
-        # Cache the result
-        self.cache.set(cache_key, "ticks", ticks)
+        # Cache the parsed arrays rather than the raw dicts
+        tick_arrays = TickArrays.from_ticks(ticks)
+        self.cache.set(cache_key, "ticks", tick_arrays)
         
-        return ticks
+        return tick_arrays
     
-    def _simulate_sell_order(self, ticks: List[Dict[str, Any]], current_price: float, sell_amount_usd: float) -> float:
+    async def afetch_ticks(self, pool_address: str) -> TickArrays:
         """
-        Simulate a sell order and calculate price impact.
+        Fetch all active ticks on the async client (for concurrent prefetching, with caching).
+        """
+        cache_key = f"{pool_address}_ticks"
+        cached = self.cache.get(cache_key, "ticks")
+        
+        if cached is not None:
+            return TickArrays(**cached)
+        
+        ticks = await self.paginator.afetch_all(
+            query_template=_TICKS_QUERY,
+            variables={"pool_id": pool_address.lower()},
+            entity_name="ticks",
+            batch_pages=self.tick_batch_pages
+        )
+        
+        tick_arrays = TickArrays.from_ticks(ticks)
+        self.cache.set(cache_key, "ticks", tick_arrays)
+        
+        return tick_arrays
+    
+    def _current_position(
+        self,
+        pool_address: str,
+        current_price: Optional[float]
+    ) -> Tuple[Optional[int], float]:
+        """
+        Resolve the pool's current tick and sqrt price in raw token units.
+        
+        Uses the pool's ``tick``/``sqrtPrice`` when the subgraph has them; otherwise
+        converts the decimal-adjusted price with ``10 ** (decimals1 - decimals0)``.
         
         Args:
-            ticks: List of tick data
-            current_price: Current price (token1/token0)
-            sell_amount_usd: Size of sell order in USD
+            pool_address: Ethereum address of the Uniswap V3 pool
+            current_price: Decimal-adjusted price (token1 per token0), if known
             
         Returns:
-            Price impact as percentage
+            Tuple of (current tick, sqrt of the raw price); the tick is None when
+            neither the pool metadata nor a usable price is available
         """
-        # This is a simplified simulation
-        # In reality, you'd need to walk through ticks and calculate the exact output
-        # For this implementation, we use a heuristic based on liquidity distribution
-        
-        # Sort ticks by tick index
-        sorted_ticks = sorted(ticks, key=lambda t: int(t["tickIdx"]))
-        
-        # Calculate total liquidity in range
-        total_liquidity = sum(abs(float(t["liquidityGross"])) for t in sorted_ticks)
-        
-        if total_liquidity == 0:
-            return 100.0  # Max impact
+        try:
+            pool = self.pool_meta.fetch(pool_address) or {}
+        except Exception:
+            pool = {}
+        
+        if pool.get("tick") is not None:
+            tick = int(pool["tick"])
+            sqrt_price_x96 = float(pool.get("sqrtPrice") or 0)
+            sqrt_current = sqrt_price_x96 / _Q96 if sqrt_price_x96 > 0 else _SQRT_TICK_BASE ** tick
+            return tick, sqrt_current
+        
+        price = current_price if current_price is not None else float(pool.get("token1Price") or 0)
+        try:
+            decimals0 = int(pool["token0"]["decimals"])
+            decimals1 = int(pool["token1"]["decimals"])
+        except (KeyError, TypeError, ValueError):
+            return None, 0.0
+        if price <= 0:
+            return None, 0.0
+        
+        raw_price = price * 10.0 ** (decimals1 - decimals0)
+        return self._price_to_tick(raw_price), math.sqrt(raw_price)
+    
+    def _simulate_sell_orders(
+        self,
+        ticks: TickArrays,
+        sqrt_current: float,
+        tvl_usd: float,
+        sell_amounts_usd: Tuple[float, ...]
+    ) -> List[float]:
+        """
+        Simulate selling token0 into the pool and calculate the price impact per order size.
         
-        # Simplified price impact formula:
-        # impact ≈ (sell_amount / sqrt(liquidity))
-        # This is a rough approximation of AMM slippage
+        Walks the concentrated liquidity curve downward from the current tick using
+        Uniswap V3 tick math: between two initialized ticks the active liquidity L
+        releases ``L * (sqrtP_upper - sqrtP_lower)`` of token1. Raw token amounts are
+        converted to USD by calibrating the curve's total value against the pool's
+        latest TVL, so no USD price feed is needed.
         
-        impact = (sell_amount_usd / np.sqrt(total_liquidity)) * 100
+        Args:
+            ticks: Parsed tick arrays (sorted by tick index)
+            sqrt_current: Square root of the current raw price (token1 units per token0 unit)
+            tvl_usd: Latest pool TVL in USD
+            sell_amounts_usd: Sell order sizes in USD
+            
+        Returns:
+            Price impact as percentage for each order size (100 when the pool cannot absorb it)
+        """
+        max_impacts = [100.0] * len(sell_amounts_usd)
+        if len(ticks) < 2 or tvl_usd <= 0 or sqrt_current <= 0:
+            return max_impacts
+        
+        sqrt_prices = np.power(_SQRT_TICK_BASE, ticks.tick_idx.astype(np.float64))
+        lower, upper = sqrt_prices[:-1], sqrt_prices[1:]
+        
+        # Liquidity active between consecutive initialized ticks
+        liquidity = np.clip(np.cumsum(ticks.liquidity_net)[:-1], 0.0, None)
+        
+        # Token1 sits below the current price, token0 above it (segments straddling it are split)
+        capped_upper = np.minimum(upper, sqrt_current)
+        amount1 = liquidity * np.clip(capped_upper - lower, 0.0, None)
+        amount0 = liquidity * np.clip(1.0 / np.maximum(lower, sqrt_current) - 1.0 / upper, 0.0, None)
+        
+        total_value1 = float(amount1.sum() + amount0.sum() * sqrt_current * sqrt_current)
+        if total_value1 <= 0:
+            return max_impacts
+        raw_per_usd = total_value1 / tvl_usd
+        
+        # Token1 released by each segment, nearest to the current price first
+        below = np.flatnonzero(amount1 > 0)[::-1]
+        cumulative_out = np.cumsum(amount1[below])
+        
+        impacts = []
+        for sell_amount_usd in sell_amounts_usd:
+            target = sell_amount_usd * raw_per_usd
+            exit_index = int(np.searchsorted(cumulative_out, target))
+            if exit_index >= len(below):
+                impacts.append(100.0)
+                continue
+            
+            # Solve for the exit price inside the segment where the order is filled
+            segment = below[exit_index]
+            consumed_before = cumulative_out[exit_index - 1] if exit_index else 0.0
+            sqrt_exit = capped_upper[segment] - (target - consumed_before) / liquidity[segment]
+            
+            impact = (1.0 - (sqrt_exit / sqrt_current) ** 2) * 100
+            impacts.append(min(max(float(impact), 0.0), 100.0))
         
-        return min(impact, 100.0)  # Cap at 100%
+        return impacts
     
-    def _calculate_active_liquidity(self, ticks: List[Dict[str, Any]], current_price: float) -> float:
+    @staticmethod
+    def _price_to_tick(current_price: float) -> int:
+        """Convert a raw price to a tick (Uniswap V3 formula: tick = floor(log_1.0001(price)))."""
+        return math.floor(math.log(current_price) * _INV_LOG_TICK)
+    
+    def _calculate_active_liquidity(self, ticks: TickArrays, current_tick: int) -> float:
         """
         Calculate percentage of liquidity that is in-range (active).
         
         Args:
-            ticks: List of tick data
-            current_price: Current price
+            ticks: Parsed tick arrays
+            current_tick: Pool's current tick
             
         Returns:
             Percentage of active liquidity (0-100)
         """
-        if not ticks:
+        if not len(ticks):
             return 0.0
         
-        # Convert price to tick (Uniswap V3 formula: tick = log_1.0001(price))
-        current_tick = int(np.log(current_price) / np.log(1.0001))
-        
         # Define "active range" as ±10% price movement
-        tick_spacing = int(np.log(1.1) / np.log(1.0001))  # ~953 ticks
+        tick_spacing = _TICK_SPACING_10PCT
         lower_bound = current_tick - tick_spacing
         upper_bound = current_tick + tick_spacing
         
-        active_liquidity = 0.0
-        total_liquidity = 0.0
-        
-        for tick in ticks:
-            tick_idx = int(tick["tickIdx"])
-            liquidity = abs(float(tick["liquidityGross"]))
-            
-            total_liquidity += liquidity
-            
-            if lower_bound <= tick_idx <= upper_bound:
-                active_liquidity += liquidity
+        total_liquidity, active_liquidity = reduce_ticks(
+            ticks.tick_idx, ticks.liquidity_gross, lower_bound, upper_bound
+        )
         
         if total_liquidity == 0:
             return 0.0
         
         return (active_liquidity / total_liquidity) * 100
     
-    def _calculate_tvl_volatility(self, pool_address: str) -> float:
+    def _get_pool_day_data(self, pool_address: str) -> List[Dict[str, Any]]:
+        """
+        Get last 30 days of pool data, newest first (with caching).
+        """
+        cache_key = f"{pool_address}_poolDayData"
+        cached = self.cache.get(cache_key, "poolDayData")
+        
+        if cached is not None:
+            return cached
+        
+        pool_day_data = self._fetch_pool_day_data(pool_address)
+        self.cache.set(cache_key, "poolDayData", pool_day_data)
+        return pool_day_data
+    
+    def _calculate_tvl_volatility(self, pool_day_data: List[Dict[str, Any]]) -> float:
         """
         Calculate standard deviation of TVL over last 30 days.
         
         Args:
-            pool_address: Pool address
+            pool_day_data: Daily pool data for the window
             
         Returns:
             TVL volatility as percentage
         """
-        cache_key = f"{pool_address}_poolDayData"
-        cached = self.cache.get(cache_key, "poolDayData")
-        
-        if cached is not None:
-            pool_day_data = cached
-        else:
-            pool_day_data = self._fetch_pool_day_data(pool_address)
-            self.cache.set(cache_key, "poolDayData", pool_day_data)
-        
         if len(pool_day_data) < 2:
             return 0.0
         
-        # Extract TVL values
-        tvl_values = [float(d["tvlUSD"]) for d in pool_day_data]
-        
-        # Calculate standard deviation
-        mean_tvl = np.mean(tvl_values)
-        std_dev = np.std(tvl_values)
+        # Extract TVL values straight into a float64 array (no intermediate list)
+        tvl_values = np.fromiter(
+            (float(d["tvlUSD"]) for d in pool_day_data),
+            dtype=np.float64,
+            count=len(pool_day_data)
+        )
         
+        mean_tvl = float(tvl_values.mean())
         if mean_tvl == 0:
             return 0.0
         
-        # Return as percentage of mean
-        return (std_dev / mean_tvl) * 100
+        # Return standard deviation as percentage of mean
+        return float(tvl_values.std()) / mean_tvl * 100.0
     
     def _fetch_pool_day_data(self, pool_address: str) -> List[Dict[str, Any]]:
         """
         Fetch last 30 days of pool data.
         """
-        query = """
-        query ($pool_id: String!, $days: Int!) {
-          poolDayDatas(
-            first: $days
-            where: { pool: $pool_id }
-            orderBy: date
-            orderDirection: desc
-          ) {
-            date
-            tvlUSD
-            volumeUSD
-          }
-        }
-        """
-        
         variables = {
             "pool_id": pool_address.lower(),
             "days": self.config["queries"]["pool_day_data_days"]
         }
         
         # This query doesn't need pagination (only 30 records)
-        response = self.paginator._execute_with_retry(query, variables)
+        response = self.paginator._execute_with_retry(_POOL_DAY_DATA_QUERY, variables)
         
         return response.get("data", {}).get("poolDayDatas", [])
     
@@ -4,8 +4,27 @@ Calculates utilization rates and price correlation for IL risk assessment.
 """
 
 import numpy as np
-from typing import Dict, Any, List
+from types import SimpleNamespace
+from typing import Dict, Any, List, Tuple
 from utils import GraphPaginator, CacheManager
+from tools._market_kernels import market_metrics, pearson_pvalue
+
+_POOL_DAY_DATA_QUERY = """
+query ($pool_id: String!, $days: Int!) {
+  poolDayDatas(
+    first: $days
+    where: { pool: $pool_id }
+    orderBy: date
+    orderDirection: desc
+  ) {
+    date
+    tvlUSD
+    volumeUSD
+    token0Price
+    token1Price
+  }
+}
+"""
 
 
 class MarketRiskAnalyzer:
@@ -24,6 +43,13 @@ class MarketRiskAnalyzer:
         self.paginator = paginator
         self.cache = cache
         self.config = config
+        
+        # Risk-flag thresholds resolved once as attributes
+        self._th = SimpleNamespace(**config["risk_thresholds"]["market_risk"])
+        
+        # At or above both floors no market flag can trigger
+        self._utilization_floor = max(self._th.utilization_rate_critical_low, self._th.utilization_rate_low)
+        self._correlation_floor = max(self._th.price_correlation_high_il_risk, self._th.price_correlation_low_il_risk)
     
     def analyze(self, pool_address: str) -> Dict[str, Any]:
         """
@@ -43,15 +69,18 @@ class MarketRiskAnalyzer:
                 "error": "No historical data found for this pool",
                 "avg_utilization_rate": None,
                 "price_correlation": None,
+                "price_correlation_pvalue": None,
                 "il_risk_level": None,
                 "risk_flags": ["NO_DATA"]
             }
         
-        # Calculate utilization rate (Volume/TVL)
-        avg_utilization = self._calculate_avg_utilization(pool_day_data)
+        # Calculate utilization rate (Volume/TVL) and price correlation in one kernel pass
+        arrays = self._day_data_arrays(pool_day_data)
+        avg_utilization, price_correlation = market_metrics(*arrays)
         
-        # Calculate price correlation
-        price_correlation = self._calculate_price_correlation(pool_day_data)
+        # Significance of the correlation: one return per consecutive pair of priced days
+        priced_days = int(np.count_nonzero((arrays[2] > 0) & (arrays[3] > 0)))
+        correlation_pvalue = pearson_pvalue(price_correlation, priced_days - 1)
         
         # Determine IL risk level
         il_risk_level = self._determine_il_risk(price_correlation)
@@ -62,6 +91,7 @@ class MarketRiskAnalyzer:
         return {
             "avg_utilization_rate": round(avg_utilization, 6),
             "price_correlation": round(price_correlation, 4),
+            "price_correlation_pvalue": round(correlation_pvalue, 6),
             "il_risk_level": il_risk_level,
             "data_points": len(pool_day_data),
             "risk_flags": risk_flags,
@@ -72,36 +102,20 @@ class MarketRiskAnalyzer:
         """
         Fetch last 30 days of pool data (with caching).
         """
-        cache_key = f"{pool_address}_poolDayData_market"
+        # Lower-cased so checksummed and lower-case addresses share one entry
+        cache_key = f"{pool_address.lower()}_poolDayData_market"
         cached = self.cache.get(cache_key, "poolDayData")
         
         if cached is not None:
             return cached
         
-        query = """
-        query ($pool_id: String!, $days: Int!) {
-          poolDayDatas(
-            first: $days
-            where: { pool: $pool_id }
-            orderBy: date
-            orderDirection: desc
-          ) {
-            date
-            tvlUSD
-            volumeUSD
-            token0Price
-            token1Price
-          }
-        }
-        """
-        
         variables = {
             "pool_id": pool_address.lower(),
             "days": self.config["queries"]["pool_day_data_days"]
         }
         
         # This query doesn't need pagination (only 30 records)
-        response = self.paginator._execute_with_retry(query, variables)
+        response = self.paginator._execute_with_retry(_POOL_DAY_DATA_QUERY, variables)
         pool_day_data = response.get("data", {}).get("poolDayDatas", [])
         
         # Cache the result
@@ -109,70 +123,24 @@ class MarketRiskAnalyzer:
         
         return pool_day_data
     
-    def _calculate_avg_utilization(self, pool_day_data: List[Dict[str, Any]]) -> float:
+    def _day_data_arrays(
+        self,
+        pool_day_data: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Calculate average utilization rate (Volume/TVL).
+        Parse daily pool data into float64 columns for the market metrics kernel.
         
         Args:
             pool_day_data: List of daily pool data
             
         Returns:
-            Average daily utilization rate
+            Tuple of (tvl, volume, token0_prices, token1_prices) arrays
         """
-        utilization_rates = []
-        
-        for day_data in pool_day_data:
-            tvl = float(day_data.get("tvlUSD", 0))
-            volume = float(day_data.get("volumeUSD", 0))
-            
-            if tvl > 0:
-                utilization_rates.append(volume / tvl)
-        
-        if not utilization_rates:
-            return 0.0
-        
-        return np.mean(utilization_rates)
-    
-    def _calculate_price_correlation(self, pool_day_data: List[Dict[str, Any]]) -> float:
-        """
-        Calculate correlation between token0 and token1 price movements.
-        Low/negative correlation = High IL risk.
-        
-        Args:
-            pool_day_data: List of daily pool data
-            
-        Returns:
-            Pearson correlation coefficient (-1 to 1)
-        """
-        token0_prices = []
-        token1_prices = []
-        
-        for day_data in pool_day_data:
-            token0_price = float(day_data.get("token0Price", 0))
-            token1_price = float(day_data.get("token1Price", 0))
-            
-            if token0_price > 0 and token1_price > 0:
-                token0_prices.append(token0_price)
-                token1_prices.append(token1_price)
-        
-        if len(token0_prices) < 2:
-            return 0.0
-        
-        # Calculate percentage changes
-        token0_returns = np.diff(token0_prices) / token0_prices[:-1]
-        token1_returns = np.diff(token1_prices) / token1_prices[:-1]
-        
-        if len(token0_returns) < 2:
-            return 0.0
-        
-        # Calculate Pearson correlation
-        correlation = np.corrcoef(token0_returns, token1_returns)[0, 1]
-        
-        # Handle NaN (can occur if variance is 0)
-        if np.isnan(correlation):
-            return 0.0
-        
-        return correlation
+        n = len(pool_day_data)
+        return tuple(
+            np.fromiter((float(d.get(field, 0)) for d in pool_day_data), dtype=np.float64, count=n)
+            for field in ("tvlUSD", "volumeUSD", "token0Price", "token1Price")
+        )
     
     def _determine_il_risk(self, correlation: float) -> str:
         """
@@ -184,11 +152,9 @@ class MarketRiskAnalyzer:
         Returns:
             Risk level string
         """
-        thresholds = self.config["risk_thresholds"]["market_risk"]
-        
-        if correlation < thresholds["price_correlation_high_il_risk"]:
+        if correlation < self._th.price_correlation_high_il_risk:
             return "VERY_HIGH"  # Negative correlation
-        elif correlation < thresholds["price_correlation_low_il_risk"]:
+        elif correlation < self._th.price_correlation_low_il_risk:
             return "HIGH"  # Low/no correlation
         elif correlation < 0.7:
             return "MEDIUM"
@@ -199,19 +165,22 @@ class MarketRiskAnalyzer:
         """
         Generate risk flags based on thresholds.
         """
+        # Healthy pool (the common case): two compares, no flag list to build
+        if utilization >= self._utilization_floor and correlation >= self._correlation_floor:
+            return ["LOW_RISK"]
+        
         flags = []
-        thresholds = self.config["risk_thresholds"]["market_risk"]
         
         # Utilization rate checks
-        if utilization < thresholds["utilization_rate_critical_low"]:
+        if utilization < self._th.utilization_rate_critical_low:
             flags.append("CRITICAL_LOW_UTILIZATION")
-        elif utilization < thresholds["utilization_rate_low"]:
+        elif utilization < self._th.utilization_rate_low:
             flags.append("LOW_UTILIZATION")
         
         # Price correlation checks (IL risk)
-        if correlation < thresholds["price_correlation_high_il_risk"]:
+        if correlation < self._th.price_correlation_high_il_risk:
             flags.append("VERY_HIGH_IL_RISK")
-        elif correlation < thresholds["price_correlation_low_il_risk"]:
+        elif correlation < self._th.price_correlation_low_il_risk:
             flags.append("HIGH_IL_RISK")
         
         return flags if flags else ["LOW_RISK"]
@@ -0,0 +1,133 @@
+"""
+Full risk pipeline shared by the composite tools: runs the four analyzers
+concurrently and scores them, with a short-lived score cache.
+"""
+
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from cachetools import TTLCache
+
+from utils import GraphPaginator, CacheManager, PoolMetaFetcher
+from tools.concentration_risk import ConcentrationRiskAnalyzer
+from tools.liquidity_depth_risk import LiquidityDepthAnalyzer
+from tools.market_risk import MarketRiskAnalyzer
+from tools.behavioral_risk import BehavioralRiskAnalyzer
+from tools.risk_scorer import RiskScorer
+
+
+def run_all_analyses(
+    pool_address: str,
+    paginator: GraphPaginator,
+    cache: CacheManager,
+    config: Dict[str, Any],
+    pool_meta: Optional[PoolMetaFetcher] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Run the four risk analyzers concurrently.
+    
+    Each analyzer is I/O-bound on The Graph and releases the GIL while waiting,
+    so threads overlap their round trips. The pool metadata (current tick) is
+    fetched alongside the analyzers and the tick fetch, which do not need it.
+    
+    Args:
+        pool_address: Pool to analyze
+        paginator: GraphPaginator instance
+        cache: CacheManager instance
+        config: Application configuration
+        pool_meta: Shared pool metadata fetcher (created if omitted)
+        
+    Returns:
+        Tuple of (concentration, liquidity, market, behavioral) results
+    """
+    liquidity_analyzer = LiquidityDepthAnalyzer(paginator, cache, config, pool_meta)
+    
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        pool_future = executor.submit(liquidity_analyzer.pool_meta.fetch, pool_address)
+        ticks = executor.submit(liquidity_analyzer._fetch_ticks, pool_address)
+        concentration = executor.submit(
+            ConcentrationRiskAnalyzer(paginator, cache, config).analyze, pool_address
+        )
+        market = executor.submit(MarketRiskAnalyzer(paginator, cache, config).analyze, pool_address)
+        behavioral = executor.submit(
+            BehavioralRiskAnalyzer(paginator, cache, config).analyze, pool_address
+        )
+        
+        # Liquidity depth needs the current tick, so it runs here once the metadata and ticks are known
+        # (a failed metadata fetch is retried, and reported, by analyze itself)
+        pool_future.exception()
+        liquidity_result = liquidity_analyzer.analyze(pool_address, ticks=ticks.result())
+        
+        return concentration.result(), liquidity_result, market.result(), behavioral.result()
+
+
+class ScoreCache:
+    """
+    Recent composite scores per pool, so generate_report right after
+    calculate_risk_score (or any repeated call) skips re-running the four analyzers.
+    
+    One instance belongs to one tool set (see ``build_tools``), so a score is only
+    ever reused with the config, paginator and cache that produced it.
+    """
+    
+    def __init__(self, ttl_seconds: float = 60):
+        """
+        Args:
+            ttl_seconds: How long a computed score is reused
+        """
+        self._cache: TTLCache = TTLCache(maxsize=256, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+    
+    def get(self, pool_address: str) -> Optional[Dict[str, Any]]:
+        """Return a private copy of the pool's cached score, or None on a miss."""
+        with self._lock:
+            risk_score = self._cache.get(pool_address.lower())
+        return copy.deepcopy(risk_score) if risk_score is not None else None
+    
+    def set(self, pool_address: str, risk_score: Dict[str, Any]) -> None:
+        """Store a copy of the pool's score."""
+        with self._lock:
+            self._cache[pool_address.lower()] = copy.deepcopy(risk_score)
+
+
+def run_full_risk(
+    pool_address: str,
+    paginator: GraphPaginator,
+    cache: CacheManager,
+    config: Dict[str, Any],
+    pool_meta: Optional[PoolMetaFetcher] = None,
+    score_cache: Optional[ScoreCache] = None
+) -> Dict[str, Any]:
+    """
+    Run all analyses and score them, reusing a recent score from ``score_cache``.
+    
+    Args:
+        pool_address: Pool to analyze
+        paginator: GraphPaginator instance
+        cache: CacheManager instance
+        config: Application configuration
+        pool_meta: Shared pool metadata fetcher (created if omitted)
+        score_cache: Score cache of the calling tool set (no reuse if omitted)
+        
+    Returns:
+        RiskScorer output for the pool
+    """
+    if score_cache is not None:
+        risk_score = score_cache.get(pool_address)
+        if risk_score is not None:
+            return risk_score
+    
+    concentration_result, liquidity_result, market_result, behavioral_result = run_all_analyses(
+        pool_address, paginator, cache, config, pool_meta
+    )
+    risk_score = RiskScorer(config).score(
+        concentration_result,
+        liquidity_result,
+        market_result,
+        behavioral_result
+    )
+    
+    if score_cache is not None:
+        score_cache.set(pool_address, risk_score)
+    return risk_score
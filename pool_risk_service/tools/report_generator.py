@@ -2,9 +2,36 @@
 Report Generator - Converts raw risk metrics into human-readable Markdown.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, Tuple
 from datetime import datetime
 
+# Risk level emoji shown in the report header
+_EMOJI_MAP: Dict[str, str] = {
+    "LOW": "🟢",
+    "MEDIUM": "🟡",
+    "HIGH": "🟠",
+    "CRITICAL": "🔴"
+}
+_UNKNOWN_EMOJI = "⚪"
+
+# Flag-specific recommendations: each applies when any of its (exact) analyzer flags is raised
+_FLAG_RECOMMENDATIONS: Tuple[Tuple[FrozenSet[str], str], ...] = (
+    (frozenset({"HIGH_TOP10_DOMINANCE", "CRITICAL_TOP10_DOMINANCE"}),
+     "- Monitor large LP positions for exit signals"),
+    (frozenset({"HIGH_MERCENARY_LIQUIDITY"}),
+     "- Expect potential liquidity flight; avoid long-term commitments"),
+    (frozenset({"HIGH_SLIPPAGE_100K", "CRITICAL_SLIPPAGE_100K", "HIGH_SLIPPAGE_1M", "CRITICAL_SLIPPAGE_1M"}),
+     "- Use limit orders and slippage protection for large trades"),
+    (frozenset({"LOW_UTILIZATION", "CRITICAL_LOW_UTILIZATION"}),
+     "- Low fee generation; consider more active pools"),
+    (frozenset({"HIGH_IL_RISK", "VERY_HIGH_IL_RISK"}),
+     "- Tokens are uncorrelated; prepare for significant impermanent loss"),
+    (frozenset({"HIGH_WASH_TRADING", "CRITICAL_WASH_TRADING"}),
+     "- Volume metrics are unreliable; verify with other data sources"),
+    (frozenset({"HIGH_MEV_EXPOSURE", "CRITICAL_MEV_EXPOSURE"}),
+     "- Use MEV-protected RPC endpoints (e.g., Flashbots, MEVBlocker)"),
+)
+
 
 class ReportGenerator:
     """
@@ -57,14 +84,7 @@ class ReportGenerator:
         risk_level = risk_score_result["risk_level"]
         composite_score = risk_score_result["composite_score"]
         
-        # Risk level emoji
-        emoji_map = {
-            "LOW": "🟢",
-            "MEDIUM": "🟡",
-            "HIGH": "🟠",
-            "CRITICAL": "🔴"
-        }
-        emoji = emoji_map.get(risk_level, "⚪")
+        emoji = _EMOJI_MAP.get(risk_level, _UNKNOWN_EMOJI)
         
         token0 = pool_info.get("token0", {}).get("symbol", "TOKEN0")
         token1 = pool_info.get("token1", {}).get("symbol", "TOKEN1")
@@ -86,7 +106,7 @@ class ReportGenerator:
         # Filter out LOW_RISK flag for display
         critical_flags = [f for f in flags if f != "LOW_RISK"]
         
-        summary = f"""## Executive Summary
+        parts = [f"""## Executive Summary
 
 This pool has been assigned a **{risk_level}** risk rating with a composite score of **{composite_score}/100**.
 
@@ -94,16 +114,15 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
 - **Concentration Risk:** {component_scores['concentration']}/100
 - **Liquidity Depth Risk:** {component_scores['liquidity_depth']}/100
 - **Market Risk:** {component_scores['market_risk']}/100
-- **Behavioral Risk:** {component_scores['behavioral']}/100"""
+- **Behavioral Risk:** {component_scores['behavioral']}/100"""]
         
         if critical_flags:
-            summary += f"\n\n### ⚠️ Active Risk Flags\n"
-            for flag in critical_flags:
-                summary += f"- `{flag}`\n"
+            parts.append("\n\n### ⚠️ Active Risk Flags\n")
+            parts.extend(f"- `{flag}`\n" for flag in critical_flags)
         else:
-            summary += f"\n\n### ✅ No Critical Risk Flags Detected"
+            parts.append("\n\n### ✅ No Critical Risk Flags Detected")
         
-        return summary
+        return "".join(parts)
     
     def _generate_concentration_section(self, concentration_data: Dict[str, Any]) -> str:
         """Generate concentration risk section."""
@@ -115,7 +134,7 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
         top10 = concentration_data["top10_dominance_pct"]
         lp_age = concentration_data["lp_age_distribution"]
         
-        section = f"""## 1. Concentration Risk (Whale Analysis)
+        parts = [f"""## 1. Concentration Risk (Whale Analysis)
 
 ### Inequality Metrics
 - **Gini Coefficient:** {gini} (0 = perfect equality, 1 = perfect inequality)
@@ -128,20 +147,20 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
 - **Long-term LPs (>30 days):** {lp_age['long_term']['count']} positions ({lp_age['long_term']['liquidity_pct']}% of liquidity)
 
 ### Interpretation
-"""
+"""]
         
         # Add interpretation
         if top10 > 70:
-            section += "⚠️ **CRITICAL:** Liquidity is extremely concentrated. Top 10 holders control the majority of the pool.\n"
+            parts.append("⚠️ **CRITICAL:** Liquidity is extremely concentrated. Top 10 holders control the majority of the pool.\n")
         elif top10 > 50:
-            section += "⚠️ **HIGH RISK:** Top 10 holders have significant control. Pool vulnerable to coordinated exits.\n"
+            parts.append("⚠️ **HIGH RISK:** Top 10 holders have significant control. Pool vulnerable to coordinated exits.\n")
         else:
-            section += "✅ Liquidity distribution appears healthy.\n"
+            parts.append("✅ Liquidity distribution appears healthy.\n")
         
         if lp_age['mercenary']['liquidity_pct'] > 50:
-            section += "⚠️ **FLIGHT RISK:** Majority of liquidity is from new positions (<7 days old).\n"
+            parts.append("⚠️ **FLIGHT RISK:** Majority of liquidity is from new positions (<7 days old).\n")
         
-        return section
+        return "".join(parts)
     
     def _generate_liquidity_section(self, liquidity_data: Dict[str, Any]) -> str:
         """Generate liquidity depth section."""
@@ -153,7 +172,7 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
         active = liquidity_data["active_liquidity_pct"]
         volatility = liquidity_data["tvl_volatility_30d_pct"]
         
-        section = f"""## 2. Liquidity & Depth Risk
+        parts = [f"""## 2. Liquidity & Depth Risk
 
 ### Slippage Simulation
 - **$100K Sell Order Impact:** {impact_100k}%
@@ -164,20 +183,20 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
 - **TVL Volatility (30-day):** {volatility}%
 
 ### Interpretation
-"""
+"""]
         
         # Add interpretation
         if impact_100k > 3:
-            section += "⚠️ **CRITICAL:** Extremely high slippage for moderate-sized orders. Poor liquidity depth.\n"
+            parts.append("⚠️ **CRITICAL:** Extremely high slippage for moderate-sized orders. Poor liquidity depth.\n")
         elif impact_100k > 1:
-            section += "⚠️ **MODERATE:** Noticeable slippage on $100K orders. May deter large traders.\n"
+            parts.append("⚠️ **MODERATE:** Noticeable slippage on $100K orders. May deter large traders.\n")
         else:
-            section += "✅ Good liquidity depth for retail-sized orders.\n"
+            parts.append("✅ Good liquidity depth for retail-sized orders.\n")
         
         if active < 30:
-            section += "⚠️ **INEFFICIENT:** Most liquidity is out-of-range and not earning fees or providing depth.\n"
+            parts.append("⚠️ **INEFFICIENT:** Most liquidity is out-of-range and not earning fees or providing depth.\n")
         
-        return section
+        return "".join(parts)
     
     def _generate_market_section(self, market_data: Dict[str, Any]) -> str:
         """Generate market risk section."""
@@ -188,7 +207,7 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
         correlation = market_data["price_correlation"]
         il_risk = market_data["il_risk_level"]
         
-        section = f"""## 3. Market Risk & Impermanent Loss
+        parts = [f"""## 3. Market Risk & Impermanent Loss
 
 ### Efficiency Metrics
 - **Avg Utilization Rate (Volume/TVL):** {utilization:.4f} ({utilization*100:.2f}% daily)
@@ -196,20 +215,20 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
 - **IL Risk Level:** {il_risk}
 
 ### Interpretation
-"""
+"""]
         
         # Add interpretation
         if utilization < 0.01:
-            section += "⚠️ **CRITICAL:** Very low utilization. LPs earning minimal fees, likely to exit.\n"
+            parts.append("⚠️ **CRITICAL:** Very low utilization. LPs earning minimal fees, likely to exit.\n")
         elif utilization < 0.05:
-            section += "⚠️ **LOW EFFICIENCY:** Below-average utilization. May not attract long-term LPs.\n"
+            parts.append("⚠️ **LOW EFFICIENCY:** Below-average utilization. May not attract long-term LPs.\n")
         else:
-            section += "✅ Healthy utilization rate. LPs are earning competitive fees.\n"
+            parts.append("✅ Healthy utilization rate. LPs are earning competitive fees.\n")
         
         if il_risk in ["VERY_HIGH", "HIGH"]:
-            section += f"⚠️ **{il_risk} IL RISK:** Token prices are moving independently. High impermanent loss exposure.\n"
+            parts.append(f"⚠️ **{il_risk} IL RISK:** Token prices are moving independently. High impermanent loss exposure.\n")
         
-        return section
+        return "".join(parts)
     
     def _generate_behavioral_section(self, behavioral_data: Dict[str, Any]) -> str:
         """Generate behavioral risk section."""
@@ -220,29 +239,29 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
         mev = behavioral_data["mev_exposure_pct"]
         swaps = behavioral_data["total_swaps_analyzed"]
         
-        section = f"""## 4. Behavioral Risk (Wash Trading & MEV)
+        parts = [f"""## 4. Behavioral Risk (Wash Trading & MEV)
 
 ### Bot Activity Metrics
 - **Wash Trading Index:** {wash}% of {swaps} swaps
 - **MEV Exposure (Sandwich Attacks):** {mev}%
 
 ### Interpretation
-"""
+"""]
         
         # Add interpretation
         if wash > 15:
-            section += "⚠️ **CRITICAL:** Extremely high wash trading detected. Volume is likely inorganic.\n"
+            parts.append("⚠️ **CRITICAL:** Extremely high wash trading detected. Volume is likely inorganic.\n")
         elif wash > 5:
-            section += "⚠️ **MODERATE:** Notable wash trading activity. Exercise caution with volume metrics.\n"
+            parts.append("⚠️ **MODERATE:** Notable wash trading activity. Exercise caution with volume metrics.\n")
         else:
-            section += "✅ Low wash trading. Volume appears organic.\n"
+            parts.append("✅ Low wash trading. Volume appears organic.\n")
         
         if mev > 25:
-            section += "⚠️ **CRITICAL:** Pool is heavily targeted by MEV bots. Retail traders at high risk.\n"
+            parts.append("⚠️ **CRITICAL:** Pool is heavily targeted by MEV bots. Retail traders at high risk.\n")
         elif mev > 10:
-            section += "⚠️ **MODERATE:** Significant MEV activity. Users should use MEV protection.\n"
+            parts.append("⚠️ **MODERATE:** Significant MEV activity. Users should use MEV protection.\n")
         
-        return section
+        return "".join(parts)
     
     def _generate_recommendations(self, risk_score_result: Dict[str, Any]) -> str:
         """Generate actionable recommendations."""
@@ -262,27 +281,11 @@ This pool has been assigned a **{risk_level}** risk rating with a composite scor
         
         recommendations.append("\n### Specific Actions:\n")
         
-        # Flag-specific recommendations
-        if any("TOP10_DOMINANCE" in f for f in flags):
-            recommendations.append("- Monitor large LP positions for exit signals")
-        
-        if any("MERCENARY" in f for f in flags):
-            recommendations.append("- Expect potential liquidity flight; avoid long-term commitments")
-        
-        if any("SLIPPAGE" in f for f in flags):
-            recommendations.append("- Use limit orders and slippage protection for large trades")
-        
-        if any("UTILIZATION" in f for f in flags):
-            recommendations.append("- Low fee generation; consider more active pools")
-        
-        if any("IL_RISK" in f for f in flags):
-            recommendations.append("- Tokens are uncorrelated; prepare for significant impermanent loss")
-        
-        if any("WASH_TRADING" in f for f in flags):
-            recommendations.append("- Volume metrics are unreliable; verify with other data sources")
-        
-        if any("MEV" in f for f in flags):
-            recommendations.append("- Use MEV-protected RPC endpoints (e.g., Flashbots, MEVBlocker)")
+        # Flag-specific recommendations (one set probe per pattern instead of substring scans)
+        flag_set = frozenset(flags)
+        for pattern_flags, recommendation in _FLAG_RECOMMENDATIONS:
+            if not flag_set.isdisjoint(pattern_flags):
+                recommendations.append(recommendation)
         
         return "\n".join(recommendations)
     
@@ -4,6 +4,11 @@ Risk Scorer - Aggregates all risk analysis modules into composite score.
 
 from typing import Dict, Any
 
+import numpy as np
+
+# Component order shared by the weight vector and the per-call score vector
+_COMPONENTS = ("concentration", "liquidity_depth", "market_risk", "behavioral")
+
 
 class RiskScorer:
     """
@@ -19,6 +24,14 @@ class RiskScorer:
         self.config = config
         self.weights = config["scoring"]["weights"]
         self.risk_levels = config["scoring"]["risk_levels"]
+        self._weights = np.asarray([self.weights[c] for c in _COMPONENTS], dtype=np.float64)
+        
+        # Risk level for every possible integer score (0-100); gaps in the config stay UNKNOWN
+        lut = ["UNKNOWN"] * 101
+        for level, bounds in self.risk_levels.items():
+            for score in range(max(bounds["min"], 0), min(bounds["max"], 100) + 1):
+                lut[score] = level.upper()
+        self._level_lut = tuple(lut)
     
     def score(
         self,
@@ -46,12 +59,11 @@ class RiskScorer:
         behavioral_score = behavioral_result.get("risk_score", 0)
         
         # Calculate weighted composite score
-        composite_score = (
-            concentration_score * self.weights["concentration"] +
-            liquidity_score * self.weights["liquidity_depth"] +
-            market_score * self.weights["market_risk"] +
-            behavioral_score * self.weights["behavioral"]
+        scores = np.asarray(
+            [concentration_score, liquidity_score, market_score, behavioral_score],
+            dtype=np.float64
         )
+        composite_score = float(np.dot(self._weights, scores))
         
         # Round to integer
         composite_score = int(round(composite_score))
@@ -59,17 +71,14 @@ class RiskScorer:
         # Determine risk level
         risk_level = self._determine_risk_level(composite_score)
         
-        # Aggregate all risk flags
-        all_flags = (
-            concentration_result.get("risk_flags", []) +
-            liquidity_result.get("risk_flags", []) +
-            market_result.get("risk_flags", []) +
-            behavioral_result.get("risk_flags", [])
-        )
-        
-        # Remove "LOW_RISK" flags if there are other flags
-        critical_flags = [f for f in all_flags if f != "LOW_RISK"]
-        final_flags = critical_flags if critical_flags else ["LOW_RISK"]
+        # Aggregate all risk flags in one pass, dropping "LOW_RISK" if there are other flags
+        critical_flags = [
+            flag
+            for result in (concentration_result, liquidity_result, market_result, behavioral_result)
+            for flag in result.get("risk_flags", ())
+            if flag != "LOW_RISK"
+        ]
+        final_flags = critical_flags or ["LOW_RISK"]
         
         return {
             "composite_score": composite_score,
@@ -99,9 +108,8 @@ class RiskScorer:
         Returns:
             Risk level string (LOW/MEDIUM/HIGH/CRITICAL)
         """
-        for level, bounds in self.risk_levels.items():
-            if bounds["min"] <= score <= bounds["max"]:
-                return level.upper()
+        if 0 <= score <= 100:
+            return self._level_lut[score]
         
         # Fallback (should never reach here with valid config)
         return "UNKNOWN"
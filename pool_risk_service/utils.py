@@ -3,13 +3,53 @@ Core utilities for querying The Graph with pagination and caching.
 Follows KISS, DRY, and Separation of Concerns principles.
 """
 
+import asyncio
 import time
 import json
 import os
 import hashlib
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import tempfile
+import threading
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+import httpx
+import msgspec
+import numpy as np
+import orjson
 import requests
+import zstandard
+from cachetools import TTLCache
+
+from common_ai.graph_batcher import GraphBatcher, GraphQLError, build_paged_query
+
+# Largest `skip` The Graph accepts; speculative pages are clamped to stay under it
+_MAX_SKIP = 5000
+
+# Request bodies are pre-serialized with orjson, so the content type is set explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# msgpack extension code for NumPy arrays in disk cache entries
+_NDARRAY_EXT = 1
+
+
+def _cache_enc_hook(obj: Any) -> Any:
+    """Encode NumPy arrays as (dtype, shape, raw bytes) msgpack extensions."""
+    if isinstance(obj, np.ndarray):
+        header = msgspec.msgpack.encode((obj.dtype.str, obj.shape))
+        return msgspec.msgpack.Ext(_NDARRAY_EXT, len(header).to_bytes(4, "little") + header + obj.tobytes())
+    raise NotImplementedError(f"Cannot cache objects of type {type(obj).__name__}")
+
+
+def _cache_ext_hook(code: int, data: memoryview) -> Any:
+    """Decode the NumPy array extensions written by _cache_enc_hook."""
+    if code != _NDARRAY_EXT:
+        raise ValueError(f"Unknown cache extension type {code}")
+    header_len = int.from_bytes(data[:4], "little")
+    dtype, shape = msgspec.msgpack.decode(data[4:4 + header_len])
+    return np.frombuffer(data[4 + header_len:], dtype=np.dtype(dtype)).reshape(shape)
+
+
+_CACHE_ENCODER = msgspec.msgpack.Encoder(enc_hook=_cache_enc_hook)
+_CACHE_DECODER = msgspec.msgpack.Decoder(ext_hook=_cache_ext_hook)
 
 
 class GraphPaginator:
@@ -18,25 +58,49 @@ class GraphPaginator:
     Handles rate limiting and automatic retrying.
     """
     
-    def __init__(self, endpoint: str, config: Dict[str, Any]):
+    def __init__(
+        self,
+        endpoint: str,
+        config: Dict[str, Any],
+        client: Optional[httpx.AsyncClient] = None
+    ):
         """
         Args:
             endpoint: The Graph API endpoint URL
             config: Configuration dict containing pagination settings
+            client: Shared async HTTP client for afetch_all (created lazily if omitted)
         """
         self.endpoint = endpoint
+        self.config = config
         self.batch_size = config["pagination"]["batch_size"]
         self.rate_limit_delay = config["pagination"]["rate_limit_delay_seconds"]
         self.max_retries = config["pagination"]["max_retries"]
         self.retry_delay = config["pagination"]["retry_delay_seconds"]
         self.timeout = config["api"]["timeout_seconds"]
+        
+        # Consecutive pages fetched per round trip as aliased, skip-offset fields
+        self.batch_pages = config["pagination"].get("batch_pages", 1)
+        self._paged_queries: Dict[Tuple[str, int], Optional[str]] = {}
+        
+        # Keep-alive connections: a Session for the sync path, an AsyncClient for the async one
+        self.session = requests.Session()
+        self.client = client
+        
+        # Coalesce concurrent queries (e.g. parallel analyzers) into aliased batches
+        batch_window_ms = config["pagination"].get("batch_window_ms", 10)
+        self.batcher = GraphBatcher(
+            self._post_with_retry,
+            window_ms=batch_window_ms,
+            max_batch=config["pagination"].get("max_batch_queries", 8)
+        ) if batch_window_ms > 0 else None
     
     def fetch_all(
         self,
         query_template: str,
         variables: Dict[str, Any],
         entity_name: str,
-        id_field: str = "id"
+        id_field: str = "id",
+        batch_pages: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch all entities using ID-based pagination.
@@ -46,43 +110,188 @@ class GraphPaginator:
             variables: Query variables (pool address, etc.)
             entity_name: Name of the entity in the GraphQL response
             id_field: Field name to use for pagination (default: "id")
+            batch_pages: Pages requested per round trip as aliased fields
+                (defaults to pagination.batch_pages)
             
         Returns:
             List of all fetched entities
         """
+        query, pages = self._paged_query(query_template, batch_pages)
         all_entities = []
         last_id = ""
         
         while True:
             # Prepare variables for this batch
-            batch_vars = {**variables, "last_id": last_id, "batch_size": self.batch_size}
+            batch_vars = self._page_variables(variables, last_id, pages)
             
             # Execute query with retry logic
-            response_data = self._execute_with_retry(query_template, batch_vars)
+            response_data = self._execute_with_retry(query, batch_vars)
+            
+            # Collect the returned pages; stop at the first short page
+            done, last_id = self._collect_pages(response_data, entity_name, id_field, pages, all_entities, last_id)
+            if done:
+                break
+            
+            # Rate limiting delay
+            time.sleep(self.rate_limit_delay)
+        
+        return all_entities
+    
+    async def afetch_all(
+        self,
+        query_template: str,
+        variables: Dict[str, Any],
+        entity_name: str,
+        id_field: str = "id",
+        batch_pages: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of fetch_all over the shared HTTP/2 client.
+        
+        Args:
+            query_template: GraphQL query with $last_id variable placeholder
+            variables: Query variables (pool address, etc.)
+            entity_name: Name of the entity in the GraphQL response
+            id_field: Field name to use for pagination (default: "id")
+            batch_pages: Pages requested per round trip as aliased fields
+                (defaults to pagination.batch_pages)
+            
+        Returns:
+            List of all fetched entities
+        """
+        all_entities = []
+        async for page in self.afetch_iter(query_template, variables, entity_name, id_field, batch_pages):
+            all_entities.extend(page)
+        return all_entities
+    
+    async def afetch_iter(
+        self,
+        query_template: str,
+        variables: Dict[str, Any],
+        entity_name: str,
+        id_field: str = "id",
+        batch_pages: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield entity pages as they arrive, so callers can consume them
+        without holding every parsed page at once.
+        
+        Args:
+            query_template: GraphQL query with $last_id variable placeholder
+            variables: Query variables (pool address, etc.)
+            entity_name: Name of the entity in the GraphQL response
+            id_field: Field name to use for pagination (default: "id")
+            batch_pages: Pages requested per round trip as aliased fields
+                (defaults to pagination.batch_pages)
             
-            # Extract entities from response
-            entities = response_data.get("data", {}).get(entity_name, [])
+        Yields:
+            Non-empty lists of entities, in pagination order
+        """
+        query, pages = self._paged_query(query_template, batch_pages)
+        last_id = ""
+        
+        while True:
+            batch_vars = self._page_variables(variables, last_id, pages)
+            response_data = await self._apost_with_retry(query, batch_vars)
+            
+            for entities in self._response_pages(response_data, entity_name, pages):
+                if not entities:
+                    return
+                
+                yield entities
+                last_id = entities[-1][id_field]
+                
+                # Fewer results than batch size indicates the last page
+                if len(entities) < self.batch_size:
+                    return
             
+            await asyncio.sleep(self.rate_limit_delay)
+    
+    def _paged_query(self, query_template: str, batch_pages: Optional[int]) -> Tuple[str, int]:
+        """
+        Resolve the query document and page count used per round trip.
+        
+        Args:
+            query_template: Single-page GraphQL query
+            batch_pages: Requested pages per round trip (None for the configured default)
+            
+        Returns:
+            Tuple of (query to send, pages it returns)
+        """
+        pages = batch_pages if batch_pages is not None else self.batch_pages
+        # The last page is offset by (pages - 1) * batch_size
+        pages = min(pages, _MAX_SKIP // self.batch_size + 1)
+        if pages <= 1:
+            return query_template, 1
+        
+        key = (query_template, pages)
+        if key not in self._paged_queries:
+            self._paged_queries[key] = build_paged_query(query_template, pages)
+        paged = self._paged_queries[key]
+        return (paged, pages) if paged is not None else (query_template, 1)
+    
+    def _page_variables(self, variables: Dict[str, Any], last_id: str, pages: int) -> Dict[str, Any]:
+        """Build the variables for one round trip, including per-page skip offsets."""
+        batch_vars = {**variables, "last_id": last_id, "batch_size": self.batch_size}
+        if pages > 1:
+            batch_vars.update({f"skip_{i}": i * self.batch_size for i in range(pages)})
+        return batch_vars
+    
+    def _collect_pages(
+        self,
+        response_data: Dict[str, Any],
+        entity_name: str,
+        id_field: str,
+        pages: int,
+        all_entities: List[Dict[str, Any]],
+        last_id: str
+    ) -> Tuple[bool, str]:
+        """
+        Append the pages of one response to ``all_entities`` in order.
+        
+        Returns:
+            Tuple of (pagination finished, cursor for the next round trip)
+        """
+        for entities in self._response_pages(response_data, entity_name, pages):
             if not entities:
-                break
+                return True, last_id
             
             all_entities.extend(entities)
-            
-            # Update last_id for next iteration
             last_id = entities[-1][id_field]
             
-            # Check if we got fewer results than batch size (indicates last page)
+            # Fewer results than batch size indicates the last page
             if len(entities) < self.batch_size:
-                break
-            
-            # Rate limiting delay
-            time.sleep(self.rate_limit_delay)
+                return True, last_id
         
-        return all_entities
+        return False, last_id
+    
+    @staticmethod
+    def _response_pages(response_data: Dict[str, Any], entity_name: str, pages: int) -> List[List[Dict[str, Any]]]:
+        """Split one response into its pages, in order (plain or aliased ``p{i}`` fields)."""
+        data = response_data.get("data") or {}
+        if pages == 1:
+            return [data.get(entity_name) or []]
+        return [data.get(f"p{i}") or [] for i in range(pages)]
     
     def _execute_with_retry(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute a GraphQL query with automatic retry on failure.
+        Concurrent queries are merged into one request when batching is enabled.
+        
+        Args:
+            query: GraphQL query string
+            variables: Query variables
+            
+        Returns:
+            Response data dict
+        """
+        if self.batcher is not None:
+            return self.batcher.execute(query, variables)
+        return self._post_with_retry(query, variables)
+    
+    def _post_with_retry(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a single GraphQL request with automatic retry on failure.
         
         Args:
             query: GraphQL query string
@@ -96,22 +305,24 @@ class GraphPaginator:
         """
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
+                response = self.session.post(
                     self.endpoint,
-                    json={"query": query, "variables": variables},
+                    data=orjson.dumps({"query": query, "variables": variables}),
+                    headers=_JSON_HEADERS,
                     timeout=self.timeout
                 )
                 response.raise_for_status()
                 
-                data = response.json()
+                # Parse the raw bytes with orjson (large tick/swap pages dominate stdlib json time)
+                data = orjson.loads(response.content)
                 
                 # Check for GraphQL errors
                 if "errors" in data:
-                    raise Exception(f"GraphQL errors: {data['errors']}")
+                    raise GraphQLError(f"GraphQL errors: {data['errors']}")
                 
                 return data
                 
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
                 if attempt == self.max_retries - 1:
                     # Last attempt failed - let it propagate (fail-fast)
                     raise Exception(f"Query failed after {self.max_retries} retries: {str(e)}")
@@ -121,13 +332,144 @@ class GraphPaginator:
         
         # Should never reach here, but satisfy type checker
         raise Exception("Unexpected error in retry logic")
+    
+    async def _apost_with_retry(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a single GraphQL request on the async client with automatic retry on failure.
+        
+        Args:
+            query: GraphQL query string
+            variables: Query variables
+            
+        Returns:
+            Response data dict
+            
+        Raises:
+            Exception: If all retries fail (fail-fast principle)
+        """
+        if self.client is None:
+            self.client = create_graph_client(self.config)
+        
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.client.post(
+                    self.endpoint,
+                    content=orjson.dumps({"query": query, "variables": variables}),
+                    headers=_JSON_HEADERS
+                )
+                response.raise_for_status()
+                
+                data = orjson.loads(response.content)
+                
+                # Check for GraphQL errors
+                if "errors" in data:
+                    raise GraphQLError(f"GraphQL errors: {data['errors']}")
+                
+                return data
+                
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                if attempt == self.max_retries - 1:
+                    raise Exception(f"Query failed after {self.max_retries} retries: {str(e)}")
+                
+                await asyncio.sleep(self.retry_delay * (attempt + 1))
+        
+        raise Exception("Unexpected error in retry logic")
+
+
+def create_graph_client(config: Dict[str, Any]) -> httpx.AsyncClient:
+    """
+    Create the long-lived HTTP/2 client used for The Graph queries.
+    
+    Args:
+        config: Configuration dict containing API settings
+        
+    Returns:
+        AsyncClient with keep-alive connection pooling (caller owns aclose())
+    """
+    api = config["api"]
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=api["timeout_seconds"],
+        limits=httpx.Limits(
+            max_keepalive_connections=api.get("max_keepalive_connections", 32),
+            max_connections=api.get("max_connections", 64)
+        )
+    )
+
+
+_POOL_META_QUERY = """
+query ($pool_id: String!) {
+  pool(id: $pool_id) {
+    id
+    token0 { symbol id decimals }
+    token1 { symbol id decimals }
+    feeTier
+    liquidity
+    totalValueLockedUSD
+    volumeUSD
+    token0Price
+    token1Price
+    tick
+    sqrtPrice
+    txCount
+  }
+}
+"""
+
+
+class PoolMetaFetcher:
+    """
+    Fetches pool metadata (tokens, fee tier, TVL, prices, current tick) in one query and
+    memoizes it briefly per pool, so tick and pool-info lookups share one round trip.
+    """
+    
+    def __init__(self, paginator: GraphPaginator, ttl_seconds: float = 30):
+        """
+        Args:
+            paginator: GraphPaginator used to execute the query
+            ttl_seconds: How long fetched metadata (including prices) is reused
+        """
+        self.paginator = paginator
+        self._cache: TTLCache = TTLCache(maxsize=256, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+    
+    def fetch(self, pool_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Get pool metadata, querying The Graph only on a cache miss.
+        
+        Args:
+            pool_address: Ethereum address of the Uniswap V3 pool
+            
+        Returns:
+            Pool dict as returned by the subgraph, or None if the pool does not exist
+            
+        Raises:
+            Exception: If the query fails
+        """
+        key = pool_address.lower()
+        with self._lock:
+            pool = self._cache.get(key)
+        if pool is not None:
+            return pool
+        
+        response = self.paginator._execute_with_retry(_POOL_META_QUERY, {"pool_id": key})
+        pool = response.get("data", {}).get("pool")
+        if pool:
+            with self._lock:
+                self._cache[key] = pool
+        return pool
 
 
 class CacheManager:
     """
     Hybrid caching strategy for static vs dynamic data.
-    Static data (ticks, poolDayData): 1 hour TTL
+    Static data (ticks, poolDayData): 1 hour TTL, persisted to disk so restarts don't re-fetch
     Dynamic data (swaps, positions): Never cached
+    
+    Entries are zstd-compressed msgpack rather than pickle, so a tampered cache
+    file can at worst yield wrong data, never run code. Values are plain data
+    (dicts, lists, scalars, NumPy arrays); dataclasses are stored as dicts and
+    come back as dicts.
     """
     
     def __init__(self, config: Dict[str, Any]):
@@ -139,6 +481,7 @@ class CacheManager:
         self.cache_dir = config["cache"]["directory"]
         self.static_ttl = config["cache"]["static_data_ttl_seconds"]
         self.cache_entities = config["cache"]["cache_entities"]
+        self.compression_level = config["cache"].get("compression_level", 3)
         
         # Create cache directory if it doesn't exist
         if self.enabled and not os.path.exists(self.cache_dir):
@@ -158,26 +501,23 @@ class CacheManager:
         if not self.enabled or not self.cache_entities.get(entity_type, False):
             return None
         
-        cache_file = self._get_cache_path(key)
-        
-        if not os.path.exists(cache_file):
-            return None
-        
+        return self._read(self._get_cache_path(key))
+    
+    def _read(self, cache_file: str) -> Optional[Any]:
+        """Read and validate one cache file (writes are atomic, so no lock is needed)."""
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
-            
-            # Check expiration
-            cached_at = datetime.fromisoformat(cache_data["cached_at"])
-            if datetime.now() - cached_at > timedelta(seconds=self.static_ttl):
-                # Expired - remove file
+            # Expiry comes from the file's mtime, so stale entries are never decompressed
+            if time.time() - os.path.getmtime(cache_file) > self.static_ttl:
                 os.remove(cache_file)
                 return None
             
-            return cache_data["data"]
+            with open(cache_file, 'rb') as f:
+                return _CACHE_DECODER.decode(zstandard.ZstdDecompressor().decompress(f.read()))
             
-        except (json.JSONDecodeError, KeyError, ValueError):
-            # Corrupted cache - remove it (fail-fast)
+        except FileNotFoundError:
+            return None
+        except (zstandard.ZstdError, msgspec.DecodeError, ValueError, TypeError):
+            # Corrupted or outdated cache - remove it (fail-fast)
             if os.path.exists(cache_file):
                 os.remove(cache_file)
             return None
@@ -195,15 +535,19 @@ class CacheManager:
             return
         
         cache_file = self._get_cache_path(key)
+        blob = zstandard.ZstdCompressor(level=self.compression_level).compress(
+            _CACHE_ENCODER.encode(data)
+        )
         
-        cache_data = {
-            "cached_at": datetime.now().isoformat(),
-            "entity_type": entity_type,
-            "data": data
-        }
-        
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f)
+        # Write to a temp file and rename, so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
     
     def _get_cache_path(self, key: str) -> str:
         """
@@ -217,7 +561,7 @@ class CacheManager:
         """
         # Hash the key to create a safe filename
         key_hash = hashlib.sha256(key.encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"{key_hash}.json")
+        return os.path.join(self.cache_dir, f"{key_hash}.msgpack.zst")
 
 
 def load_config(config_path: str = "config.json") -> Dict[str, Any]:
@@ -6,8 +6,11 @@ Each node performs a specific step in the analysis pipeline.
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
 import logging
 
+from utils import PoolMetaFetcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,7 @@ class PoolRiskNodes:
         self.cache = cache
         self.config = config
         self.system_prompt = system_prompt
+        self.pool_meta = PoolMetaFetcher(paginator, config["cache"].get("pool_meta_ttl_seconds", 30))
     
     def enhance_query(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -113,7 +117,7 @@ Respond with a JSON object containing:
             "exit_flag": False
         }
     
-    def run_analyses(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def run_analyses(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Run requested analyses using tools.
         
@@ -143,19 +147,25 @@ Respond with a JSON object containing:
         try:
             # Run comprehensive analysis
             concentration_analyzer = ConcentrationRiskAnalyzer(self.paginator, self.cache, self.config)
-            liquidity_analyzer = LiquidityDepthAnalyzer(self.paginator, self.cache, self.config)
+            liquidity_analyzer = LiquidityDepthAnalyzer(self.paginator, self.cache, self.config, self.pool_meta)
             market_analyzer = MarketRiskAnalyzer(self.paginator, self.cache, self.config)
             behavioral_analyzer = BehavioralRiskAnalyzer(self.paginator, self.cache, self.config)
             
-            # Fetch pool info first to get current price
-            pool_info = self._fetch_pool_info(pool_address)
-            current_price = float(pool_info.get("token1Price", 1))
+            # Fetch pool info (for the current tick), positions, ticks and swaps concurrently
+            pool_info, (liquidity, timestamps), ticks, swaps = await asyncio.gather(
+                asyncio.to_thread(self._fetch_pool_info, pool_address),
+                concentration_analyzer.afetch_position_arrays(pool_address),
+                liquidity_analyzer.afetch_ticks(pool_address),
+                behavioral_analyzer.afetch_recent_swaps(pool_address)
+            )
             
-            # Run analyses
-            concentration_result = concentration_analyzer.analyze(pool_address)
-            liquidity_result = liquidity_analyzer.analyze(pool_address, current_price)
-            market_result = market_analyzer.analyze(pool_address)
-            behavioral_result = behavioral_analyzer.analyze(pool_address)
+            # Run analyses off the event loop (metrics are CPU-bound, the rest fetch synchronously)
+            concentration_result, liquidity_result, market_result, behavioral_result = await asyncio.gather(
+                asyncio.to_thread(concentration_analyzer.analyze_arrays, liquidity, timestamps),
+                asyncio.to_thread(liquidity_analyzer.analyze, pool_address, ticks=ticks),
+                asyncio.to_thread(market_analyzer.analyze, pool_address),
+                asyncio.to_thread(behavioral_analyzer.analyze, pool_address, swaps)
+            )
             
             # Calculate composite score
             scorer = RiskScorer(self.config)
@@ -279,25 +289,8 @@ Provide a clear, data-driven answer with specific numbers and risk levels.
     
     def _fetch_pool_info(self, pool_address: str) -> Dict[str, Any]:
         """Fetch basic pool information."""
-        query = """
-        query ($pool_id: String!) {
-          pool(id: $pool_id) {
-            id
-            token0 { symbol id decimals }
-            token1 { symbol id decimals }
-            feeTier
-            liquidity
-            totalValueLockedUSD
-            volumeUSD
-            token0Price
-            token1Price
-            txCount
-          }
-        }
-        """
         try:
-            response = self.paginator._execute_with_retry(query, {"pool_id": pool_address.lower()})
-            pool = response.get("data", {}).get("pool")
+            pool = self.pool_meta.fetch(pool_address)
             if not pool:
                 return {"error": "Pool not found"}
             return pool
@@ -225,10 +225,8 @@ Analyze the question and decide which tools are needed. If the user wants a comp
                 return {"tool": tool_name, "error": f"Tool {tool_name} not found"}
             
             try:
-                # Most tools just need pool_address
-                if tool_name == "analyze_liquidity_depth":
-                    result = await tool.ainvoke({"pool_address": pool_address, "current_price": 1.0})
-                elif tool_name == "calculate_composite_risk_score":
+                # Tools just need pool_address (liquidity depth reads the pool's current tick itself)
+                if tool_name == "calculate_composite_risk_score":
                     # Skip - will be calculated after other tools
                     return {"tool": tool_name, "skip": True}
                 else:
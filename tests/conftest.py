@@ -0,0 +1,23 @@
+"""
+Shared fixtures: the pool risk service imports its modules relative to its own
+directory (``from utils import ...``), so that directory goes on sys.path.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_POOL_RISK_DIR = os.path.join(_ROOT, "pool_risk_service")
+for path in (_ROOT, _POOL_RISK_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def pool_risk_config():
+    """Pool risk service configuration as shipped."""
+    with open(os.path.join(_POOL_RISK_DIR, "config.json")) as f:
+        return json.load(f)
@@ -0,0 +1,54 @@
+"""
+The disk cache round-trips plain data and tick arrays without pickle.
+"""
+
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from tools.liquidity_depth_risk import TickArrays
+from utils import CacheManager
+
+
+@pytest.fixture
+def cache(pool_risk_config, tmp_path):
+    config = copy.deepcopy(pool_risk_config)
+    config["cache"].update(enabled=True, directory=str(tmp_path))
+    config["cache"]["cache_entities"].update(ticks=True, poolDayData=True)
+    return CacheManager(config)
+
+
+def test_pool_day_data_round_trip(cache):
+    rows = [{"date": 1700000000, "tvlUSD": "123.45"}, {"date": 1699913600, "tvlUSD": "120.00"}]
+
+    cache.set("pool_poolDayData", "poolDayData", rows)
+
+    assert cache.get("pool_poolDayData", "poolDayData") == rows
+
+
+def test_tick_arrays_round_trip(cache):
+    ticks = TickArrays.from_ticks([
+        {"tickIdx": "60", "liquidityNet": "-5e20", "liquidityGross": "5e20"},
+        {"tickIdx": "-60", "liquidityNet": "5e20", "liquidityGross": "5e20"},
+    ])
+
+    cache.set("pool_ticks", "ticks", ticks)
+    restored = TickArrays(**cache.get("pool_ticks", "ticks"))
+
+    for field in ("tick_idx", "liquidity_net", "liquidity_gross"):
+        expected = getattr(ticks, field)
+        actual = getattr(restored, field)
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_corrupt_entry_is_dropped(cache):
+    cache.set("pool_poolDayData", "poolDayData", [])
+    path = cache._get_cache_path("pool_poolDayData")
+    with open(path, "wb") as f:
+        f.write(b"not a cache entry")
+
+    assert cache.get("pool_poolDayData", "poolDayData") is None
+    assert not os.path.exists(path)
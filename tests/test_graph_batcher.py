@@ -0,0 +1,78 @@
+"""
+GraphBatcher: lone callers are not delayed, merged failures are handled per error type.
+"""
+
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from common_ai.graph_batcher import GraphBatcher, GraphQLError
+
+_POOLS_QUERY = "query ($id: String!) { pools(where: {id: $id}) { id } }"
+
+
+def _pools_response(pool_id):
+    return {"data": {"pools": [{"id": pool_id}]}}
+
+
+def test_lone_caller_is_sent_without_waiting_for_the_window():
+    calls = []
+    
+    def post(query, variables):
+        calls.append(variables)
+        return _pools_response(variables["id"])
+    
+    batcher = GraphBatcher(post, window_ms=2000)
+    start = time.monotonic()
+    for pool_id in ("a", "b", "c"):
+        assert batcher.execute(_POOLS_QUERY, {"id": pool_id}) == _pools_response(pool_id)
+    
+    assert time.monotonic() - start < 1.0
+    assert len(calls) == 3
+
+
+def _batch(*pool_ids):
+    return [(_POOLS_QUERY, {"id": pool_id}, Future()) for pool_id in pool_ids]
+
+
+def test_merged_transport_failure_is_surfaced_without_fan_out():
+    calls = []
+    
+    def post(query, variables):
+        calls.append(query)
+        raise ConnectionError("rate limited")
+    
+    batch = _batch("a", "b")
+    GraphBatcher(post)._run_batch(batch)
+    
+    assert len(calls) == 1
+    for _, _, future in batch:
+        with pytest.raises(ConnectionError):
+            future.result()
+
+
+def test_merged_graphql_error_falls_back_to_individual_queries():
+    def post(query, variables):
+        if "q0:" in query:
+            raise GraphQLError("merged document rejected")
+        if variables["id"] == "bad":
+            raise GraphQLError("bad pool")
+        return _pools_response(variables["id"])
+    
+    (_, _, good), (_, _, bad) = batch = _batch("a", "bad")
+    GraphBatcher(post)._run_batch(batch)
+    
+    assert good.result() == _pools_response("a")
+    with pytest.raises(GraphQLError):
+        bad.result()
+
+
+def test_deduplicated_callers_get_independent_copies():
+    batch = _batch("a", "a")
+    GraphBatcher(lambda query, variables: _pools_response(variables["id"]))._run_batch(batch)
+    
+    first, second = (future.result() for _, _, future in batch)
+    assert first == second
+    first["data"]["pools"][0]["id"] = "mutated"
+    assert second["data"]["pools"][0]["id"] == "a"
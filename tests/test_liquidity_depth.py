@@ -0,0 +1,116 @@
+"""
+Sell-order simulation on a hand-computed tick set.
+
+One position of liquidity L between ticks -1000 and 1000 with the pool at tick 0
+(sqrt price 1): below the price it holds L * (1 - 1.0001 ** -500) of token1, and
+selling token0 for X of it moves the sqrt price to 1 - X / L.
+"""
+
+import math
+
+import pytest
+
+from tools.liquidity_depth_risk import LiquidityDepthAnalyzer, TickArrays
+
+POOL = "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640"
+L = 1e9
+Q96 = 2 ** 96
+
+AMOUNT1 = L * (1.0 - 1.0001 ** -500)
+AMOUNT0 = L * (1.0 - 1.0001 ** -500)  # 1 / sqrtP_current - 1 / sqrtP_upper
+# With sqrt price 1 both tokens are worth the same, so a TVL equal to their sum
+# calibrates one raw token1 unit to one USD
+TVL_USD = AMOUNT1 + AMOUNT0
+
+
+class _DictCache:
+    """In-memory stand-in for CacheManager."""
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+
+    def get(self, key, data_type):
+        return self.entries.get((key, data_type))
+
+    def set(self, key, data_type, value):
+        self.entries[(key, data_type)] = value
+
+
+class _StaticPoolMeta:
+    """Stand-in for PoolMetaFetcher returning fixed pool metadata."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def fetch(self, pool_address):
+        return self.pool
+
+
+def _single_range_ticks():
+    return TickArrays.from_ticks([
+        # Out of tick order on purpose: pages arrive sorted by entity id
+        {"tickIdx": "1000", "liquidityNet": str(-L), "liquidityGross": str(L)},
+        {"tickIdx": "-1000", "liquidityNet": str(L), "liquidityGross": str(L)},
+    ])
+
+
+def _analyzer(config, pool, tvl_usd=TVL_USD):
+    cache = _DictCache({(f"{POOL}_poolDayData", "poolDayData"): [{"tvlUSD": str(tvl_usd)}]})
+    return LiquidityDepthAnalyzer(None, cache, config, pool_meta=_StaticPoolMeta(pool))
+
+
+def test_sell_inside_single_range_matches_hand_computed_impact(pool_risk_config):
+    analyzer = _analyzer(pool_risk_config, {})
+
+    sell_usd = 10_000_000.0  # 1% of L
+    (impact,) = analyzer._simulate_sell_orders(_single_range_ticks(), 1.0, TVL_USD, (sell_usd,))
+
+    sqrt_exit = 1.0 - sell_usd / L
+    assert impact == pytest.approx((1.0 - sqrt_exit ** 2) * 100, rel=1e-9)
+
+
+def test_sell_exhausting_liquidity_is_full_impact(pool_risk_config):
+    analyzer = _analyzer(pool_risk_config, {})
+
+    impacts = analyzer._simulate_sell_orders(
+        _single_range_ticks(), 1.0, TVL_USD, (AMOUNT1 * 0.999, AMOUNT1 * 1.001)
+    )
+
+    # Just inside the range the fill stops short of the lower tick; just past it nothing is left
+    sqrt_exit = 1.0 - AMOUNT1 * 0.999 / L
+    assert impacts[0] == pytest.approx((1.0 - sqrt_exit ** 2) * 100, rel=1e-9)
+    assert impacts[0] < (1.0 - 1.0001 ** -1000) * 100
+    assert impacts[1] == 100.0
+
+
+def test_analyze_anchors_on_pool_sqrt_price(pool_risk_config):
+    analyzer = _analyzer(pool_risk_config, {"tick": "0", "sqrtPrice": str(Q96)})
+
+    result = analyzer.analyze(POOL, ticks=_single_range_ticks())
+
+    expected_100k = (1.0 - (1.0 - 100_000 / L) ** 2) * 100
+    assert result["price_impact_100k_pct"] == round(expected_100k, 4)
+    assert result["total_ticks"] == 2
+    # Both ticks are more than a 10% move from tick 0, so nothing counts as active
+    assert result["active_liquidity_pct"] == 0.0
+
+
+def test_analyze_without_current_tick_reports_no_data(pool_risk_config):
+    # No tick on the pool entity and no decimals to convert a price with
+    analyzer = _analyzer(pool_risk_config, {"token1Price": "1.0"})
+
+    result = analyzer.analyze(POOL, ticks=_single_range_ticks())
+
+    assert result["error"] == "Current pool tick unavailable"
+    assert result["risk_flags"] == ["NO_DATA"]
+
+
+def test_price_fallback_uses_token_decimals(pool_risk_config):
+    pool = {"token0": {"decimals": "6"}, "token1": {"decimals": "18"}}
+    analyzer = _analyzer(pool_risk_config, pool)
+
+    tick, sqrt_current = analyzer._current_position(POOL, 1e-3)
+
+    raw_price = 1e-3 * 1e12
+    assert sqrt_current == pytest.approx(math.sqrt(raw_price))
+    assert tick == math.floor(math.log(raw_price) / math.log(1.0001))
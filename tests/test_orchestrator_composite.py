@@ -0,0 +1,46 @@
+"""
+The orchestrator's composite score averages only the agents that returned a score.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("a2a")
+
+from backend.workflows.rag.nodes import OrchestratorNodes
+
+
+def _nodes_without_agents() -> OrchestratorNodes:
+    """Nodes instance with no discovered agents (skips LLM and session setup)."""
+    nodes = OrchestratorNodes.__new__(OrchestratorNodes)
+    nodes.remote_agent_connections = {}
+    return nodes
+
+
+def test_failed_agent_is_excluded_from_composite():
+    nodes = _nodes_without_agents()
+    
+    token_intel = asyncio.run(nodes._invoke_agent("token_intelligence", {"query": "Is this pool safe?"}))
+    assert token_intel["risk_score"] is None
+    assert "error" in token_intel["metadata"]
+    
+    pool_risk = {"answer": "High risk", "metadata": {}, "risk_score": 80.0}
+    output = nodes.finalize_output({
+        "pool_risk_result": pool_risk,
+        "token_intel_result": token_intel,
+        "final_answer": "High risk"
+    })
+    
+    assert output["risk_score"] == 80.0
+    assert output["metadata"]["composite_risk_score"] == 80.0
+
+
+def test_zero_score_is_a_real_score():
+    output = _nodes_without_agents().finalize_output({
+        "pool_risk_result": {"metadata": {}, "risk_score": 80.0},
+        "token_intel_result": {"metadata": {}, "risk_score": 0.0},
+    })
+    
+    assert output["risk_score"] == 40.0
@@ -0,0 +1,129 @@
+"""
+Multi-page round trips must return exactly what sequential id_gt pagination returns.
+
+``_post_with_retry`` is replaced by an in-memory subgraph that honours ``first``,
+``skip`` and ``id_gt`` for both the plain query and its aliased ``p{i}`` rewrite.
+"""
+
+import asyncio
+import copy
+
+import pytest
+
+from utils import GraphPaginator
+
+QUERY = """
+query ($pool_id: String!, $last_id: ID!, $batch_size: Int!) {
+  swaps(
+    first: $batch_size
+    where: { pool: $pool_id, id_gt: $last_id }
+    orderBy: id
+    orderDirection: asc
+  ) {
+    id
+  }
+}
+"""
+
+
+class _FakeSubgraph:
+    """Serves ``rows`` (sorted by id) and records every request's variables."""
+
+    def __init__(self, count, reverse_aliases=False):
+        self.rows = [{"id": f"0x{i:06x}"} for i in range(count)]
+        self.reverse_aliases = reverse_aliases
+        self.requests = []
+
+    def post(self, query, variables):
+        self.requests.append(variables)
+        after = [row for row in self.rows if row["id"] > variables["last_id"]]
+        first = variables["batch_size"]
+        if "p0:" not in query:
+            return {"data": {"swaps": after[:first]}}
+
+        skips = sorted((int(name[5:]), value) for name, value in variables.items() if name.startswith("skip_"))
+        if self.reverse_aliases:
+            skips.reverse()
+        return {"data": {f"p{i}": after[skip:skip + first] for i, skip in skips}}
+
+    async def apost(self, query, variables):
+        return self.post(query, variables)
+
+
+def _paginator(config, subgraph, batch_size, batch_pages):
+    config = copy.deepcopy(config)
+    config["pagination"].update(
+        batch_size=batch_size,
+        batch_pages=batch_pages,
+        rate_limit_delay_seconds=0,
+        batch_window_ms=0
+    )
+    paginator = GraphPaginator("http://subgraph.invalid", config)
+    paginator._post_with_retry = subgraph.post
+    paginator._apost_with_retry = subgraph.apost
+    return paginator
+
+
+def _fetch(config, count, batch_size, batch_pages, **subgraph_kwargs):
+    subgraph = _FakeSubgraph(count, **subgraph_kwargs)
+    paginator = _paginator(config, subgraph, batch_size, batch_pages)
+    return paginator.fetch_all(QUERY, {"pool_id": "0xpool"}, "swaps"), subgraph
+
+
+@pytest.mark.parametrize("count", [0, 3, 5, 12, 20, 21, 47])
+def test_paged_fetch_matches_sequential_fetch(pool_risk_config, count):
+    sequential, _ = _fetch(pool_risk_config, count, batch_size=5, batch_pages=1)
+    paged, _ = _fetch(pool_risk_config, count, batch_size=5, batch_pages=4)
+
+    assert paged == sequential
+    assert [row["id"] for row in paged] == [f"0x{i:06x}" for i in range(count)]
+
+
+def test_short_page_ends_pagination(pool_risk_config):
+    # Pages of 5, 5, 2: the short third page is the last, so one round trip suffices
+    rows, subgraph = _fetch(pool_risk_config, 12, batch_size=5, batch_pages=4)
+
+    assert len(rows) == 12
+    assert len(subgraph.requests) == 1
+
+
+def test_full_round_trip_continues_from_last_id(pool_risk_config):
+    # Four full pages use the whole round trip; the next one starts after the last row
+    rows, subgraph = _fetch(pool_risk_config, 20, batch_size=5, batch_pages=4)
+
+    assert len(rows) == 20
+    assert [request["last_id"] for request in subgraph.requests] == ["", "0x000013"]
+
+
+def test_pages_are_read_in_alias_order(pool_risk_config):
+    rows, _ = _fetch(pool_risk_config, 47, batch_size=5, batch_pages=4, reverse_aliases=True)
+
+    assert [row["id"] for row in rows] == [f"0x{i:06x}" for i in range(47)]
+
+
+def test_pages_are_clamped_to_the_skip_cap(pool_risk_config):
+    # 5000 // 2000 + 1 = 3 pages, so the largest skip is 4000
+    rows, subgraph = _fetch(pool_risk_config, 7000, batch_size=2000, batch_pages=6)
+    sequential, _ = _fetch(pool_risk_config, 7000, batch_size=2000, batch_pages=1)
+
+    assert rows == sequential
+    skips = [value for request in subgraph.requests for name, value in request.items() if name.startswith("skip_")]
+    assert max(skips) == 4000
+
+
+def test_non_id_order_falls_back_to_single_pages(pool_risk_config):
+    subgraph = _FakeSubgraph(0)
+    paginator = _paginator(pool_risk_config, subgraph, batch_size=5, batch_pages=4)
+    by_timestamp = QUERY.replace("orderBy: id", "orderBy: timestamp")
+
+    assert paginator._paged_query(by_timestamp, None) == (by_timestamp, 1)
+
+
+def test_async_paged_fetch_matches_sequential_fetch(pool_risk_config):
+    sequential, _ = _fetch(pool_risk_config, 47, batch_size=5, batch_pages=1)
+    subgraph = _FakeSubgraph(47)
+    paginator = _paginator(pool_risk_config, subgraph, batch_size=5, batch_pages=4)
+
+    paged = asyncio.run(paginator.afetch_all(QUERY, {"pool_id": "0xpool"}, "swaps"))
+
+    assert paged == sequential
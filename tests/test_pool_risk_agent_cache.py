@@ -0,0 +1,98 @@
+"""
+PoolRiskAgent answers repeated requests from its TTL cache and shares concurrent runs,
+whichever entry point (REST invoke or A2A stream) the request came through.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langgraph")
+pytest.importorskip("dotenv")
+
+from cachetools import TTLCache
+
+from agent.pool_risk_agent import PoolRiskAgent
+from common_ai.mappings.schemas import AgentRequest, AgentResponse
+
+POOL = "0x88E6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
+
+
+def _agent(run):
+    """Agent without models or graphs; ``run`` stands in for the graph execution."""
+    agent = PoolRiskAgent.__new__(PoolRiskAgent)
+    agent._response_cache = TTLCache(maxsize=16, ttl=60)
+    agent._in_flight = {}
+    agent._run = run
+    return agent
+
+
+def _counting_run(calls, fail=False):
+    async def run(request):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        if fail:
+            raise RuntimeError("graph failed")
+        return AgentResponse(answer="ok", metadata={"risk_score": 42}, risk_score=42)
+    return run
+
+
+def test_concurrent_requests_share_one_run_and_later_ones_hit_the_cache():
+    calls = []
+    agent = _agent(_counting_run(calls))
+    request = AgentRequest(user_question="Is it safe?", pool_address=POOL)
+
+    async def scenario():
+        first, second = await asyncio.gather(agent.invoke(request), agent.invoke(request))
+        # Same pool in lower case is the same analysis
+        third = await agent.invoke(request.model_copy(update={"pool_address": POOL.lower()}))
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert first == second == third
+    # Every caller gets its own copy of the shared response
+    first.metadata["risk_score"] = 0
+    assert second.metadata["risk_score"] == 42
+    assert agent._in_flight == {}
+
+
+def test_failed_run_is_not_cached():
+    calls = []
+    agent = _agent(_counting_run(calls, fail=True))
+    request = AgentRequest(user_question="Is it safe?", pool_address=POOL)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(agent.invoke(request))
+
+    assert len(calls) == 2
+    assert agent._in_flight == {}
+    assert len(agent._response_cache) == 0
+
+
+def test_stream_serves_cached_response_without_running_the_graph():
+    calls = []
+    agent = _agent(_counting_run(calls))
+    request = AgentRequest(user_question="Is it safe?", pool_address=POOL)
+
+    async def scenario():
+        await agent.invoke(request)
+        return [item async for item in agent.stream(request)]
+
+    items = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert [item["type"] for item in items] == ["result"]
+    assert items[0]["response"].risk_score == 42
+
+
+def test_invalidate_drops_only_that_pool():
+    agent = _agent(_counting_run([]))
+    agent._response_cache[(POOL.lower(), "q", "en")] = AgentResponse(answer="a")
+    agent._response_cache[("0xother", "q", "en")] = AgentResponse(answer="b")
+
+    assert agent.invalidate(POOL) == 1
+    assert list(agent._response_cache.keys()) == [("0xother", "q", "en")]
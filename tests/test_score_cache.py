@@ -0,0 +1,49 @@
+"""
+Composite scores are reused only within the tool set (score cache) that computed them.
+"""
+
+import tools.pipeline as pipeline
+from tools.pipeline import ScoreCache, run_full_risk
+
+POOL = "0x88E6A0c2dDD26FEEb64F039a2c41296FcB3f5640"
+
+
+def _stub_analyses(monkeypatch, calls):
+    def run_all_analyses(pool_address, paginator, cache, config, pool_meta=None):
+        calls.append(pool_address)
+        return tuple({"risk_score": 40, "risk_flags": ["LOW_RISK"]} for _ in range(4))
+    monkeypatch.setattr(pipeline, "run_all_analyses", run_all_analyses)
+
+
+def test_score_is_reused_within_one_cache_only(monkeypatch, pool_risk_config):
+    calls = []
+    _stub_analyses(monkeypatch, calls)
+    first_cache, second_cache = ScoreCache(), ScoreCache()
+
+    first = run_full_risk(POOL, None, None, pool_risk_config, score_cache=first_cache)
+    again = run_full_risk(POOL.lower(), None, None, pool_risk_config, score_cache=first_cache)
+    run_full_risk(POOL, None, None, pool_risk_config, score_cache=second_cache)
+
+    assert len(calls) == 2
+    assert again == first
+    assert first["composite_score"] == 40
+
+
+def test_cached_score_is_a_private_copy(monkeypatch, pool_risk_config):
+    _stub_analyses(monkeypatch, [])
+    score_cache = ScoreCache()
+
+    first = run_full_risk(POOL, None, None, pool_risk_config, score_cache=score_cache)
+    first["risk_flags"].append("TAMPERED")
+
+    assert "TAMPERED" not in run_full_risk(POOL, None, None, pool_risk_config, score_cache=score_cache)["risk_flags"]
+
+
+def test_no_cache_recomputes(monkeypatch, pool_risk_config):
+    calls = []
+    _stub_analyses(monkeypatch, calls)
+
+    run_full_risk(POOL, None, None, pool_risk_config)
+    run_full_risk(POOL, None, None, pool_risk_config)
+
+    assert len(calls) == 2
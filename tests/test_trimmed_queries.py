@@ -0,0 +1,69 @@
+"""
+The analyzers must work on the trimmed subgraph shapes their queries now request.
+"""
+
+import time
+
+from tools.behavioral_risk import BehavioralRiskAnalyzer
+from tools.concentration_risk import ConcentrationRiskAnalyzer
+
+POOL = "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640"
+
+
+def _swap(swap_id, block, sender, recipient, origin, tx_id):
+    """Swap with exactly the fields requested by _SWAPS_QUERY."""
+    return {
+        "id": swap_id,
+        "sender": sender,
+        "recipient": recipient,
+        "origin": origin,
+        "transaction": {"id": tx_id, "blockNumber": str(block)},
+    }
+
+
+def _position(position_id, liquidity, age_days, now):
+    """Position with exactly the fields requested by _POSITIONS_QUERY."""
+    return {
+        "id": position_id,
+        "liquidity": str(liquidity),
+        "transaction": {"timestamp": str(int(now - age_days * 86400))},
+    }
+
+
+def test_behavioral_analyze_on_trimmed_swaps(pool_risk_config):
+    swaps = [
+        # Sandwich in block 100: the attacker's origin wraps the victim's swap
+        _swap("0xa-0", 100, "0xrouter", "0xrouter", "0xbot", "0xa"),
+        _swap("0xb-0", 100, "0xrouter", "0xrouter", "0xvictim", "0xb"),
+        _swap("0xc-0", 100, "0xrouter", "0xrouter", "0xbot", "0xc"),
+        # Circular flow in block 101
+        _swap("0xd-0", 101, "0xwash1", "0xwash2", "0xwash1", "0xd"),
+        _swap("0xe-0", 101, "0xwash2", "0xwash1", "0xwash2", "0xe"),
+        _swap("0xf-0", 102, "0xuser", "0xuser", "0xuser", "0xf"),
+    ]
+    
+    result = BehavioralRiskAnalyzer(None, None, pool_risk_config).analyze(POOL, swaps=swaps)
+    
+    assert "error" not in result
+    assert result["total_swaps_analyzed"] == len(swaps)
+    assert result["sandwich_victims"] == 1
+    assert result["wash_trading_patterns"] == 1
+    assert 0 <= result["risk_score"] <= 100
+
+
+def test_concentration_analyze_on_trimmed_positions(pool_risk_config):
+    now = time.time()
+    positions = [
+        _position("1", 5_000_000, 2, now),
+        _position("2", 1_000_000, 15, now),
+        _position("3", 250_000, 60, now),
+        _position("4", 250_000, 90, now),
+    ]
+    
+    result = ConcentrationRiskAnalyzer(None, None, pool_risk_config).analyze(POOL, positions=positions)
+    
+    assert "error" not in result
+    assert result["total_positions"] == len(positions)
+    assert result["lp_age_distribution"]["mercenary"]["count"] == 1
+    assert result["lp_age_distribution"]["long_term"]["count"] == 2
+    assert 0 <= result["risk_score"] <= 100
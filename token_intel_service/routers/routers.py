@@ -9,6 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "common_ai"))
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any, List
 from common_ai.mappings.schemas import AgentRequest, AgentResponse
 from agent.token_intel_agent import TokenIntelligenceAgent
@@ -37,7 +38,7 @@ def initialize_agent() -> None:
     get_agent()
 
 
-@router.post("/v1/invoke", response_model=AgentResponse)
+@router.post("/v1/invoke", response_model=AgentResponse, response_class=ORJSONResponse)
 async def invoke_agent(request: AgentRequest):
     """
     Invoke token intelligence analysis.
@@ -66,11 +67,13 @@ async def invoke_agent(request: AgentRequest):
             scores = [c.get("risk_score", 0) for c in classifications.values() if isinstance(c, dict)]
             risk_score = sum(scores) / len(scores) if scores else 0.0
         
-        return AgentResponse(
+        response = AgentResponse(
             answer=result["answer"],
             metadata=result.get("metadata", {}),
             risk_score=risk_score
         )
+        # Returning the response directly skips FastAPI's response_model re-validation
+        return ORJSONResponse(response.model_dump(mode="json"))
     except Exception as e:
         logger.error(f"Token intelligence invocation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))